@@ -0,0 +1,153 @@
+'''
+    Autores:
+    - Alvarez, Matías
+    - Dumas, Román
+    - Nogueroles, Patricio
+
+    Archivo encargado de guardar en disco los resultados costosos del trabajo (particiones train/test, modelos entrenados y
+    exactitudes de los barridos), para no recalcularlos en cada ejecución si ni los datos ni los parámetros cambiaron.
+    El método principal es memorizar(...)
+
+    Cada resultado se identifica por una clave que combina:
+        - La huella de los datos de entrada (hash SHA-256 del contenido, forma y tipo de cada arreglo)
+        - El nombre de la función que lo calcula
+        - Sus hiperparámetros (por ejemplo k_list, o el rango de profundidades range(1, 11))
+        - La versión del código que lo calcula: un hash del código fuente del módulo que llama a memorizar y de todos los módulos
+          del trabajo que este importa (directa o indirectamente), junto con las versiones de numpy y scikit-learn
+    y se guarda como un archivo pickle en .cache_tmnist/resultados/, junto a la misma caché del dataset.
+
+    Así, al modificar el código de un modelo (o actualizar las librerías) los resultados que dependen de él se recalculan solos.
+    Para desactivar el almacén, asignar AlmacenResultados.RUTA_ALMACEN = None.
+
+    Modo de uso:
+        scores = memorizar('clasificar_variando_k', (x_train, y_train), {'k_list': k_list}, lambda: calcular_scores(...))
+'''
+
+import hashlib
+import inspect
+import json
+import os
+import pickle
+import sys
+from importlib import metadata
+
+import numpy as np
+
+from Auxiliares.CargaDatos import RUTA_CACHE_POR_DEFECTO
+
+RUTA_ALMACEN = os.path.join(RUTA_CACHE_POR_DEFECTO, 'resultados')
+# Carpeta del trabajo: sólo los módulos dentro de ella forman parte de la versión del código
+RAIZ_PROYECTO = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+# Librerías cuya versión forma parte de la versión del código (cambian los resultados y el formato de los modelos guardados)
+LIBRERIAS = ('numpy', 'scikit-learn')
+
+
+def huella(*arreglos: np.ndarray) -> str:
+    """
+    Calcular la huella (hash SHA-256) de uno o varios arreglos, a partir de su tipo, forma y contenido.
+
+    Parámetros:
+        arreglos (np.ndarray): Arreglos de entrada (por ejemplo, la matriz de pixeles y las etiquetas de train).
+
+    Retorna:
+        str: Hash en formato hexadecimal.
+    """
+
+    h = hashlib.sha256()
+    for arreglo in arreglos:
+        arreglo = np.ascontiguousarray(arreglo)
+        h.update(str((arreglo.dtype.str, arreglo.shape)).encode('utf-8'))
+        h.update(memoryview(arreglo).cast('B'))
+    return h.hexdigest()
+
+
+def modulos_del_proyecto(modulo) -> dict:
+    # El módulo dado y todos los módulos del trabajo que importa, directa o indirectamente (por nombre)
+    encontrados = {}
+    pendientes = [modulo]
+    while pendientes:
+        actual = pendientes.pop()
+        archivo = getattr(actual, '__file__', None) if actual is not None else None
+        if archivo is None or actual.__name__ in encontrados or not os.path.abspath(archivo).startswith(RAIZ_PROYECTO + os.sep):
+            continue
+        encontrados[actual.__name__] = actual
+        # Tanto los módulos importados como los módulos de las funciones y clases importadas de ellos
+        for valor in vars(actual).values():
+            if inspect.ismodule(valor):
+                pendientes.append(valor)
+            elif inspect.isfunction(valor) or inspect.isclass(valor):
+                pendientes.append(inspect.getmodule(valor))
+    return encontrados
+
+
+def version_codigo(modulo) -> str:
+    """
+    Calcular la versión del código de un módulo: el hash SHA-256 del código fuente del módulo y de los módulos del trabajo que importa,
+    y de las versiones de las librerías de LIBRERIAS.
+
+    Parámetros:
+        modulo: Módulo (por ejemplo, el que define la función que calcula un resultado).
+
+    Retorna:
+        str: Hash en formato hexadecimal.
+    """
+
+    h = hashlib.sha256()
+    for nombre, encontrado in sorted(modulos_del_proyecto(modulo).items()):
+        h.update(nombre.encode('utf-8'))
+        with open(encontrado.__file__, 'rb') as archivo:
+            h.update(archivo.read())
+    for libreria in LIBRERIAS:
+        try:
+            h.update((libreria + ' ' + metadata.version(libreria)).encode('utf-8'))
+        except metadata.PackageNotFoundError:
+            pass
+    return h.hexdigest()
+
+
+def describir(funcion: str, huella_datos: str, parametros: dict, version: str) -> str:
+    # Descripción canónica del resultado: los parámetros que no son JSON (como range(1, 11)) se representan con repr
+    return json.dumps({'funcion': funcion, 'datos': huella_datos, 'parametros': parametros, 'codigo': version}, sort_keys=True, default=repr)
+
+
+def memorizar(funcion: str, datos: tuple, parametros: dict, calcular, ruta: str = None):
+    """
+    Devolver el resultado guardado para (datos, función, parámetros) o, si no existe, calcularlo con calcular() y guardarlo.
+
+    Parámetros:
+        funcion (str): Nombre de la función que calcula el resultado.
+        datos (tuple): Arreglos de entrada de los que depende el resultado.
+        parametros (dict): Hiperparámetros de los que depende el resultado.
+        calcular (callable): Función sin argumentos que calcula el resultado (debe poder guardarse con pickle). La versión del código
+            se calcula a partir del módulo en el que está definida (para una lambda, el módulo que llama a memorizar).
+        ruta (str, opcional): Carpeta del almacén. Si es None, se usa RUTA_ALMACEN (y si esta también es None, no se guarda nada).
+
+    Retorna:
+        El resultado, guardado o recién calculado.
+    """
+
+    ruta = ruta or RUTA_ALMACEN
+    if ruta is None:
+        return calcular()
+
+    modulo = inspect.getmodule(calcular) or sys.modules['__main__']
+    descripcion = describir(funcion, huella(*datos), parametros, version_codigo(modulo))
+    clave = hashlib.sha256(descripcion.encode('utf-8')).hexdigest()
+    ruta_archivo = os.path.join(ruta, funcion + '-' + clave[:32] + '.pkl')
+
+    if os.path.exists(ruta_archivo):
+        with open(ruta_archivo, 'rb') as archivo:
+            guardado = pickle.load(archivo)
+        # La descripción completa se guarda junto al resultado, para no confundir dos resultados con el mismo prefijo de clave
+        if guardado['descripcion'] == descripcion:
+            return guardado['resultado']
+
+    resultado = calcular()
+
+    # Se escribe en un archivo temporal y luego se renombra, para que una ejecución interrumpida no deje un archivo incompleto
+    os.makedirs(ruta, exist_ok=True)
+    ruta_temporal = ruta_archivo + '.tmp'
+    with open(ruta_temporal, 'wb') as archivo:
+        pickle.dump({'descripcion': descripcion, 'resultado': resultado}, archivo, protocol=pickle.HIGHEST_PROTOCOL)
+    os.replace(ruta_temporal, ruta_archivo)
+    return resultado
@@ -0,0 +1,278 @@
+'''
+    Autores:
+    - Alvarez, Matías
+    - Dumas, Román
+    - Nogueroles, Patricio
+
+    Archivo que define ArbolHistogramas, un árbol de decisión (criterio de Gini, como DecisionTreeClassifier) para atributos uint8.
+    Los pixeles ya son enteros entre 0 y 255, por lo que en lugar de ordenar los valores de cada atributo en cada nodo:
+        - Se calcula, con np.bincount, el histograma de 256 intensidades por clase de cada atributo en el nodo
+        - El mejor corte "x <= t" de cada atributo sale de recorrer el histograma acumulado (conteos por clase a izquierda de t)
+        - Al dividir un nodo, sólo se calcula el histograma del hijo más chico: el del otro es el del padre menos ese (resta de hermanos)
+    En los nodos con pocas filas es más barato ordenar las filas por cada atributo (como CART), por lo que ahí se hace eso.
+
+    Los cortes candidatos son los mismos que considera DecisionTreeClassifier (entre dos valores consecutivos presentes), pero los
+    empates exactos de impureza, que sklearn rompe según un orden aleatorio de atributos, se rompen a favor del atributo y el umbral
+    menores. Con pixeles uint8 esos empates son frecuentes (muchos pixeles separan las mismas filas), y cada corte distinto cambia
+    todo el subárbol, por lo que los árboles difieren bastante de los de sklearn.
+
+    Es una implementación de referencia del entrenamiento con histogramas, no una alternativa más rápida a DecisionTreeClassifier:
+    cada nodo se procesa por separado desde Python, por lo que es más lento que sklearn, y por el desempate distinto sus predicciones
+    no coinciden del todo con las de sklearn. Construirlo por niveles (un único np.bincount por (nodo, atributo, intensidad, clase)
+    para todos los nodos de una profundidad) tampoco alcanza: recorrer los histogramas cuesta 784 x 256 x clases por nodo, y la
+    cantidad de nodos se duplica en cada nivel, mientras que sklearn ordena sólo las filas de cada nodo. Por eso no es uno de los
+    motores de ClasificacionMulticlase.py, y para los resultados del trabajo se usa sklearn. comparar_con_sklearn(...) mide la
+    diferencia de tiempo, exactitud y coincidencia sobre los datos que se le pasen.
+
+    Modo de uso (mismos métodos que DecisionTreeClassifier):
+        modelo = ArbolHistogramas(max_depth = 10).fit(X, Y)
+        Y_predict = modelo.predict(X_test)
+
+    La función comparar_con_sklearn(...) mide los tiempos de ambos y la exactitud de cada uno para distintas profundidades.
+'''
+
+import time
+
+import numpy as np
+from scipy import sparse
+from sklearn.tree import DecisionTreeClassifier
+
+CANTIDAD_INTENSIDADES = 256
+
+# Si el hijo más grande tiene menos filas que esto, no se le guarda el histograma (padre - hermano): se recalcula al procesarlo,
+# lo que es barato para nodos chicos y evita mantener en memoria histogramas de 784 x clases x 256 para muchos nodos
+FILAS_MINIMAS_RESTA = 1024
+
+# En los nodos con menos filas que esto se ordenan las filas por atributo en lugar de armar el histograma
+FILAS_MINIMAS_HISTOGRAMA = 128
+
+
+class ArbolHistogramas:
+    """
+    Árbol de decisión sobre atributos uint8, entrenado con histogramas de intensidades.
+
+    Atributos (luego de fit):
+        classes_ (np.ndarray): Clases ordenadas de menor a mayor.
+        atributo (np.ndarray): Atributo de cada nodo (-1 en las hojas).
+        umbral (np.ndarray): Umbral uint8 de cada nodo: las filas con x[atributo] <= umbral van al hijo izquierdo.
+        izquierdo, derecho (np.ndarray): Índice de los hijos de cada nodo (-1 en las hojas). La raíz es el nodo 0.
+        conteos (np.ndarray): Matriz (nodos, clases) con la cantidad de filas de train de cada clase en cada nodo.
+    """
+
+    def __init__(self, max_depth: int = None, min_samples_split: int = 2, filas_por_bloque: int = 4096):
+        self.max_depth = max_depth
+        self.min_samples_split = min_samples_split
+        self.filas_por_bloque = filas_por_bloque
+
+    def _histograma(self, filas: np.ndarray, atributos: np.ndarray) -> np.ndarray:
+        # Tensor (atributos, 256, clases) de conteos de las filas dadas, con un único bincount por bloque de filas
+        cantidad_atributos = len(atributos)
+        cantidad_clases = len(self.classes_)
+        tamano = cantidad_atributos * cantidad_clases * CANTIDAD_INTENSIDADES
+        conteos = np.zeros(tamano, dtype=np.int64)
+        desplazamiento_atributo = np.arange(cantidad_atributos, dtype=np.int32) * (CANTIDAD_INTENSIDADES * cantidad_clases)
+
+        for inicio in range(0, len(filas), self.filas_por_bloque):
+            bloque = filas[inicio:inicio + self.filas_por_bloque]
+            # código = (a * 256 + v) * clases + c (entra en int32, que ocupa la mitad que int64)
+            codigos = desplazamiento_atributo[None, :] + self._X[bloque][:, atributos] * np.int32(cantidad_clases) + self._y[bloque].astype(np.int32)[:, None]
+            conteos += np.bincount(codigos.ravel(), minlength=tamano)
+
+        return conteos.reshape(cantidad_atributos, CANTIDAD_INTENSIDADES, cantidad_clases)
+
+    def _mejor_corte(self, histograma: np.ndarray) -> tuple:
+        """
+        Buscar el corte "x[a] <= t" que maximiza la reducción de impureza de Gini, recorriendo los histogramas acumulados.
+        Maximizar sum_c L_c^2 / n_L + sum_c R_c^2 / n_R equivale a minimizar la impureza ponderada de los hijos.
+
+        Parámetros:
+            histograma (np.ndarray): Tensor (atributos, 256, clases) del nodo.
+
+        Retorna:
+            tuple: (posición del atributo en el histograma, umbral), o None si ningún atributo separa las filas.
+        """
+
+        # Sólo se evalúan los umbrales t con algún valor igual a t en el nodo (los demás repiten la partición de un umbral anterior)
+        filas_por_valor = histograma.sum(axis=2)
+        atributos, valores = np.nonzero(filas_por_valor[:, :-1])
+        acumulado = np.cumsum(histograma, axis=1)
+        izquierda = acumulado[atributos, valores].astype(np.float64)
+        derecha = acumulado[atributos, -1] - izquierda
+        filas_izquierda = izquierda.sum(axis=1)
+        filas_derecha = derecha.sum(axis=1)
+
+        validos = filas_derecha > 0
+        if not validos.any():
+            return None
+        puntaje = np.einsum('kc,kc->k', izquierda, izquierda) / filas_izquierda
+        puntaje[validos] += np.einsum('kc,kc->k', derecha[validos], derecha[validos]) / filas_derecha[validos]
+        puntaje[~validos] = -np.inf
+
+        # np.argmax devuelve el primer máximo: ante empates, el atributo y el umbral menores (np.nonzero los recorre en ese orden).
+        # Como sklearn, se corta en el punto medio entre el valor elegido y el siguiente valor presente del atributo
+        mejor = np.argmax(puntaje)
+        atributo, valor = atributos[mejor], valores[mejor]
+        siguiente = valor + 1 + np.flatnonzero(filas_por_valor[atributo, valor + 1:])[0]
+        return int(atributo), int((valor + siguiente) // 2)
+
+    def _mejor_corte_ordenando(self, filas: np.ndarray, atributos: np.ndarray) -> tuple:
+        # Para nodos chicos, recorrer las filas ordenadas por cada atributo es más barato que recorrer los 256 valores del histograma.
+        # Mismo criterio (y mismo desempate) que _mejor_corte
+        valores = self._X[np.ix_(filas, atributos)]
+        orden = np.argsort(valores, axis=0, kind='stable')
+        valores = np.take_along_axis(valores, orden, axis=0)
+        una_clase = self._y[filas][orden][:, :, None] == np.arange(len(self.classes_))[None, None, :]
+
+        izquierda = np.cumsum(una_clase, axis=0, dtype=np.float64)
+        derecha = izquierda[-1][None, :, :] - izquierda[:-1]
+        izquierda = izquierda[:-1]
+        filas_izquierda = np.arange(1, len(filas))[:, None]
+        filas_derecha = len(filas) - filas_izquierda
+
+        # Sólo se puede cortar entre dos valores distintos
+        validos = valores[:-1] != valores[1:]
+        puntaje = np.einsum('iac,iac->ia', izquierda, izquierda) / filas_izquierda + np.einsum('iac,iac->ia', derecha, derecha) / filas_derecha
+        puntaje[~validos] = -np.inf
+
+        # Se recorre por atributo y luego por umbral creciente, para desempatar igual que _mejor_corte
+        posicion, fila = np.unravel_index(np.argmax(puntaje.T), puntaje.T.shape)
+        return int(posicion), (int(valores[fila, posicion]) + int(valores[fila + 1, posicion])) // 2
+
+    def _atributos_no_constantes(self, filas: np.ndarray) -> np.ndarray:
+        valores = self._X[filas]
+        return np.flatnonzero(valores.min(axis=0) != valores.max(axis=0))
+
+    def fit(self, X: np.ndarray, y: np.ndarray) -> 'ArbolHistogramas':
+        # Los histogramas recorren columnas de las filas de cada nodo, por lo que una entrada dispersa (CSR) se pasa a densa uint8
+        X = X.toarray() if sparse.issparse(X) else np.asarray(X)
+        if X.dtype != np.uint8:
+            if X.size and (X.min() < 0 or X.max() >= CANTIDAD_INTENSIDADES):
+                raise ValueError('ArbolHistogramas requiere atributos enteros entre 0 y 255')
+            X = X.astype(np.uint8)
+        self._X = np.ascontiguousarray(X)
+        self.classes_, self._y = np.unique(np.asarray(y), return_inverse=True)
+        profundidad_maxima = np.inf if self.max_depth is None else self.max_depth
+
+        atributo, umbral, izquierdo, derecho, conteos = [], [], [], [], []
+
+        def nuevo_nodo(filas):
+            atributo.append(-1)
+            umbral.append(0)
+            izquierdo.append(-1)
+            derecho.append(-1)
+            conteos.append(np.bincount(self._y[filas], minlength=len(self.classes_)))
+            return len(atributo) - 1
+
+        # Recorrido en profundidad: cada elemento es (nodo, filas, profundidad, atributos del histograma heredado, histograma heredado)
+        # Los nodos sin histograma heredado sólo consideran sus atributos no constantes, que en nodos chicos son muchos menos que 784
+        filas_raiz = np.arange(len(X))
+        pila = [(nuevo_nodo(filas_raiz), filas_raiz, 0, None, None)]
+        while pila:
+            nodo, filas, profundidad, atributos, histograma = pila.pop()
+            if profundidad >= profundidad_maxima or len(filas) < self.min_samples_split or np.count_nonzero(conteos[nodo]) <= 1:
+                continue
+
+            if histograma is None:
+                atributos = self._atributos_no_constantes(filas)
+                if len(atributos) == 0:
+                    continue
+                if len(filas) >= FILAS_MINIMAS_HISTOGRAMA:
+                    histograma = self._histograma(filas, atributos)
+            corte = self._mejor_corte(histograma) if histograma is not None else self._mejor_corte_ordenando(filas, atributos)
+            if corte is None:
+                continue
+            atributo[nodo], umbral[nodo] = int(atributos[corte[0]]), corte[1]
+
+            va_izquierda = self._X[filas, atributo[nodo]] <= umbral[nodo]
+            filas_izquierda, filas_derecha = filas[va_izquierda], filas[~va_izquierda]
+            izquierdo[nodo], derecho[nodo] = nuevo_nodo(filas_izquierda), nuevo_nodo(filas_derecha)
+
+            # Resta de hermanos: se calcula el histograma del hijo más chico, y el del más grande es el del padre menos ese.
+            # El hijo más chico se procesa primero (es el último en la pila), por lo que a lo sumo hay un histograma heredado por nivel
+            hijos = [(izquierdo[nodo], filas_izquierda), (derecho[nodo], filas_derecha)]
+            (chico, filas_chico), (grande, filas_grande) = sorted(hijos, key=lambda h: len(h[1]))
+            if histograma is not None and len(filas_grande) >= FILAS_MINIMAS_RESTA:
+                histograma -= self._histograma(filas_chico, atributos)
+                pila.append((grande, filas_grande, profundidad + 1, atributos, histograma))
+            else:
+                pila.append((grande, filas_grande, profundidad + 1, None, None))
+            pila.append((chico, filas_chico, profundidad + 1, None, None))
+
+        self.atributo = np.array(atributo, dtype=np.int32)
+        self.umbral = np.array(umbral, dtype=np.uint8)
+        self.izquierdo = np.array(izquierdo, dtype=np.int32)
+        self.derecho = np.array(derecho, dtype=np.int32)
+        self.conteos = np.array(conteos)
+        del self._X, self._y
+        return self
+
+    def get_depth(self) -> int:
+        profundidad = np.zeros(len(self.atributo), dtype=np.int64)
+        for nodo in range(len(self.atributo)):
+            if self.izquierdo[nodo] != -1:
+                profundidad[self.izquierdo[nodo]] = profundidad[self.derecho[nodo]] = profundidad[nodo] + 1
+        return int(profundidad.max())
+
+    def get_n_leaves(self) -> int:
+        return int(np.sum(self.izquierdo == -1))
+
+    def apply(self, X: np.ndarray) -> np.ndarray:
+        # Hoja a la que llega cada fila, avanzando todas las filas un nivel por iteración (comparaciones en uint8, sin pasar a float)
+        X = X.toarray() if sparse.issparse(X) else np.asarray(X)
+        filas = np.arange(len(X))
+        nodos = np.zeros(len(X), dtype=np.int32)
+        internos = filas[self.izquierdo[nodos] != -1]
+        while len(internos) > 0:
+            actuales = nodos[internos]
+            izquierda = X[internos, self.atributo[actuales]] <= self.umbral[actuales]
+            nodos[internos] = np.where(izquierda, self.izquierdo[actuales], self.derecho[actuales])
+            internos = internos[self.izquierdo[nodos[internos]] != -1]
+        return nodos
+
+    def predict(self, X: np.ndarray) -> np.ndarray:
+        # np.argmax devuelve la primera clase con más filas, es decir la menor (igual que DecisionTreeClassifier)
+        return self.classes_[np.argmax(self.conteos[self.apply(X)], axis=1)]
+
+
+def comparar_con_sklearn(x_entrenamiento: np.ndarray, y_entrenamiento: np.ndarray, x_prueba: np.ndarray, y_prueba: np.ndarray,
+                         profundidades: list = (1, 2, 3, 4, 5, 6, 7, 8, 9, 10, 15, 20, None)) -> list:
+    """
+    Comparar ArbolHistogramas contra DecisionTreeClassifier para cada profundidad máxima: tiempo de entrenamiento,
+    exactitud sobre prueba y proporción de predicciones coincidentes.
+
+    Parámetros:
+        x_entrenamiento (np.ndarray): Atributos de entrenamiento (uint8).
+        y_entrenamiento (np.ndarray): Etiquetas de entrenamiento.
+        x_prueba (np.ndarray): Atributos de prueba.
+        y_prueba (np.ndarray): Etiquetas de prueba.
+        profundidades (list): Profundidades máximas a comparar (None es sin límite).
+
+    Retorna:
+        list: Un diccionario de resultados por profundidad (también se imprimen por consola).
+    """
+
+    resultados = []
+    for profundidad in profundidades:
+        inicio = time.perf_counter()
+        sklearn = DecisionTreeClassifier(max_depth=profundidad, random_state=42).fit(x_entrenamiento, y_entrenamiento)
+        tiempo_sklearn = time.perf_counter() - inicio
+
+        inicio = time.perf_counter()
+        histogramas = ArbolHistogramas(max_depth=profundidad).fit(x_entrenamiento, y_entrenamiento)
+        tiempo_histogramas = time.perf_counter() - inicio
+
+        y_sklearn = sklearn.predict(x_prueba)
+        y_histogramas = histogramas.predict(x_prueba)
+        resultados.append({
+            'profundidad': profundidad,
+            'fit_sklearn': tiempo_sklearn,
+            'fit_histogramas': tiempo_histogramas,
+            'exactitud_sklearn': float(np.mean(y_sklearn == y_prueba)),
+            'exactitud_histogramas': float(np.mean(y_histogramas == y_prueba)),
+            'coincidencia': float(np.mean(y_sklearn == y_histogramas)),
+        })
+
+        r = resultados[-1]
+        print(f"Profundidad {profundidad}: DecisionTreeClassifier {r['fit_sklearn']:.2f} s (exactitud {r['exactitud_sklearn']:.4f}), "
+              f"ArbolHistogramas {r['fit_histogramas']:.2f} s (exactitud {r['exactitud_histogramas']:.4f}), coincidencia {r['coincidencia']:.4f}")
+    return resultados
@@ -0,0 +1,172 @@
+'''
+    Autores:
+    - Alvarez, Matías
+    - Dumas, Román
+    - Nogueroles, Patricio
+
+    Archivo que define ArbolPlano, un árbol de decisión ya entrenado guardado como arreglos planos de numpy:
+        - atributo: pixel que consulta cada nodo
+        - umbral: umbral uint8 de cada nodo (las filas con x[atributo] <= umbral van al hijo izquierdo)
+        - hijos: matriz (nodos, 2) con el hijo izquierdo y el derecho de cada nodo
+        - clase: clase predicha en cada nodo (la mayoritaria entre las filas de train que llegan a él)
+
+    Para predecir se avanzan todas las filas un nivel por iteración, comparando directamente los pixeles uint8 (sin pasar a float).
+    Las hojas apuntan a sí mismas, por lo que no hace falta separar las filas que ya llegaron a una hoja: alcanza con iterar
+    tantas veces como la profundidad del árbol.
+
+    Los arreglos se guardan en un único archivo .npz, que se carga sin importar sklearn.
+
+    Modo de uso:
+        plano = ArbolPlano.desde_modelo(modelo)     # modelo: DecisionTreeClassifier o ArbolHistogramas ya entrenado
+        plano.guardar('arbol.npz')
+        Y_predict = ArbolPlano.cargar('arbol.npz').predict(X_test)
+'''
+
+import time
+
+import numpy as np
+from scipy import sparse
+
+CANTIDAD_INTENSIDADES = 256
+
+
+class ArbolPlano:
+    """
+    Árbol de decisión entrenado, representado con arreglos planos.
+
+    Atributos:
+        atributo (np.ndarray): Atributo de cada nodo (int32).
+        umbral (np.ndarray): Umbral de cada nodo (uint8).
+        hijos (np.ndarray): Matriz (nodos, 2) int32 con los hijos izquierdo y derecho. Las hojas son sus propios hijos.
+        clase (np.ndarray): Índice (en clases) de la clase predicha en cada nodo.
+        clases (np.ndarray): Clases ordenadas de menor a mayor.
+        profundidad (int): Profundidad del árbol (cantidad de iteraciones para llegar a cualquier hoja).
+    """
+
+    def __init__(self, atributo: np.ndarray, umbral: np.ndarray, hijos: np.ndarray, clase: np.ndarray, clases: np.ndarray, profundidad: int,
+                 filas_por_bloque: int = 65536):
+        self.atributo = atributo
+        self.umbral = umbral
+        self.hijos = hijos
+        self.clase = clase
+        self.clases = clases
+        self.profundidad = profundidad
+        self.filas_por_bloque = filas_por_bloque
+
+    @classmethod
+    def desde_arreglos(cls, atributo: np.ndarray, umbral: np.ndarray, izquierdo: np.ndarray, derecho: np.ndarray,
+                       conteos: np.ndarray, clases: np.ndarray) -> 'ArbolPlano':
+        """
+        Construir el árbol plano a partir de los arreglos por nodo (con la raíz en el nodo 0 y -1 como hijo de las hojas).
+
+        Parámetros:
+            atributo (np.ndarray): Atributo de cada nodo.
+            umbral (np.ndarray): Umbral entero de cada nodo (x <= umbral va a la izquierda).
+            izquierdo, derecho (np.ndarray): Hijos de cada nodo (-1 en las hojas).
+            conteos (np.ndarray): Matriz (nodos, clases) con la cantidad (o proporción) de filas de cada clase en cada nodo.
+            clases (np.ndarray): Clases ordenadas de menor a mayor.
+
+        Retorna:
+            ArbolPlano: El árbol plano.
+        """
+
+        nodos = np.arange(len(atributo))
+        hojas = np.asarray(izquierdo) == -1
+
+        # Las hojas consultan el atributo 0 y tienen umbral 255, por lo que toda fila "va a la izquierda", que es la misma hoja
+        hijos = np.stack([np.where(hojas, nodos, izquierdo), np.where(hojas, nodos, derecho)], axis=1).astype(np.int32)
+        atributo = np.where(hojas, 0, atributo).astype(np.int32)
+        umbral = np.where(hojas, CANTIDAD_INTENSIDADES - 1, umbral).astype(np.uint8)
+
+        # Profundidad de cada nodo (los hijos siempre tienen índice mayor que el padre)
+        profundidad_nodo = np.zeros(len(nodos), dtype=np.int64)
+        for nodo in nodos[~hojas]:
+            profundidad_nodo[hijos[nodo]] = profundidad_nodo[nodo] + 1
+
+        # np.argmax devuelve la primera clase con más filas, es decir la menor (igual que DecisionTreeClassifier)
+        clase = np.argmax(conteos, axis=1).astype(np.min_scalar_type(len(clases)))
+        return cls(atributo, umbral, hijos, clase, np.asarray(clases), int(profundidad_nodo.max()))
+
+    @classmethod
+    def desde_modelo(cls, modelo) -> 'ArbolPlano':
+        """
+        Exportar un árbol entrenado (DecisionTreeClassifier o ArbolHistogramas) a arreglos planos.
+        Los umbrales de sklearn son float (del tipo v + 0.5); para valores enteros, x <= t equivale a x <= floor(t).
+
+        Parámetros:
+            modelo: DecisionTreeClassifier o ArbolHistogramas ya entrenado, sobre pixeles entre 0 y 255.
+
+        Retorna:
+            ArbolPlano: El árbol plano.
+        """
+
+        if hasattr(modelo, 'tree_'):
+            arbol = modelo.tree_
+            umbral = np.clip(np.floor(arbol.threshold), 0, CANTIDAD_INTENSIDADES - 1)
+            return cls.desde_arreglos(arbol.feature, umbral, arbol.children_left, arbol.children_right, arbol.value[:, 0, :], modelo.classes_)
+        return cls.desde_arreglos(modelo.atributo, modelo.umbral, modelo.izquierdo, modelo.derecho, modelo.conteos, modelo.classes_)
+
+    def guardar(self, ruta: str) -> None:
+        np.savez(ruta, atributo=self.atributo, umbral=self.umbral, hijos=self.hijos, clase=self.clase, clases=self.clases,
+                 profundidad=np.array(self.profundidad))
+
+    @classmethod
+    def cargar(cls, ruta: str) -> 'ArbolPlano':
+        with np.load(ruta, allow_pickle=False) as archivo:
+            return cls(archivo['atributo'], archivo['umbral'], archivo['hijos'], archivo['clase'], archivo['clases'], int(archivo['profundidad']))
+
+    def apply(self, X: np.ndarray) -> np.ndarray:
+        # Hoja a la que llega cada fila, procesando las filas de a bloques (para que cada bloque entre en la caché)
+        # Una entrada dispersa (CSR) se pasa a densa de a un bloque por vez
+        X = X if sparse.issparse(X) else np.asarray(X)
+        hojas = np.empty(X.shape[0], dtype=np.int32)
+        for inicio in range(0, X.shape[0], self.filas_por_bloque):
+            bloque = X[inicio:inicio + self.filas_por_bloque]
+            bloque = bloque.toarray() if sparse.issparse(bloque) else bloque
+            filas = np.arange(len(bloque))
+            nodos = np.zeros(len(bloque), dtype=np.int32)
+            for _ in range(self.profundidad):
+                derecha = bloque[filas, self.atributo[nodos]] > self.umbral[nodos]
+                nodos = self.hijos[nodos, derecha.view(np.uint8)]
+            hojas[inicio:inicio + len(bloque)] = nodos
+        return hojas
+
+    def predict(self, X: np.ndarray) -> np.ndarray:
+        return self.clases[self.clase[self.apply(X)]]
+
+
+def comparar_con_sklearn(modelo, X: np.ndarray, repeticiones: int = 3) -> dict:
+    """
+    Comparar la predicción del modelo original contra la de su versión plana: predicciones por segundo y coincidencia.
+
+    Parámetros:
+        modelo: DecisionTreeClassifier o ArbolHistogramas ya entrenado.
+        X (np.ndarray): Matriz (filas, 784) de pixeles uint8 a predecir.
+        repeticiones (int): Se toma el menor tiempo entre varias repeticiones.
+
+    Retorna:
+        dict: Resultados de la comparación (también se imprimen por consola).
+    """
+
+    def medir(predictor):
+        tiempos = []
+        for _ in range(repeticiones):
+            inicio = time.perf_counter()
+            predicciones = predictor.predict(X)
+            tiempos.append(time.perf_counter() - inicio)
+        return min(tiempos), predicciones
+
+    plano = ArbolPlano.desde_modelo(modelo)
+    tiempo_modelo, y_modelo = medir(modelo)
+    tiempo_plano, y_plano = medir(plano)
+
+    resultado = {
+        'filas': len(X),
+        'predicciones_por_segundo_modelo': len(X) / tiempo_modelo,
+        'predicciones_por_segundo_plano': len(X) / tiempo_plano,
+        'coincidencia': float(np.mean(y_modelo == y_plano)),
+    }
+    print(f"{type(modelo).__name__}: {resultado['predicciones_por_segundo_modelo']:,.0f} predicciones por segundo")
+    print(f"ArbolPlano: {resultado['predicciones_por_segundo_plano']:,.0f} predicciones por segundo")
+    print(f"Coincidencia de predicciones: {resultado['coincidencia']:.4f}")
+    return resultado
@@ -0,0 +1,225 @@
+'''
+    Autores:
+    - Alvarez, Matías
+    - Dumas, Román
+    - Nogueroles, Patricio
+
+    Archivo encargado de evaluar árboles de decisión de distintas profundidades máximas (ejercicio 3).
+    Los métodos principales son barrido_profundidades(...) y validacion_cruzada_por_profundidad(...)
+
+    Por defecto se ajusta un árbol con cada max_depth, y los resultados son los mismos que ajustando cada árbol por separado.
+    Opcionalmente (cortar_arbol = True) se ajusta un único árbol con la profundidad máxima del rango y, para predecir con
+    profundidad d, se recorre el árbol deteniéndose en el nivel d: barrer las profundidades 1 a 10 con validación cruzada
+    de 5 folds requiere 5 ajustes en lugar de 50. Es una aproximación, no un atajo equivalente (ver la aclaración al final).
+
+    La validación cruzada puede repartirse entre varios procesos (procesos > 1, ver iterar_validacion_cruzada(...)): la matriz de atributos
+    se ubica una única vez en memoria compartida como uint8, y las exactitudes de cada celda (profundidad, fold) se devuelven
+    a medida que terminan.
+
+    Aclaración: el árbol profundo cortado en el nivel d no es, en general, el árbol ajustado con max_depth = d. sklearn recorre los
+    atributos de cada nodo en un orden aleatorio, tomado de un único generador que avanza con cada nodo que divide. El árbol profundo
+    también divide los nodos del nivel d (que con max_depth = d son hojas), por lo que los nodos que construye después reciben otro
+    orden de atributos y pueden elegir otros cortes (no sólo ante empates de impureza). La coincidencia entre ambos tiende a bajar
+    con la profundidad, por lo que los promedios de validación cruzada cambian y la mejor profundidad puede ser otra.
+    verificar_contra_max_depth(...) mide la coincidencia para cada profundidad sobre los datos que se le pasen.
+'''
+
+import os
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from multiprocessing import shared_memory
+
+import numpy as np
+from sklearn.model_selection import StratifiedKFold
+from sklearn.tree import DecisionTreeClassifier
+
+# Datos de la validación cruzada compartidos por los procesos del pool (se asignan una vez por proceso en _inicializar_proceso)
+_datos = None
+
+
+def predecir_por_profundidad(modelo: DecisionTreeClassifier, X: np.ndarray, profundidades: list) -> np.ndarray:
+    """
+    Predecir con el árbol cortado en cada una de las profundidades dadas, recorriéndolo nivel por nivel para todas las filas a la vez.
+
+    Parámetros:
+        modelo (DecisionTreeClassifier): Árbol ya ajustado.
+        X (np.ndarray): Matriz (filas, atributos).
+        profundidades (list): Profundidades en las que se corta el árbol.
+
+    Retorna:
+        np.ndarray: Matriz (len(profundidades), filas) de predicciones.
+    """
+
+    arbol = modelo.tree_
+    # sklearn compara los atributos como float32 contra umbrales float64 (con valores uint8 los umbrales son del tipo v + 0.5)
+    X = np.asarray(X, dtype=np.float32)
+    filas = np.arange(len(X))
+    clase_nodo = modelo.classes_[np.argmax(arbol.value[:, 0, :], axis=1)]
+
+    nodos = np.zeros(len(X), dtype=np.int64)
+    prediccion_nivel = [clase_nodo[nodos]]
+    for _ in range(max(profundidades)):
+        internos = arbol.children_left[nodos] != -1
+        if not internos.any():
+            break
+        izquierda = X[filas, arbol.feature[nodos]] <= arbol.threshold[nodos]
+        nodos = np.where(internos, np.where(izquierda, arbol.children_left[nodos], arbol.children_right[nodos]), nodos)
+        prediccion_nivel.append(clase_nodo[nodos])
+
+    # Si el árbol es menos profundo que d, cortarlo en d es el árbol completo
+    return np.stack([prediccion_nivel[min(d, len(prediccion_nivel) - 1)] for d in profundidades])
+
+
+def barrido_profundidades(x_entrenamiento: np.ndarray, y_entrenamiento: np.ndarray, x_prueba: np.ndarray, y_prueba: np.ndarray,
+                          profundidades: list, random_state: int = 42, cortar_arbol: bool = False) -> np.ndarray:
+    """
+    Calcular la exactitud sobre prueba de los árboles de cada profundidad máxima.
+
+    Parámetros:
+        x_entrenamiento (np.ndarray): Atributos de entrenamiento.
+        y_entrenamiento (np.ndarray): Etiquetas de entrenamiento.
+        x_prueba (np.ndarray): Atributos de prueba.
+        y_prueba (np.ndarray): Etiquetas de prueba.
+        profundidades (list): Profundidades máximas a evaluar.
+        random_state (int): Semilla de los árboles.
+        cortar_arbol (bool): Si se ajusta un único árbol y se lo corta en cada profundidad (True, aproximado) o un árbol por profundidad (False).
+
+    Retorna:
+        np.ndarray: Exactitud para cada profundidad, en el orden de profundidades.
+    """
+
+    if cortar_arbol:
+        modelo = DecisionTreeClassifier(max_depth=max(profundidades), random_state=random_state)
+        modelo.fit(x_entrenamiento, y_entrenamiento)
+        predicciones = predecir_por_profundidad(modelo, x_prueba, profundidades)
+    else:
+        predicciones = np.stack([DecisionTreeClassifier(max_depth=d, random_state=random_state).fit(x_entrenamiento, y_entrenamiento).predict(x_prueba)
+                                 for d in profundidades])
+    return (predicciones == np.asarray(y_prueba)[None, :]).mean(axis=1)
+
+
+def _inicializar_proceso(nombre_memoria: str, forma: tuple, y: np.ndarray, folds: list, random_state: int):
+    # Cada proceso accede a la matriz de atributos en memoria compartida (uint8), sin recibir una copia
+    global _datos
+    memoria = shared_memory.SharedMemory(name=nombre_memoria)
+    x = np.ndarray(forma, dtype=np.uint8, buffer=memoria.buf)
+    _datos = (memoria, x, y, folds, random_state)
+
+
+def _evaluar_celda(fold: int, profundidades: list, cortar_arbol: bool) -> list:
+    # Tarea de cada proceso: exactitud en un fold para una o varias profundidades. Devuelve la lista de (profundidad, fold, exactitud)
+    _, x, y, folds, random_state = _datos
+    indices_train, indices_test = folds[fold]
+    if cortar_arbol:
+        exactitudes = barrido_profundidades(x[indices_train], y[indices_train], x[indices_test], y[indices_test], profundidades, random_state, cortar_arbol=True)
+    else:
+        modelo = DecisionTreeClassifier(max_depth=profundidades[0], random_state=random_state).fit(x[indices_train], y[indices_train])
+        exactitudes = [np.mean(modelo.predict(x[indices_test]) == y[indices_test])]
+    return [(d, fold, float(e)) for d, e in zip(profundidades, exactitudes)]
+
+
+def iterar_validacion_cruzada(x: np.ndarray, y: np.ndarray, profundidades: list, cv: int = 5, random_state: int = 42,
+                              procesos: int = 1, cortar_arbol: bool = False):
+    """
+    Ejecutar la validación cruzada de árboles de cada profundidad máxima, devolviendo la exactitud de cada celda (profundidad, fold)
+    a medida que se termina de calcular. Los folds son los mismos que usa cross_val_score(..., cv=cv) con un clasificador
+    (StratifiedKFold sin mezclar).
+        - Por defecto, cada celda (profundidad, fold) es una tarea que ajusta su propio árbol con esa max_depth
+          (len(profundidades) * cv tareas). Las exactitudes son exactamente las de cross_val_score.
+        - Si cortar_arbol es True, cada tarea ajusta un único árbol por fold y lo corta en todas las profundidades (cv tareas).
+          Es más rápido, pero aproximado (ver la aclaración al comienzo del archivo).
+    Con varios procesos, la matriz de atributos se copia una única vez a memoria compartida como uint8. Los procesos del pool importan
+    el módulo principal (con el método spawn, el de Windows y macOS), por lo que el script que llama debe estar protegido por
+    if __name__ == '__main__'.
+
+    Parámetros:
+        x (np.ndarray): Atributos (pixeles entre 0 y 255).
+        y (np.ndarray): Etiquetas.
+        profundidades (list): Profundidades máximas a evaluar.
+        cv (int): Cantidad de folds.
+        random_state (int): Semilla de los árboles.
+        procesos (int, opcional): Cantidad de procesos (por defecto, el proceso actual). Si es None, se usa la cantidad de CPUs.
+        cortar_arbol (bool): Si se ajusta un árbol por fold (True, aproximado) o uno por celda (False).
+
+    Retorna:
+        Generador de tuplas (profundidad, fold, exactitud), en el orden en que terminan.
+    """
+
+    procesos = procesos or os.cpu_count() or 1
+    y = np.asarray(y)
+    folds = list(StratifiedKFold(n_splits=cv).split(np.zeros(len(y)), y))
+    if cortar_arbol:
+        tareas = [(fold, list(profundidades)) for fold in range(cv)]
+    else:
+        # Las celdas más profundas (las que más tardan) se ejecutan primero, para repartir mejor la carga entre los procesos
+        tareas = [(fold, [d]) for d in sorted(profundidades, reverse=True) for fold in range(cv)]
+
+    if procesos == 1:
+        global _datos
+        _datos = (None, np.asarray(x), y, folds, random_state)
+        for fold, profundidades_tarea in tareas:
+            yield from _evaluar_celda(fold, profundidades_tarea, cortar_arbol)
+        return
+
+    memoria = shared_memory.SharedMemory(create=True, size=max(1, x.shape[0] * x.shape[1]))
+    try:
+        np.ndarray(x.shape, dtype=np.uint8, buffer=memoria.buf)[:] = x
+        with ProcessPoolExecutor(max_workers=procesos, initializer=_inicializar_proceso,
+                                 initargs=(memoria.name, x.shape, y, folds, random_state)) as pool:
+            futuros = [pool.submit(_evaluar_celda, fold, profundidades_tarea, cortar_arbol) for fold, profundidades_tarea in tareas]
+            for futuro in as_completed(futuros):
+                yield from futuro.result()
+    finally:
+        memoria.close()
+        memoria.unlink()
+
+
+def validacion_cruzada_por_profundidad(x: np.ndarray, y: np.ndarray, profundidades: list, cv: int = 5, random_state: int = 42,
+                                       procesos: int = 1, cortar_arbol: bool = False) -> np.ndarray:
+    """
+    Validación cruzada de árboles de cada profundidad máxima (ver iterar_validacion_cruzada(...)).
+
+    Parámetros:
+        x (np.ndarray): Atributos.
+        y (np.ndarray): Etiquetas.
+        profundidades (list): Profundidades máximas a evaluar.
+        cv (int): Cantidad de folds.
+        random_state (int): Semilla de los árboles.
+        procesos (int, opcional): Cantidad de procesos (por defecto, el proceso actual). Si es None, se usa la cantidad de CPUs.
+        cortar_arbol (bool): Si se ajusta un árbol por fold (True, aproximado) o uno por celda (False).
+
+    Retorna:
+        np.ndarray: Matriz (cv, len(profundidades)) con la exactitud de cada fold y profundidad.
+    """
+
+    profundidades = list(profundidades)
+    puntuaciones = np.zeros((cv, len(profundidades)))
+    for profundidad, fold, exactitud in iterar_validacion_cruzada(x, y, profundidades, cv, random_state, procesos, cortar_arbol):
+        puntuaciones[fold, profundidades.index(profundidad)] = exactitud
+    return puntuaciones
+
+
+def verificar_contra_max_depth(x_entrenamiento: np.ndarray, y_entrenamiento: np.ndarray, x_prueba: np.ndarray,
+                               profundidades: list, random_state: int = 42) -> list:
+    """
+    Comparar las predicciones del árbol cortado en cada profundidad con las de un árbol ajustado con esa max_depth.
+
+    Parámetros:
+        x_entrenamiento (np.ndarray): Atributos de entrenamiento.
+        y_entrenamiento (np.ndarray): Etiquetas de entrenamiento.
+        x_prueba (np.ndarray): Atributos de prueba.
+        profundidades (list): Profundidades máximas a comparar.
+        random_state (int): Semilla de los árboles.
+
+    Retorna:
+        list: Proporción de predicciones coincidentes para cada profundidad (1.0 si coinciden todas).
+    """
+
+    modelo = DecisionTreeClassifier(max_depth=max(profundidades), random_state=random_state).fit(x_entrenamiento, y_entrenamiento)
+    cortadas = predecir_por_profundidad(modelo, x_prueba, profundidades)
+
+    coincidencias = []
+    for d, prediccion in zip(profundidades, cortadas):
+        separado = DecisionTreeClassifier(max_depth=d, random_state=random_state).fit(x_entrenamiento, y_entrenamiento)
+        coincidencias.append(float(np.mean(separado.predict(x_prueba) == prediccion)))
+        print(f"Profundidad {d}: coincidencia entre árbol cortado y ajustado por separado {coincidencias[-1]:.4f}")
+    return coincidencias
@@ -0,0 +1,188 @@
+'''
+    Autores:
+    - Alvarez, Matías
+    - Dumas, Román
+    - Nogueroles, Patricio
+
+    Archivo encargado de evaluar KNN sobre conjuntos acumulativos de atributos (ejercicios 2.C y 2.D) sin reentrenar un modelo por conjunto.
+    El método principal es barrido_knn_incremental(...)
+
+    Como cada conjunto de atributos es el anterior más un pixel, se mantiene la matriz de distancias al cuadrado entre las filas
+    de test y las de train y, en cada paso, sólo se le suma la contribución del nuevo pixel. Luego, con una única selección parcial
+    de los max(k_list) vecinos más cercanos, se obtienen los votos para todos los K a partir de conteos acumulados por clase.
+
+    Como KNeighborsClassifier, se usa la distancia euclídea con pesos uniformes y los empates de votos se resuelven a favor de la clase menor.
+    Los empates en distancia en el K-ésimo vecino, en cambio, se resuelven distinto: la selección parcial toma las filas empatadas de menor
+    índice, mientras que KNeighborsClassifier toma las que encuentra primero al recorrer su estructura de búsqueda (un kd_tree para pocos
+    atributos), en un orden que no se puede reproducir. Con pocos atributos uint8 esos empates son muy frecuentes, por lo que, para que
+    las exactitudes sean las de KNeighborsClassifier, cada fila de test se certifica o se delega:
+        - Con la matriz de distancias se cuentan, por clase, los votos de las filas de train más cercanas que el K-ésimo vecino (que
+          KNeighborsClassifier siempre incluye) y las filas empatadas con él (de las que incluye sólo las que faltan para llegar a K).
+        - Si la clase ganadora es la misma sin importar qué filas empatadas se tomen (ver votacion_con_empates(...)), la predicción
+          coincide con la de KNeighborsClassifier y se usa directamente.
+        - Las demás filas se predicen con KNeighborsClassifier entrenado con los mismos atributos y el mismo K.
+    Así, las exactitudes son exactamente las de KNeighborsClassifier, y sólo se le delegan las filas cuyo resultado depende del
+    desempate (con los 784 pixeles, prácticamente ninguna).
+'''
+
+import numpy as np
+from sklearn.neighbors import KNeighborsClassifier
+
+
+'''
+    Funciones auxiliares
+'''
+
+def sumar_pixel(distancias: np.ndarray, columna_test: np.ndarray, columna_train: np.ndarray) -> None:
+    # Suma, en el lugar, la contribución (a - b)^2 de un pixel a la matriz de distancias al cuadrado (test x train)
+    diferencias = columna_test.astype(np.int64)[:, None] - columna_train.astype(np.int64)[None, :]
+    distancias += diferencias * diferencias
+
+
+def vecinos_mas_cercanos(distancias: np.ndarray, k: int) -> np.ndarray:
+    """
+    Obtener, para cada fila de test, los índices de sus k vecinos más cercanos ordenados por distancia.
+    La distancia se combina con el índice de train en una única clave entera, de modo que la selección parcial
+    (np.argpartition) no depende de cómo se rompen los empates.
+
+    Parámetros:
+        distancias (np.ndarray): Matriz (test, train) de distancias al cuadrado, entera.
+        k (int): Cantidad de vecinos.
+
+    Retorna:
+        np.ndarray: Matriz (test, k) de índices de train.
+    """
+
+    cantidad_train = distancias.shape[1]
+    claves = distancias.astype(np.int64) * cantidad_train + np.arange(cantidad_train, dtype=np.int64)[None, :]
+
+    if k < cantidad_train:
+        candidatos = np.argpartition(claves, k - 1, axis=1)[:, :k]
+    else:
+        candidatos = np.broadcast_to(np.arange(cantidad_train), claves.shape)
+    orden = np.argsort(np.take_along_axis(claves, candidatos, axis=1), axis=1)
+    return np.take_along_axis(candidatos, orden, axis=1)
+
+
+def predecir_para_cada_k(etiquetas_vecinos: np.ndarray, k_list: list, clases: np.ndarray) -> np.ndarray:
+    """
+    Calcular la predicción de KNN para cada K a partir de las etiquetas de los vecinos ordenados por distancia.
+    Se acumulan los votos por clase a lo largo de los vecinos, por lo que el voto con K vecinos es la fila K-1 del acumulado.
+
+    Parámetros:
+        etiquetas_vecinos (np.ndarray): Matriz (test, max(k_list)) con el índice de clase (en clases) de cada vecino.
+        k_list (list): Valores de K.
+        clases (np.ndarray): Clases ordenadas de menor a mayor.
+
+    Retorna:
+        np.ndarray: Matriz (len(k_list), test) de predicciones.
+    """
+
+    votos_acumulados = np.cumsum(etiquetas_vecinos[:, :, None] == np.arange(len(clases))[None, None, :], axis=1, dtype=np.int32)
+    # np.argmax devuelve la primera clase con más votos, es decir la menor (igual que KNeighborsClassifier ante empates de votos)
+    return np.stack([clases[np.argmax(votos_acumulados[:, k - 1, :], axis=1)] for k in k_list])
+
+
+def votos_alrededor_del_k_esimo(distancias: np.ndarray, distancia_k: np.ndarray, pesos: np.ndarray) -> tuple:
+    """
+    Contar, por clase, los votos de las filas de train más cercanas que el K-ésimo vecino y los de las filas empatadas con él.
+
+    Parámetros:
+        distancias (np.ndarray): Matriz (test, train) de distancias (al cuadrado) exactas.
+        distancia_k (np.ndarray): Distancia de cada fila de test a su K-ésimo vecino.
+        pesos (np.ndarray): Matriz (train, clases) con la cantidad de filas de cada clase que representa cada fila de train
+            (una fila con un 1 en su clase; en KNNPonderado, los conteos de cada punto único).
+
+    Retorna:
+        tuple: (matriz (test, clases) de votos de las filas más cercanas, matriz (test, clases) de votos de las filas empatadas).
+    """
+
+    # Los conteos son enteros chicos, por lo que el producto en float32 es exacto
+    pesos = np.asarray(pesos, dtype=np.float32)
+    cercanas = (distancias < distancia_k[:, None]).astype(np.float32) @ pesos
+    empatadas = (distancias == distancia_k[:, None]).astype(np.float32) @ pesos
+    return cercanas.astype(np.int64), empatadas.astype(np.int64)
+
+
+def votacion_con_empates(votos_cercanos: np.ndarray, votos_empatados: np.ndarray, k: int) -> tuple:
+    """
+    Determinar la clase ganadora de KNN cuando los vecinos empatados con el K-ésimo pueden tomarse en cualquier orden.
+    De las filas empatadas se toman las m = K - (votos cercanos) que faltan, por lo que cada clase c recibe entre
+    cercanos_c + max(0, m - (empatadas de otras clases)) y cercanos_c + min(empatadas_c, m) votos. La ganadora está asegurada
+    si su mínimo supera el máximo de cada otra clase (o lo iguala y es menor, ya que los empates de votos son a favor de la clase menor).
+
+    Parámetros:
+        votos_cercanos (np.ndarray): Matriz (test, clases) de votos de las filas más cercanas que el K-ésimo vecino.
+        votos_empatados (np.ndarray): Matriz (test, clases) de votos de las filas empatadas con el K-ésimo vecino.
+        k (int): Cantidad de vecinos.
+
+    Retorna:
+        tuple: (índice (en clases) de la clase ganadora de cada fila, vector booleano con True en las filas cuya ganadora está asegurada).
+    """
+
+    faltantes = (k - votos_cercanos.sum(axis=1))[:, None]
+    total_empatadas = votos_empatados.sum(axis=1)[:, None]
+    minimos = votos_cercanos + np.maximum(0, faltantes - (total_empatadas - votos_empatados))
+    maximos = votos_cercanos + np.minimum(votos_empatados, faltantes)
+
+    ganadora = np.argmax(minimos, axis=1)
+    filas = np.arange(len(ganadora))
+    minimo_ganadora = minimos[filas, ganadora][:, None]
+    clases = np.arange(votos_cercanos.shape[1])[None, :]
+    supera = (minimo_ganadora > maximos) | ((minimo_ganadora == maximos) & (ganadora[:, None] < clases)) | (clases == ganadora[:, None])
+    return ganadora, supera.all(axis=1)
+
+
+'''
+    Función principal
+'''
+
+def barrido_knn_incremental(x_train: np.ndarray, y_train: np.ndarray, x_test: np.ndarray, y_test: np.ndarray,
+                            k_list: list, filas_por_bloque: int = 1024) -> np.ndarray:
+    """
+    Calcular la exactitud de KNeighborsClassifier para cada prefijo de atributos (columnas 0, 0..1, 0..2, ...) y cada K, en una única pasada.
+
+    Parámetros:
+        x_train (np.ndarray): Matriz (train, atributos) con los atributos en el orden en que se agregan.
+        y_train (np.ndarray): Etiquetas de train.
+        x_test (np.ndarray): Matriz (test, atributos).
+        y_test (np.ndarray): Etiquetas de test.
+        k_list (list): Valores de K a evaluar.
+        filas_por_bloque (int): Cantidad de filas de test procesadas a la vez (acota la memoria de la matriz de distancias).
+
+    Retorna:
+        np.ndarray: Matriz (atributos, len(k_list)) de exactitudes; la fila i corresponde a usar los primeros i+1 atributos.
+    """
+
+    x_train = np.asarray(x_train)
+    y_train = np.asarray(y_train)
+    clases, indices_train = np.unique(y_train, return_inverse=True)
+    pesos = indices_train[:, None] == np.arange(len(clases))[None, :]
+    k_maximo = min(max(k_list), len(y_train))
+    cantidad_atributos = x_train.shape[1]
+    aciertos = np.zeros((cantidad_atributos, len(k_list)), dtype=np.int64)
+    # Modelos de KNeighborsClassifier para las filas cuya votación depende del desempate, entrenados sólo si hacen falta
+    modelos = {}
+
+    for inicio in range(0, len(y_test), filas_por_bloque):
+        bloque_test = x_test[inicio:inicio + filas_por_bloque]
+        etiquetas_bloque = y_test[inicio:inicio + filas_por_bloque]
+        distancias = np.zeros((len(bloque_test), len(y_train)), dtype=np.int64)
+
+        for atributo in range(cantidad_atributos):
+            sumar_pixel(distancias, bloque_test[:, atributo], x_train[:, atributo])
+            vecinos = vecinos_mas_cercanos(distancias, k_maximo)
+            for j, k in enumerate(k_list):
+                k = min(k, k_maximo)
+                distancia_k = np.take_along_axis(distancias, vecinos[:, k - 1:k], axis=1)[:, 0]
+                ganadora, asegurada = votacion_con_empates(*votos_alrededor_del_k_esimo(distancias, distancia_k, pesos), k)
+                predicciones = clases[ganadora]
+
+                delegadas = np.flatnonzero(~asegurada)
+                if len(delegadas) > 0:
+                    if (atributo, k) not in modelos:
+                        modelos[(atributo, k)] = KNeighborsClassifier(n_neighbors = k).fit(x_train[:, :atributo + 1], y_train)
+                    predicciones[delegadas] = modelos[(atributo, k)].predict(bloque_test[delegadas, :atributo + 1])
+                aciertos[atributo, j] += (predicciones == etiquetas_bloque).sum()
+
+    return aciertos / len(y_test)
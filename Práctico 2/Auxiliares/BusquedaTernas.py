@@ -0,0 +1,336 @@
+'''
+    Autores:
+    - Alvarez, Matías
+    - Dumas, Román
+    - Nogueroles, Patricio
+
+    Archivo encargado de buscar las ternas de pixeles con las que KNN mejor distingue los ceros de los unos (ejercicio 2.C).
+    El método principal es buscar_ternas(...), que devuelve las mejores ternas en el mismo formato que las tuplas t1, t2 y t3
+    de ClasificacionBinaria.py: (x_1, y_1, x_2, y_2, x_3, y_3).
+
+    Para no elegir las ternas mirando test, cada terna se evalúa sobre una validación separada de train (un 20%, estratificado y con
+    la misma semilla que el resto del trabajo), entrenando con el 80% restante. Test queda para evaluar las ternas elegidas.
+
+    Hay C(784, 3), unas 80 millones de ternas, por lo que:
+        - Primero se descartan los pixeles constantes (el borde de la imagen, que vale 0 en todas las filas), ya que no aportan a la distancia
+        - Se evalúan todas las ternas restantes, o una muestra estratificada en la que cada pixel aparece en la misma cantidad de ternas
+        - Las ternas se evalúan de a lotes, sin entrenar un modelo por terna (ver _votar_lote(...)). Con 3 pixeles uint8 hay pocos
+          valores distintos (el fondo es 0), por lo que las filas de train y de validación se agrupan en puntos únicos con un conteo
+          por clase, como en Auxiliares/KNNPonderado.py, y las distancias entre puntos únicos de todas las ternas del lote se calculan
+          juntas, en una pila (lote, validación, train)
+        - Opcionalmente, los bloques de ternas se reparten entre varios procesos, y cada proceso devuelve sólo las mejores de su bloque
+    La exactitud de cada terna es la de KNeighborsClassifier entrenado con esos tres pixeles, como en Auxiliares/BarridoKNN.py:
+    la votación de cada punto de validación se certifica si no depende de qué filas empatadas con el K-ésimo vecino se tomen. Los
+    puntos no certificados (por ejemplo, el fondo (0, 0, 0), empatado con muchas filas de ambas clases) sólo se predicen con
+    KNeighborsClassifier en las ternas que todavía pueden quedar entre las mejores (ver _evaluar_bloque(...)). Así el ranking de
+    las ternas es el mismo que el de las exactitudes en test, que también se miden con KNeighborsClassifier.
+    El costo de cada terna es proporcional a (puntos únicos de validación) x (puntos únicos de train), mucho menor que el de las filas.
+    buscar_ternas(...) imprime cuántas ternas por segundo evaluó, lo que permite estimar lo que tardaría la búsqueda exhaustiva.
+
+    Modo de uso:
+        mejores = buscar_ternas(train, cantidad_muestras = 2000)
+        for exactitud_validacion, tupla in mejores: ...
+'''
+
+import heapq
+import itertools
+import math
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+from sklearn.model_selection import train_test_split
+from sklearn.neighbors import KNeighborsClassifier
+
+from Auxiliares.CargaDatos import TMNISTDataset, LADO_IMAGEN
+from Auxiliares.BarridoKNN import votacion_con_empates
+
+# Datos de entrenamiento y validación compartidos por los procesos del pool (se asignan una vez por proceso en _inicializar_proceso)
+_datos = None
+
+# Distancia al cuadrado que se suma a los puntos de train de relleno de cada lote: es mayor que la de cualquier par de puntos de 3 pixeles uint8
+_LEJOS = 3 * 255 ** 2 + 1
+
+
+'''
+    Funciones auxiliares
+'''
+
+def pixeles_variables(*matrices: np.ndarray) -> np.ndarray:
+    # Índices de las columnas que no son constantes en el conjunto de todas las matrices (los pixeles constantes no modifican ninguna distancia)
+    minimo = np.min([m.min(axis=0) for m in matrices], axis=0)
+    maximo = np.max([m.max(axis=0) for m in matrices], axis=0)
+    return np.flatnonzero(minimo != maximo)
+
+
+def coordenadas_terna(terna: np.ndarray) -> tuple:
+    # Convierte tres índices de pixel en la tupla (x_1, y_1, x_2, y_2, x_3, y_3), la inversa de TMNISTDataset.indice_pixel
+    return tuple(int(v) for p in terna for v in divmod(int(p), LADO_IMAGEN))
+
+
+def generar_ternas(pixeles: np.ndarray, cantidad_muestras: int = None, ternas_por_bloque: int = 2000, semilla: int = 42):
+    """
+    Generar, de a bloques, las ternas de pixeles a evaluar (cada terna ordenada de menor a mayor y sin repetir).
+        - Si cantidad_muestras es None se generan todas las ternas de 'pixeles'.
+        - Si no, una muestra estratificada: cada pixel es el primero de la misma cantidad de ternas, completadas con
+          dos pixeles distintos elegidos al azar, de modo que ningún pixel queda sin evaluar.
+
+    Parámetros:
+        pixeles (np.ndarray): Índices de los pixeles candidatos.
+        cantidad_muestras (int, opcional): Cantidad (aproximada) de ternas de la muestra.
+        ternas_por_bloque (int): Cantidad de ternas por bloque.
+        semilla (int): Semilla de la muestra aleatoria.
+
+    Retorna:
+        Generador de matrices (ternas_por_bloque, 3) de índices de pixel.
+    """
+
+    if cantidad_muestras is None or cantidad_muestras >= math.comb(len(pixeles), 3):
+        combinaciones = itertools.combinations(pixeles.tolist(), 3)
+        while True:
+            bloque = np.array(list(itertools.islice(combinaciones, ternas_por_bloque)), dtype=np.int64)
+            if len(bloque) == 0:
+                return
+            yield bloque.reshape(-1, 3)
+
+    generador = np.random.default_rng(semilla)
+    por_pixel = math.ceil(cantidad_muestras / len(pixeles))
+    ternas = []
+    for i, pixel in enumerate(pixeles):
+        otros = np.delete(pixeles, i)
+        for _ in range(por_pixel):
+            ternas.append(sorted([pixel, *generador.choice(otros, 2, replace=False)]))
+
+    # Se descartan las ternas repetidas, conservando el orden en que se generaron
+    ternas, primera = np.unique(np.array(ternas, dtype=np.int64), axis=0, return_index=True)
+    ternas = ternas[np.argsort(primera)]
+    for inicio in range(0, len(ternas), ternas_por_bloque):
+        yield ternas[inicio:inicio + ternas_por_bloque]
+
+
+def _inicializar_proceso(x_train: np.ndarray, y_train: np.ndarray, x_validacion: np.ndarray, y_validacion: np.ndarray, k: int):
+    global _datos
+    clases, clase_train = np.unique(y_train, return_inverse=True)
+    _datos = {
+        'x_train': x_train,
+        'y_train': y_train,
+        'x_validacion': x_validacion,
+        'clase_train': clase_train,
+        # Las etiquetas de validación que no aparecen en train nunca se aciertan (se les asigna una clase inexistente)
+        'clase_validacion': np.where(np.isin(y_validacion, clases), np.searchsorted(clases, y_validacion), len(clases)),
+        'clases': clases,
+        'k': min(k, len(y_train)),
+        # Proporción de filas distintas de 0 de cada pixel (ver _evaluar_bloque)
+        'actividad': np.count_nonzero(np.concatenate([x_train, x_validacion]), axis=0) / (len(x_train) + len(x_validacion)),
+    }
+
+
+def _agrupar_lote(x: np.ndarray, ternas: np.ndarray, clase_fila: np.ndarray, cantidad_clases: int) -> tuple:
+    """
+    Agrupar, para cada terna del lote, las filas de x en puntos únicos con su conteo por clase.
+    Los puntos de cada terna se empaquetan en un entero (terna del lote, pixel 1, pixel 2, pixel 3), por lo que un único
+    np.unique agrupa todas las ternas a la vez.
+
+    Parámetros:
+        x (np.ndarray): Matriz (filas, 784) de pixeles uint8.
+        ternas (np.ndarray): Matriz (lote, 3) de índices de pixel.
+        clase_fila (np.ndarray): Índice de la clase de cada fila.
+        cantidad_clases (int): Cantidad de columnas de los conteos.
+
+    Retorna:
+        tuple: (pila (lote, puntos, 3) de puntos, pila (lote, puntos, clases) de conteos; los puntos de relleno tienen conteo 0).
+    """
+
+    # La clase de cada fila se agrega en los bits menos significativos, de modo que np.unique cuente directamente las filas de cada
+    # (terna, punto, clase) sin necesitar el índice inverso
+    bits_clase = max(1, (cantidad_clases - 1).bit_length())
+    valores = x[:, ternas].astype(np.int64)
+    claves = (np.arange(len(ternas))[None, :] << 24) | (valores[:, :, 0] << 16) | (valores[:, :, 1] << 8) | valores[:, :, 2]
+    claves = (claves << bits_clase) | clase_fila[:, None]
+    unicas, cantidades = np.unique(claves.ravel(), return_counts=True)
+
+    # Índice (global) del punto de cada clave, terna del punto y posición del punto dentro de su terna
+    claves_punto = unicas >> bits_clase
+    nuevo = np.concatenate([[True], claves_punto[1:] != claves_punto[:-1]])
+    punto = np.cumsum(nuevo) - 1
+    claves_punto = claves_punto[nuevo]
+    terna_punto = claves_punto >> 24
+    posicion = np.arange(len(claves_punto)) - np.searchsorted(terna_punto, np.arange(len(ternas)))[terna_punto]
+    cantidad_puntos = int(posicion.max()) + 1
+
+    puntos = np.zeros((len(ternas), cantidad_puntos, 3), dtype=np.int32)
+    for j, desplazamiento in enumerate((16, 8, 0)):
+        puntos[terna_punto, posicion, j] = (claves_punto >> desplazamiento) & 0xFF
+    conteos = np.zeros((len(ternas), cantidad_puntos, cantidad_clases), dtype=np.int64)
+    conteos[terna_punto[punto], posicion[punto], unicas & ((1 << bits_clase) - 1)] = cantidades
+    return puntos, conteos
+
+
+def _votar_lote(ternas: np.ndarray) -> tuple:
+    """
+    Votación de KNN, para cada terna del lote, de cada punto único de validación, sin entrenar un modelo por terna.
+    Para todas las ternas a la vez se calculan las distancias al cuadrado entre puntos únicos, la distancia del punto que
+    contiene al K-ésimo vecino y los votos alrededor de él (ver votacion_con_empates(...) en Auxiliares/BarridoKNN.py).
+
+    Parámetros:
+        ternas (np.ndarray): Matriz (lote, 3) de índices de pixel.
+
+    Retorna:
+        tuple: (pila (lote, puntos, 3) de puntos únicos de validación, pila (lote, puntos, clases + 1) de sus conteos,
+                índice de la clase ganadora de cada punto, True en los puntos cuya ganadora no depende del desempate).
+    """
+
+    k = _datos['k']
+    cantidad_clases = len(_datos['clases'])
+    # Los conteos de validación tienen una columna más, para las etiquetas que no aparecen en train
+    puntos_train, conteos_train = _agrupar_lote(_datos['x_train'], ternas, _datos['clase_train'], cantidad_clases)
+    puntos_validacion, conteos_validacion = _agrupar_lote(_datos['x_validacion'], ternas, _datos['clase_validacion'], cantidad_clases + 1)
+
+    # Pila (lote, validación, train) de distancias al cuadrado, ||v - t||^2 = ||v||^2 + ||t||^2 - 2 v.t, en un único producto de
+    # matrices por lote: (v, ||v||^2, 1) . (-2 t, 1, ||t||^2). Con 3 pixeles uint8 todos los valores son enteros menores que 2^24,
+    # por lo que el cálculo en float32 es exacto. Los puntos de train de relleno se alejan sumándoles _LEJOS a su norma
+    validacion = puntos_validacion.astype(np.float32)
+    train = puntos_train.astype(np.float32)
+    filas_punto = conteos_train.sum(axis=2)
+    normas_train = (train * train).sum(axis=2, keepdims=True) + np.where(filas_punto == 0, _LEJOS, 0)[:, :, None]
+    extendida_validacion = np.concatenate([validacion, (validacion * validacion).sum(axis=2, keepdims=True), np.ones_like(validacion[:, :, :1])], axis=2)
+    extendida_train = np.concatenate([-2 * train, np.ones_like(train[:, :, :1]), normas_train.astype(np.float32)], axis=2)
+    distancias = (extendida_validacion @ extendida_train.transpose(0, 2, 1)).astype(np.int32)
+
+    # Los K vecinos están entre las filas de los K puntos más cercanos (cada punto real tiene al menos una fila, y los de relleno
+    # están más lejos que todos). Para seleccionarlos, la distancia y el índice del punto se empaquetan en un único entero
+    # (la selección parcial de enteros int32 es bastante más rápida que np.argpartition)
+    bits_indice = max(1, (distancias.shape[2] - 1).bit_length())
+    tipo = np.int32 if (2 * _LEJOS) < 2 ** (31 - bits_indice) else np.int64
+    claves = (distancias.astype(tipo) << bits_indice) | np.arange(distancias.shape[2], dtype=tipo)
+    if k < distancias.shape[2]:
+        claves = np.partition(claves, k - 1, axis=2)[:, :, :k]
+    claves = np.sort(claves, axis=2)[:, :, :k]
+    indices = claves & ((1 << bits_indice) - 1)
+    acumulado = np.cumsum(np.take_along_axis(filas_punto[:, None, :], indices, axis=2), axis=2)
+    posicion_limite = (acumulado < k).sum(axis=2, keepdims=True)
+    distancias_candidatos = (claves >> bits_indice).astype(np.int32)
+    distancia_limite = np.take_along_axis(distancias_candidatos, posicion_limite, axis=2)[:, :, 0]
+
+    # Los puntos más cercanos que el K-ésimo vecino están todos entre los candidatos, por lo que sus votos se suman sólo sobre ellos.
+    # Los empatados con él pueden ser más, y se cuentan sobre todos los puntos (como en votos_alrededor_del_k_esimo(...))
+    conteos_candidatos = np.take_along_axis(conteos_train[:, None, :, :], indices[:, :, :, None], axis=2)
+    votos_cercanos = (conteos_candidatos * (distancias_candidatos < distancia_limite[:, :, None])[:, :, :, None]).sum(axis=2)
+    votos_empatados = ((distancias == distancia_limite[:, :, None]).astype(np.float32) @ conteos_train.astype(np.float32)).astype(np.int64)
+    ganadora, asegurada = votacion_con_empates(votos_cercanos.reshape(-1, cantidad_clases), votos_empatados.reshape(-1, cantidad_clases), k)
+    return puntos_validacion, conteos_validacion, ganadora.reshape(distancia_limite.shape), asegurada.reshape(distancia_limite.shape)
+
+
+def _aciertos_delegados(terna: np.ndarray, puntos: np.ndarray, conteos: np.ndarray) -> int:
+    # Aciertos de KNeighborsClassifier, entrenado con los pixeles de la terna, sobre los puntos de validación dados (con sus conteos por clase)
+    modelo = KNeighborsClassifier(n_neighbors = _datos['k']).fit(_datos['x_train'][:, terna], _datos['y_train'])
+    prediccion = np.searchsorted(_datos['clases'], modelo.predict(puntos.astype(np.uint8)))
+    return int(conteos[np.arange(len(puntos)), prediccion].sum())
+
+
+def _evaluar_bloque(ternas: np.ndarray, mejores: int, ternas_por_lote: int) -> list:
+    """
+    Tarea de cada proceso: la exactitud de KNN en validación con las ternas del bloque. Sólo devuelve las 'mejores' (exactitud, terna).
+    De cada terna, la votación por lotes asegura los aciertos de los puntos de validación certificados, y acota los de los demás
+    (a lo sumo, las filas de la clase más frecuente del punto). Luego se recorren las ternas de mayor a menor cota, completando
+    con KNeighborsClassifier sólo las que todavía pueden entrar entre las mejores, por lo que las exactitudes devueltas son exactas.
+
+    Parámetros:
+        ternas (np.ndarray): Matriz (ternas, 3) de índices de pixel.
+        mejores (int): Cantidad de ternas a devolver.
+        ternas_por_lote (int): Cantidad de ternas cuyas distancias se calculan juntas.
+
+    Retorna:
+        list: Lista de (exactitud en validación, terna de índices de pixel), ordenada de mayor a menor exactitud.
+    """
+
+    # Las ternas de pixeles con más filas distintas de 0 suelen tener más puntos únicos: se ordenan por esa actividad, de modo
+    # que las ternas de un mismo lote tengan tamaños parecidos y la pila tenga poco relleno
+    ternas = ternas[np.argsort(_datos['actividad'][ternas].sum(axis=1), kind='stable')]
+
+    aciertos_asegurados, cotas, dudosos = [], [], []
+    for inicio in range(0, len(ternas), ternas_por_lote):
+        puntos, conteos, ganadora, asegurada = _votar_lote(ternas[inicio:inicio + ternas_por_lote])
+        dudoso = ~asegurada & (conteos.sum(axis=2) > 0)
+        asegurados = np.where(asegurada, np.take_along_axis(conteos, ganadora[:, :, None], axis=2)[:, :, 0], 0).sum(axis=1)
+        aciertos_asegurados.extend(asegurados.tolist())
+        cotas.extend((asegurados + np.where(dudoso, conteos[:, :, :-1].max(axis=2), 0).sum(axis=1)).tolist())
+        dudosos.extend((puntos[t, dudoso[t]], conteos[t, dudoso[t]]) for t in range(len(dudoso)))
+
+    # Montículo con las mejores ternas hasta el momento, con la peor en la raíz: (aciertos, terna con los índices negados)
+    # (ante igual exactitud se prefiere la terna de menores índices)
+    mantenidas = []
+    for t in sorted(range(len(ternas)), key=lambda t: -cotas[t]):
+        clave = tuple(-int(p) for p in ternas[t])
+        if len(mantenidas) == mejores and (cotas[t], clave) < mantenidas[0]:
+            if cotas[t] < mantenidas[0][0]:
+                break
+            continue
+        aciertos = aciertos_asegurados[t]
+        if len(dudosos[t][0]) > 0:
+            aciertos += _aciertos_delegados(ternas[t], *dudosos[t])
+        if len(mantenidas) < mejores:
+            heapq.heappush(mantenidas, (aciertos, clave))
+        elif (aciertos, clave) > mantenidas[0]:
+            heapq.heapreplace(mantenidas, (aciertos, clave))
+
+    resultados = [(aciertos / len(_datos['x_validacion']), tuple(-p for p in clave)) for aciertos, clave in mantenidas]
+    return sorted(resultados, key=lambda r: (-r[0], r[1]))
+
+
+'''
+    Función principal
+'''
+
+def buscar_ternas(train: TMNISTDataset, k: int = 5, mejores: int = 10, cantidad_muestras: int = None, procesos: int = 1,
+                  ternas_por_bloque: int = 2000, semilla: int = 42, proporcion_validacion: float = 0.2, ternas_por_lote: int = 16) -> list:
+    """
+    Buscar las ternas de pixeles con las que KNN obtiene la mayor exactitud sobre una validación separada de train.
+
+    Parámetros:
+        train (TMNISTDataset): Dataset de entrenamiento (test no interviene en la búsqueda).
+        k (int): Cantidad de vecinos de KNN.
+        mejores (int): Cantidad de ternas a devolver.
+        cantidad_muestras (int, opcional): Cantidad de ternas de la muestra estratificada. Si es None, se evalúan todas
+            (con ~600 pixeles variables son unas 36 millones de ternas, ver la descripción del archivo).
+        procesos (int): Cantidad de procesos entre los que se reparten los bloques. Con 1 (por defecto) no se crea un pool
+            (con más de uno, el script que lo llama debe estar protegido por if __name__ == '__main__').
+        ternas_por_bloque (int): Cantidad de ternas que evalúa cada tarea.
+        semilla (int): Semilla de la muestra aleatoria.
+        proporcion_validacion (float): Proporción de train que se separa como validación.
+        ternas_por_lote (int): Cantidad de ternas cuyas distancias se calculan juntas (acota la memoria de cada lote).
+
+    Retorna:
+        list: Lista de (exactitud en validación, (x_1, y_1, x_2, y_2, x_3, y_3)) ordenada de mayor a menor exactitud.
+    """
+
+    x = np.asarray(train.pixeles)
+    y = np.asarray(train.etiquetas)
+    filas_train, filas_validacion = train_test_split(np.arange(len(y)), test_size=proporcion_validacion, random_state=42, stratify=y)
+    pixeles = pixeles_variables(x)
+    print("Búsqueda de ternas:", str(len(pixeles)), "pixeles variables de", str(x.shape[1]))
+
+    bloques = generar_ternas(pixeles, cantidad_muestras, ternas_por_bloque, semilla)
+    datos = (x[filas_train], y[filas_train], x[filas_validacion], y[filas_validacion], k)
+
+    inicio = time.perf_counter()
+    if procesos == 1:
+        _inicializar_proceso(*datos)
+        resultados = [(_evaluar_bloque(bloque, mejores, ternas_por_lote), len(bloque)) for bloque in bloques]
+    else:
+        # pool.map consume todo el generador antes de empezar, por lo que los bloques se envían de a tandas (acota la memoria)
+        resultados = []
+        with ProcessPoolExecutor(max_workers=procesos, initializer=_inicializar_proceso, initargs=datos) as pool:
+            while True:
+                tanda = list(itertools.islice(bloques, 4 * procesos))
+                if not tanda:
+                    break
+                mejores_tanda = pool.map(_evaluar_bloque, tanda, [mejores] * len(tanda), [ternas_por_lote] * len(tanda))
+                resultados.extend(zip(mejores_tanda, (len(bloque) for bloque in tanda)))
+    segundos = time.perf_counter() - inicio
+    evaluadas = sum(cantidad for _, cantidad in resultados)
+    print("Búsqueda de ternas:", str(evaluadas), "ternas evaluadas en", f"{segundos:.1f}", "s -", f"{evaluadas / max(segundos, 1e-9):.0f}", "ternas por segundo")
+
+    # Se combinan las mejores de cada bloque, con el mismo criterio de desempate
+    candidatas = heapq.nsmallest(mejores, (r for bloque, _ in resultados for r in bloque), key=lambda r: (-r[0], r[1]))
+    return [(exactitud, coordenadas_terna(terna)) for exactitud, terna in candidatas]
@@ -0,0 +1,336 @@
+'''
+    Autores:
+    - Alvarez, Matías
+    - Dumas, Román
+    - Nogueroles, Patricio
+
+    Archivo encargado de cargar el dataset TMNIST desde una caché binaria, evitando parsear el CSV en cada ejecución.
+    El método principal es cargar_dataset(...), que devuelve un TMNISTDataset (cargar_tmnist(...) devuelve en cambio un DataFrame)
+
+    La primera vez que se carga un CSV se lo convierte a una caché en disco con los siguientes archivos:
+        - pixeles.npy: matriz contigua (N, 784) de tipo uint8 con la intensidad de cada pixel
+        - etiquetas.npy: vector (N,) de tipo int8 con el dígito de cada imagen
+        - fuentes.npy: vector (N,) de tipo int16 con el índice de la fuente de cada imagen (codificación por diccionario)
+        - nombres_fuentes.json: lista con el nombre de cada fuente, en el orden de los índices anteriores
+
+    La caché se ubica en una carpeta cuyo nombre es el hash SHA-256 del CSV de origen, por lo que si el CSV cambia se genera una caché nueva.
+    Para no recalcular el hash en cada ejecución, se lo recuerda junto al tamaño y la fecha de modificación del CSV.
+
+    La clase TMNISTDataset guarda las imágenes agrupadas por dígito, de forma que el subconjunto de un dígito (o de dígitos consecutivos)
+    es una porción contigua de la matriz de pixeles y se obtiene sin copiar datos ni recorrer las etiquetas.
+    Como la mayoría de los pixeles son fondo (0), también ofrece la matriz de pixeles en formato disperso CSR (ver TMNISTDataset.dispersa()).
+
+    Modo de uso:
+        dataset = cargar_dataset('TMNIST_Data.csv')
+        ceros = dataset.de_etiqueta(0)
+        columna = dataset.pixeles[:, TMNISTDataset.indice_pixel(10, 9)]
+'''
+
+import hashlib
+import json
+import os
+
+import numpy as np
+import pandas as pd
+from scipy import sparse
+
+LADO_IMAGEN = 28
+CANTIDAD_PIXELES = LADO_IMAGEN * LADO_IMAGEN
+RUTA_CACHE_POR_DEFECTO = '.cache_tmnist/'
+
+
+'''
+    Funciones auxiliares
+'''
+
+def calcular_hash_archivo(ruta_archivo: str, tamano_bloque: int = 1 << 20) -> str:
+    """
+    Calcular el hash SHA-256 de un archivo, leyéndolo por bloques.
+
+    Parámetros:
+        ruta_archivo (str): Ruta del archivo.
+        tamano_bloque (int): Cantidad de bytes leídos por vez.
+
+    Retorna:
+        str: Hash en formato hexadecimal.
+    """
+
+    h = hashlib.sha256()
+    with open(ruta_archivo, 'rb') as archivo:
+        for bloque in iter(lambda: archivo.read(tamano_bloque), b''):
+            h.update(bloque)
+    return h.hexdigest()
+
+
+def obtener_clave_cache(ruta_csv: str, ruta_cache: str) -> str:
+    """
+    Obtener la clave (hash del CSV) de la caché. Si el CSV no cambió de tamaño ni de fecha de modificación
+    desde la última vez, se reutiliza el hash guardado en el índice de la caché en lugar de recalcularlo.
+
+    Parámetros:
+        ruta_csv (str): Ruta del CSV de origen.
+        ruta_cache (str): Carpeta raíz de la caché.
+
+    Retorna:
+        str: Hash SHA-256 del CSV.
+    """
+
+    estado = os.stat(ruta_csv)
+    firma = [os.path.abspath(ruta_csv), estado.st_size, estado.st_mtime_ns]
+
+    ruta_indice = os.path.join(ruta_cache, 'indice.json')
+    indice = []
+    if os.path.exists(ruta_indice):
+        with open(ruta_indice, 'r', encoding='utf-8') as archivo:
+            indice = json.load(archivo)
+        for entrada in indice:
+            if entrada['firma'] == firma:
+                return entrada['hash']
+
+    clave = calcular_hash_archivo(ruta_csv)
+
+    # Se reemplaza la entrada anterior del mismo CSV (si existía) y se guarda el índice
+    indice = [entrada for entrada in indice if entrada['firma'][0] != firma[0]]
+    indice.append({'firma': firma, 'hash': clave})
+    os.makedirs(ruta_cache, exist_ok=True)
+    with open(ruta_indice, 'w', encoding='utf-8') as archivo:
+        json.dump(indice, archivo)
+
+    return clave
+
+
+def pixeles_dispersos(pixeles: np.ndarray, filas_por_bloque: int = 8192) -> sparse.csr_matrix:
+    """
+    Convertir una matriz de pixeles a formato disperso CSR, guardando sólo los pixeles distintos de 0.
+    Se convierte por bloques de filas, para no crear temporales del tamaño de toda la matriz.
+
+    Parámetros:
+        pixeles (np.ndarray): Matriz (N, 784) de pixeles uint8.
+        filas_por_bloque (int): Cantidad de filas convertidas por vez.
+
+    Retorna:
+        sparse.csr_matrix: Matriz (N, 784) CSR con valores uint8 (scipy usa índices int32 mientras alcancen).
+    """
+
+    pixeles = np.asarray(pixeles)
+    bloques = [sparse.csr_matrix(pixeles[inicio:inicio + filas_por_bloque], dtype=np.uint8)
+               for inicio in range(0, len(pixeles), filas_por_bloque)]
+    if not bloques:
+        return sparse.csr_matrix(pixeles.shape, dtype=np.uint8)
+    return sparse.vstack(bloques, format='csr', dtype=np.uint8)
+
+
+def convertir_csv_a_cache(ruta_csv: str, ruta_destino: str) -> None:
+    """
+    Convertir el CSV del dataset TMNIST a los archivos binarios de la caché (se realiza una única vez por CSV).
+
+    Parámetros:
+        ruta_csv (str): Ruta del CSV de origen.
+        ruta_destino (str): Carpeta donde se guardarán los archivos de la caché.
+    """
+
+    # Se indican los tipos de antemano para que pandas no genere columnas int64 intermedias
+    tipos = {str(i): np.uint8 for i in range(1, CANTIDAD_PIXELES + 1)}
+    tipos['labels'] = np.int8
+    tipos['names'] = 'category'
+    df = pd.read_csv(ruta_csv, dtype=tipos)
+
+    pixeles = np.ascontiguousarray(df[[str(i) for i in range(1, CANTIDAD_PIXELES + 1)]].to_numpy(dtype=np.uint8))
+    etiquetas = df['labels'].to_numpy(dtype=np.int8)
+    fuentes = df['names'].cat.codes.to_numpy().astype(np.int16)
+    nombres_fuentes = [str(nombre) for nombre in df['names'].cat.categories]
+
+    # Se escribe en una carpeta temporal y luego se renombra, para que una conversión interrumpida no deje una caché incompleta
+    ruta_temporal = ruta_destino.rstrip('/\\') + '.tmp'
+    os.makedirs(ruta_temporal, exist_ok=True)
+    np.save(os.path.join(ruta_temporal, 'pixeles.npy'), pixeles)
+    np.save(os.path.join(ruta_temporal, 'etiquetas.npy'), etiquetas)
+    np.save(os.path.join(ruta_temporal, 'fuentes.npy'), fuentes)
+    with open(os.path.join(ruta_temporal, 'nombres_fuentes.json'), 'w', encoding='utf-8') as archivo:
+        json.dump(nombres_fuentes, archivo)
+    os.replace(ruta_temporal, ruta_destino)
+
+
+def cargar_arreglos(ruta_csv: str, ruta_cache: str = RUTA_CACHE_POR_DEFECTO, memmap: bool = True) -> tuple:
+    """
+    Cargar el dataset TMNIST como arreglos de numpy desde la caché, generándola si todavía no existe.
+
+    Parámetros:
+        ruta_csv (str): Ruta del CSV de origen.
+        ruta_cache (str): Carpeta raíz de la caché.
+        memmap (bool): Si es True, la matriz de pixeles se mapea en memoria en lugar de leerse completa.
+
+    Retorna:
+        tuple: (pixeles, etiquetas, fuentes, nombres_fuentes)
+    """
+
+    clave = obtener_clave_cache(ruta_csv, ruta_cache)
+    ruta_destino = os.path.join(ruta_cache, clave)
+
+    if not os.path.exists(os.path.join(ruta_destino, 'nombres_fuentes.json')):
+        convertir_csv_a_cache(ruta_csv, ruta_destino)
+
+    pixeles = np.load(os.path.join(ruta_destino, 'pixeles.npy'), mmap_mode='r' if memmap else None)
+    etiquetas = np.load(os.path.join(ruta_destino, 'etiquetas.npy'))
+    fuentes = np.load(os.path.join(ruta_destino, 'fuentes.npy'))
+    with open(os.path.join(ruta_destino, 'nombres_fuentes.json'), 'r', encoding='utf-8') as archivo:
+        nombres_fuentes = json.load(archivo)
+
+    return pixeles, etiquetas, fuentes, nombres_fuentes
+
+
+'''
+    Contenedor del dataset
+'''
+
+class TMNISTDataset:
+    """
+    Contenedor compacto del dataset TMNIST.
+
+    Atributos:
+        pixeles (np.ndarray): Matriz (N, 784) uint8, con las filas agrupadas por dígito en orden ascendente.
+        etiquetas (np.ndarray): Vector (N,) int8 con el dígito de cada fila.
+        fuentes (pd.Categorical): Nombre de la fuente de cada fila.
+        limites (np.ndarray): Las filas del dígito d son las de la porción limites[d]:limites[d+1].
+        posiciones (np.ndarray): Posición de cada fila en el CSV original.
+    """
+
+    __slots__ = ('pixeles', 'etiquetas', 'fuentes', 'limites', 'posiciones')
+
+    def __init__(self, pixeles: np.ndarray, etiquetas: np.ndarray, fuentes: pd.Categorical, posiciones: np.ndarray = None):
+        etiquetas = np.asarray(etiquetas, dtype=np.int8)
+        if posiciones is None:
+            posiciones = np.arange(len(etiquetas), dtype=np.int32)
+
+        # Si las filas no están agrupadas por dígito se las reordena una única vez (el orden estable conserva el orden relativo del CSV)
+        if np.any(np.diff(etiquetas) < 0):
+            orden = np.argsort(etiquetas, kind='stable')
+            pixeles = pixeles[orden]
+            etiquetas = etiquetas[orden]
+            fuentes = fuentes[orden]
+            posiciones = posiciones[orden]
+
+        self.pixeles = pixeles
+        self.etiquetas = etiquetas
+        self.fuentes = fuentes
+        self.posiciones = np.asarray(posiciones)
+
+        # Tabla de límites por dígito (también para los dígitos ausentes, que quedan con una porción vacía)
+        cantidad_clases = int(etiquetas.max()) + 1 if len(etiquetas) > 0 else 0
+        self.limites = np.searchsorted(etiquetas, np.arange(cantidad_clases + 1))
+
+    @classmethod
+    def desde_csv(cls, ruta_csv: str, ruta_cache: str = RUTA_CACHE_POR_DEFECTO) -> 'TMNISTDataset':
+        pixeles, etiquetas, fuentes, nombres_fuentes = cargar_arreglos(ruta_csv, ruta_cache, memmap=True)
+        return cls(pixeles, etiquetas, pd.Categorical.from_codes(fuentes, categories=nombres_fuentes))
+
+    @classmethod
+    def desde_dataframe(cls, df_digitos: pd.DataFrame) -> 'TMNISTDataset':
+        pixeles = np.ascontiguousarray(df_digitos[[str(i) for i in range(1, CANTIDAD_PIXELES + 1)]].to_numpy(dtype=np.uint8))
+        return cls(pixeles, df_digitos['labels'].to_numpy(), pd.Categorical(df_digitos['names']))
+
+    @staticmethod
+    def indice_pixel(x: int, y: int) -> int:
+        # Convierte una coordenada (x, y) con x, y entre [0, 27] a la columna (entre 0 y 783) de la matriz de pixeles
+        # Equivale a aplanar(x, y) - 1, ya que aquí no existen las columnas 'names' y 'labels'
+        return (x * LADO_IMAGEN) + y
+
+    @staticmethod
+    def indices_pixeles(coordenadas: list) -> np.ndarray:
+        return np.array([TMNISTDataset.indice_pixel(x, y) for (x, y) in coordenadas], dtype=np.intp)
+
+    def __len__(self) -> int:
+        return len(self.etiquetas)
+
+    @property
+    def clases(self) -> np.ndarray:
+        # Dígitos que tienen al menos una imagen
+        return np.flatnonzero(np.diff(self.limites) > 0)
+
+    @property
+    def imagenes(self) -> np.ndarray:
+        # Vista (N, 28, 28) de la matriz de pixeles
+        return self.pixeles.reshape(-1, LADO_IMAGEN, LADO_IMAGEN)
+
+    def filas(self, digito: int) -> slice:
+        if digito < 0 or digito + 1 >= len(self.limites):
+            return slice(0, 0)
+        return slice(int(self.limites[digito]), int(self.limites[digito + 1]))
+
+    def cantidad(self, digito: int) -> int:
+        filas = self.filas(digito)
+        return filas.stop - filas.start
+
+    def subconjunto(self, filas) -> 'TMNISTDataset':
+        """
+        Obtener el subconjunto formado por las filas indicadas. Si filas es una porción (slice) el resultado
+        comparte memoria con el dataset original; si es un arreglo de índices, se copian sólo esas filas.
+        Como en todo TMNISTDataset, las filas del resultado quedan agrupadas por dígito.
+        """
+
+        return TMNISTDataset(self.pixeles[filas], self.etiquetas[filas], self.fuentes[filas], self.posiciones[filas])
+
+    def de_etiqueta(self, digito: int) -> 'TMNISTDataset':
+        return self.subconjunto(self.filas(digito))
+
+    def de_etiquetas(self, digitos: list) -> 'TMNISTDataset':
+        # Si los dígitos son consecutivos (por ej. 0 y 1) sus filas también lo son, y el subconjunto no copia datos
+        digitos = sorted(digitos)
+        if digitos == list(range(digitos[0], digitos[-1] + 1)):
+            return self.subconjunto(slice(self.filas(digitos[0]).start, self.filas(digitos[-1]).stop))
+        return self.subconjunto(np.concatenate([np.arange(self.filas(d).start, self.filas(d).stop) for d in digitos]))
+
+    def dispersa(self) -> sparse.csr_matrix:
+        # Matriz de pixeles en formato CSR (sólo los pixeles distintos de 0), con las filas en el mismo orden que pixeles
+        return pixeles_dispersos(self.pixeles)
+
+    def orden_original(self) -> np.ndarray:
+        # Filas del dataset ordenadas según su posición en el CSV (sirve para reproducir particiones hechas sobre el CSV)
+        return np.argsort(self.posiciones, kind='stable')
+
+    def a_dataframe(self) -> pd.DataFrame:
+        df = pd.DataFrame(self.pixeles, columns=[str(i) for i in range(1, CANTIDAD_PIXELES + 1)])
+        df.insert(0, 'labels', self.etiquetas)
+        df.insert(0, 'names', self.fuentes)
+        return df
+
+
+'''
+    Funciones principales
+'''
+
+def cargar_dataset(ruta_csv: str, ruta_cache: str = RUTA_CACHE_POR_DEFECTO) -> TMNISTDataset:
+    """
+    Cargar el dataset TMNIST como TMNISTDataset, utilizando la caché binaria.
+
+    Parámetros:
+        ruta_csv (str): Ruta del CSV de origen.
+        ruta_cache (str): Carpeta raíz de la caché.
+
+    Retorna:
+        TMNISTDataset: El dataset TMNIST.
+    """
+
+    return TMNISTDataset.desde_csv(ruta_csv, ruta_cache)
+
+
+def cargar_tmnist(ruta_csv: str, ruta_cache: str = RUTA_CACHE_POR_DEFECTO) -> pd.DataFrame:
+    """
+    Cargar el dataset TMNIST con las mismas columnas que el CSV ('names', 'labels', '1', ..., '784'),
+    pero con pixeles uint8, etiquetas int8 y nombres de fuente categóricos.
+
+    Parámetros:
+        ruta_csv (str): Ruta del CSV de origen.
+        ruta_cache (str): Carpeta raíz de la caché.
+
+    Retorna:
+        pd.DataFrame: El dataset TMNIST.
+    """
+
+    pixeles, etiquetas, fuentes, nombres_fuentes = cargar_arreglos(ruta_csv, ruta_cache, memmap=False)
+
+    df_pixeles = pd.DataFrame(pixeles, columns=[str(i) for i in range(1, CANTIDAD_PIXELES + 1)])
+    df_pixeles.insert(0, 'labels', etiquetas)
+    df_pixeles.insert(0, 'names', pd.Categorical.from_codes(fuentes, categories=nombres_fuentes))
+
+    return df_pixeles
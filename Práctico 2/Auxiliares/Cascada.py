@@ -0,0 +1,153 @@
+'''
+    Autores:
+    - Alvarez, Matías
+    - Dumas, Román
+    - Nogueroles, Patricio
+
+    Archivo que define ClasificadorCascada, un clasificador en dos etapas para predecir rápido los glifos fáciles:
+        1. Una primera etapa barata (un árbol de decisión poco profundo o el clasificador por centroide más cercano, ver Auxiliares/Centroides.py)
+           predice todas las filas junto con un margen de confianza entre 0 y 1.
+        2. Sólo las filas cuyo margen es menor que el umbral se envían a KNN sobre los 784 pixeles (KNNExacto, ver Auxiliares/NucleoDistancias.py).
+    El margen de un árbol es la diferencia entre las dos mayores proporciones de clase de la hoja (predict_proba), y el del clasificador
+    por centroides la diferencia relativa entre las distancias a los dos centroides más cercanos. Con umbral 0 no se escala ninguna fila
+    (sólo primera etapa) y con umbral mayor a 1 se escalan todas (sólo KNN).
+
+    barrer_umbrales(...) informa, para cada umbral, la proporción de filas escaladas, la exactitud y la latencia, para elegir el punto
+    de equilibrio entre velocidad y exactitud.
+
+    Modo de uso:
+        arbol = entrenar_arbol_decision(X_train, Y_train, profundidad_maxima = 3)
+        cascada = ClasificadorCascada(arbol, umbral = 0.5, n_neighbors = 5).fit(X_train, Y_train)
+        Y_predict = cascada.predict(X_test)
+'''
+
+import time
+
+import numpy as np
+
+from Auxiliares.NucleoDistancias import KNNExacto
+
+UMBRALES_POR_DEFECTO = (0.0, 0.02, 0.05, 0.1, 0.2, 0.3, 0.5, 0.75, 1.01)
+
+
+'''
+    Funciones auxiliares
+'''
+
+def primera_etapa(modelo, X: np.ndarray) -> tuple:
+    """
+    Predecir con la primera etapa de la cascada, junto con el margen de confianza de cada fila.
+
+    Parámetros:
+        modelo: Modelo entrenado con método margen(X) (ClasificadorCentroides) o predict_proba(X) (DecisionTreeClassifier).
+        X (np.ndarray): Matriz (filas, 784) de pixeles.
+
+    Retorna:
+        tuple: (predicción de cada fila, margen de cada fila entre 0 y 1).
+    """
+
+    if hasattr(modelo, 'margen'):
+        return modelo.margen(X)
+    probabilidades = modelo.predict_proba(X)
+    # predict de sklearn es la clase de mayor probabilidad (la menor ante empates), igual que np.argmax
+    predicciones = modelo.classes_[np.argmax(probabilidades, axis=1)]
+    if probabilidades.shape[1] < 2:
+        return predicciones, np.ones(len(X))
+    dos_mayores = np.partition(probabilidades, -2, axis=1)[:, -2:]
+    return predicciones, dos_mayores[:, 1] - dos_mayores[:, 0]
+
+
+'''
+    Clasificador
+'''
+
+class ClasificadorCascada:
+    """
+    Clasificador en dos etapas: la primera etapa responde cuando su margen alcanza el umbral, y el resto de las filas se predice con KNN.
+
+    Atributos (luego de fit):
+        base (np.ndarray): Matriz (train, 784) de pixeles de train, para KNN.
+        clases (np.ndarray): Clases ordenadas de menor a mayor.
+        indices_train (np.ndarray): Índice (en clases) de la clase de cada fila de train.
+    """
+
+    def __init__(self, primera_etapa, umbral: float = 0.5, n_neighbors: int = 5):
+        self.primera_etapa = primera_etapa
+        self.umbral = umbral
+        self.n_neighbors = n_neighbors
+
+    def fit(self, X: np.ndarray, y: np.ndarray) -> 'ClasificadorCascada':
+        # La primera etapa ya viene entrenada; KNN sólo guarda los datos (y las normas, para no recalcularlas en cada predicción)
+        self._knn = KNNExacto(n_neighbors = self.n_neighbors).fit(X, y)
+        self.base, self.clases, self.indices_train = self._knn.base, self._knn.clases, self._knn.indices_train
+        return self
+
+    def predecir_knn(self, X: np.ndarray) -> np.ndarray:
+        # Predicción de KNN sobre los 784 pixeles (la segunda etapa), la misma que la de KNeighborsClassifier
+        return self._knn.predict(X)
+
+    def predecir_con_escalados(self, X: np.ndarray) -> tuple:
+        """
+        Predecir cada fila de X, indicando cuáles se enviaron a KNN.
+
+        Parámetros:
+            X (np.ndarray): Matriz (filas, 784) de pixeles.
+
+        Retorna:
+            tuple: (predicción de cada fila, vector booleano con True en las filas escaladas a KNN).
+        """
+
+        X = np.asarray(X)
+        predicciones, margenes = primera_etapa(self.primera_etapa, X)
+        escaladas = margenes < self.umbral
+        if escaladas.any():
+            predicciones[escaladas] = self.predecir_knn(X[escaladas])
+        return predicciones, escaladas
+
+    def predict(self, X: np.ndarray) -> np.ndarray:
+        return self.predecir_con_escalados(X)[0]
+
+
+'''
+    Función principal
+'''
+
+def barrer_umbrales(primera_etapa, x_train: np.ndarray, y_train: np.ndarray, x_test: np.ndarray, y_test: np.ndarray,
+                    umbrales: tuple = UMBRALES_POR_DEFECTO, k: int = 5, nombre: str = 'Primera etapa') -> list:
+    """
+    Evaluar la cascada con distintos umbrales: proporción de filas de test escaladas a KNN, exactitud y latencia (tiempo total
+    de predicción y tiempo medio por imagen).
+
+    Parámetros:
+        primera_etapa: Modelo de la primera etapa, ya entrenado (árbol de decisión o ClasificadorCentroides).
+        x_train (np.ndarray): Matriz (train, 784) de pixeles uint8.
+        y_train (np.ndarray): Etiquetas de train.
+        x_test (np.ndarray): Matriz (test, 784) de pixeles uint8.
+        y_test (np.ndarray): Etiquetas de test.
+        umbrales (tuple): Umbrales de margen a evaluar (0: sólo primera etapa; mayor a 1: sólo KNN).
+        k (int): Cantidad de vecinos de KNN.
+        nombre (str): Nombre de la primera etapa, para imprimir los resultados.
+
+    Retorna:
+        list: Un diccionario de resultados por umbral (también se imprimen por consola).
+    """
+
+    y_test = np.asarray(y_test)
+    cascada = ClasificadorCascada(primera_etapa, n_neighbors = k).fit(x_train, y_train)
+
+    resultados = []
+    for umbral in umbrales:
+        cascada.umbral = umbral
+        inicio = time.perf_counter()
+        prediccion, escaladas = cascada.predecir_con_escalados(x_test)
+        tiempo = time.perf_counter() - inicio
+        resultados.append({
+            'umbral': umbral,
+            'escaladas': float(np.mean(escaladas)) if len(escaladas) > 0 else 0.0,
+            'exactitud': float(np.mean(prediccion == y_test)),
+            'tiempo': tiempo,
+            'tiempo_por_imagen': tiempo / max(1, len(y_test)),
+        })
+        print(f"Cascada {nombre} + KNN (K = {k}), umbral {umbral:.2f}: {100 * resultados[-1]['escaladas']:.1f}% de filas escaladas, "
+              f"exactitud {resultados[-1]['exactitud']:.4f}, {tiempo:.3f} s ({resultados[-1]['tiempo_por_imagen'] * 1e6:.1f} µs por imagen)")
+    return resultados
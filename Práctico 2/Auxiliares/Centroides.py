@@ -0,0 +1,180 @@
+'''
+    Autores:
+    - Alvarez, Matías
+    - Dumas, Román
+    - Nogueroles, Patricio
+
+    Archivo encargado de calcular la imagen promedio (centroide) de cada dígito y de clasificar por el centroide más cercano.
+
+    El método principal es sumas_por_clase(...), que recorre los pixeles por bloques y acumula, para cada clase, la suma de sus
+    imágenes (matriz (clases, 784) int64) y la cantidad de imágenes. Los promedios salen de dividir una por otra, y a partir de ellos:
+        - Graficos.py genera los heatmaps de la diferencia de las imágenes promedio entre cada par de dígitos
+        - ClasificadorCentroides predice la clase del centroide más cercano (distancia euclídea): como hay sólo 10 centroides,
+          predecir es un producto de la matriz de test por una matriz de (784, 10), del orden de microsegundos por imagen.
+    comparar_centroides(...) lo compara, como clasificador de referencia, con KNN y con un árbol de decisión.
+
+    Modo de uso:
+        sumas, conteos = sumas_por_clase(dataset.pixeles, dataset.etiquetas, cantidad_clases = 10)
+        modelo = ClasificadorCentroides().fit(X_train, Y_train)
+        Y_predict = modelo.predict(X_test)
+'''
+
+import time
+
+import numpy as np
+from sklearn.tree import DecisionTreeClassifier
+
+from Auxiliares.NucleoDistancias import KNNExacto
+
+
+'''
+    Funciones auxiliares
+'''
+
+def sumas_por_clase(pixeles: np.ndarray, indices_clase: np.ndarray, cantidad_clases: int, filas_por_bloque: int = 4096) -> tuple:
+    """
+    Acumular, en una única pasada por bloques, la suma de las imágenes de cada clase y la cantidad de imágenes de cada clase.
+
+    Parámetros:
+        pixeles (np.ndarray): Matriz (filas, 784) de pixeles uint8.
+        indices_clase (np.ndarray): Índice de la clase de cada fila (entre 0 y cantidad_clases - 1; para TMNIST, el dígito).
+        cantidad_clases (int): Cantidad de clases.
+        filas_por_bloque (int): Cantidad de filas procesadas a la vez.
+
+    Retorna:
+        tuple: (matriz (clases, 784) int64 de sumas, vector (clases,) int64 de conteos).
+    """
+
+    sumas = np.zeros((cantidad_clases, pixeles.shape[1]), dtype=np.int64)
+    conteos = np.zeros(cantidad_clases, dtype=np.int64)
+
+    for inicio in range(0, len(pixeles), filas_por_bloque):
+        bloque = np.asarray(pixeles[inicio:inicio + filas_por_bloque])
+        indices = np.asarray(indices_clase[inicio:inicio + filas_por_bloque]).astype(np.int64)
+
+        # Se ordena el bloque por clase y se suma cada tramo contiguo con una única llamada a reduceat
+        orden = np.argsort(indices, kind='stable')
+        cantidades = np.bincount(indices, minlength=cantidad_clases)
+        presentes = np.flatnonzero(cantidades)
+        comienzos = np.concatenate([[0], np.cumsum(cantidades)[:-1]])[presentes]
+        sumas[presentes] += np.add.reduceat(bloque[orden], comienzos, axis=0, dtype=np.int64)
+        conteos += cantidades
+
+    return sumas, conteos
+
+
+def promedios(sumas: np.ndarray, conteos: np.ndarray) -> np.ndarray:
+    # Imagen promedio de cada clase (float64); las clases sin imágenes quedan en 0
+    return sumas / np.maximum(conteos, 1)[:, None]
+
+
+'''
+    Clasificador
+'''
+
+class ClasificadorCentroides:
+    """
+    Clasificador que predice la clase cuya imagen promedio está más cerca (distancia euclídea) de cada imagen.
+    Ante empates de distancia se predice la clase menor.
+
+    Atributos (luego de fit):
+        clases (np.ndarray): Clases ordenadas de menor a mayor.
+        centroides (np.ndarray): Matriz (clases, 784) float64 con la imagen promedio de cada clase.
+    """
+
+    def __init__(self, filas_por_bloque: int = 4096):
+        self.filas_por_bloque = filas_por_bloque
+
+    def fit(self, X: np.ndarray, y: np.ndarray) -> 'ClasificadorCentroides':
+        self.clases, indices_clase = np.unique(np.asarray(y), return_inverse=True)
+        sumas, conteos = sumas_por_clase(X, indices_clase, len(self.clases), self.filas_por_bloque)
+        self.centroides = promedios(sumas, conteos)
+        # argmin ||x - c||^2 = argmin ||c||^2 - 2 x.c (||x||^2 no depende de la clase)
+        self._normas = (self.centroides * self.centroides).sum(axis=1)
+        return self
+
+    def predict(self, X: np.ndarray) -> np.ndarray:
+        predicciones = np.empty(len(X), dtype=self.clases.dtype)
+        for inicio in range(0, len(X), self.filas_por_bloque):
+            bloque = np.asarray(X[inicio:inicio + self.filas_por_bloque], dtype=np.float64)
+            # np.argmin devuelve la primera clase con menor distancia, es decir la menor
+            predicciones[inicio:inicio + len(bloque)] = self.clases[np.argmin(self._normas[None, :] - 2 * (bloque @ self.centroides.T), axis=1)]
+        return predicciones
+
+    def margen(self, X: np.ndarray) -> tuple:
+        """
+        Predecir cada fila de X junto con un margen de confianza: la diferencia relativa entre la distancia al segundo centroide
+        más cercano y al más cercano, (d2 - d1) / d2. Vale 0 si ambos están a la misma distancia y se acerca a 1 cuanto más cerca
+        está la imagen de su centroide que de los demás.
+
+        Parámetros:
+            X (np.ndarray): Matriz (filas, 784) de pixeles.
+
+        Retorna:
+            tuple: (predicción de cada fila, margen de cada fila entre 0 y 1).
+        """
+
+        predicciones = np.empty(len(X), dtype=self.clases.dtype)
+        margenes = np.ones(len(X))
+        for inicio in range(0, len(X), self.filas_por_bloque):
+            bloque = np.asarray(X[inicio:inicio + self.filas_por_bloque], dtype=np.float64)
+            parciales = self._normas[None, :] - 2 * (bloque @ self.centroides.T)
+            predicciones[inicio:inicio + len(bloque)] = self.clases[np.argmin(parciales, axis=1)]
+            # Para el margen sí se suma ||x||^2, ya que se comparan las distancias y no sólo su orden
+            distancias = np.sqrt(np.maximum(parciales + (bloque * bloque).sum(axis=1)[:, None], 0))
+            if len(self.clases) > 1:
+                dos_menores = np.partition(distancias, 1, axis=1)[:, :2]
+                margenes[inicio:inicio + len(bloque)] = (dos_menores[:, 1] - dos_menores[:, 0]) / np.maximum(dos_menores[:, 1], 1e-12)
+        return predicciones, margenes
+
+
+'''
+    Función principal
+'''
+
+def comparar_centroides(x_train: np.ndarray, y_train: np.ndarray, x_test: np.ndarray, y_test: np.ndarray,
+                        k: int = 5, profundidad: int = 10) -> dict:
+    """
+    Comparar el clasificador por centroide más cercano contra KNN (vecinos exactos sobre los 784 pixeles) y un árbol de decisión:
+    exactitud, tiempo de entrenamiento y tiempo de predicción por imagen.
+
+    Parámetros:
+        x_train (np.ndarray): Matriz (train, 784) de pixeles uint8.
+        y_train (np.ndarray): Etiquetas de train.
+        x_test (np.ndarray): Matriz (test, 784) de pixeles uint8.
+        y_test (np.ndarray): Etiquetas de test.
+        k (int): Cantidad de vecinos de KNN.
+        profundidad (int): Profundidad máxima del árbol.
+
+    Retorna:
+        dict: Resultados de cada clasificador (también se imprimen por consola).
+    """
+
+    x_train = np.asarray(x_train)
+    x_test = np.asarray(x_test)
+    y_test = np.asarray(y_test)
+
+    clasificadores = (
+        ('Centroide más cercano', lambda: ClasificadorCentroides().fit(x_train, y_train), lambda modelo: modelo.predict(x_test)),
+        # KNN no entrena: se guardan los datos (y sus normas)
+        (f'KNN (K = {k})', lambda: KNNExacto(n_neighbors = k).fit(x_train, y_train), lambda modelo: modelo.predict(x_test)),
+        (f'Árbol (profundidad {profundidad})', lambda: DecisionTreeClassifier(max_depth = profundidad, random_state = 42).fit(x_train, y_train),
+         lambda modelo: modelo.predict(x_test)),
+    )
+
+    resultado = {}
+    for nombre, entrenar, predecir in clasificadores:
+        inicio = time.perf_counter()
+        modelo = entrenar()
+        tiempo_fit = time.perf_counter() - inicio
+        inicio = time.perf_counter()
+        prediccion = predecir(modelo)
+        tiempo_predict = time.perf_counter() - inicio
+        resultado[nombre] = {
+            'exactitud': float(np.mean(prediccion == y_test)),
+            'fit': tiempo_fit,
+            'predict_por_imagen': tiempo_predict / max(1, len(x_test)),
+        }
+        print(f"{nombre}: exactitud {resultado[nombre]['exactitud']:.4f}, fit {tiempo_fit * 1000:.2f} ms, "
+              f"predict {resultado[nombre]['predict_por_imagen'] * 1e6:.2f} µs por imagen")
+    return resultado
@@ -5,70 +5,92 @@
     - Nogueroles, Patricio
 
     El método principal, clasificacion_binaria(), el cual se ubica al final del archivo, se divide en las siguientes etapas:
-        1. Construcción de un nuevo dataframe que contenga sólo los dígitos 0 y 1
+        1. Construcción de un nuevo dataset que contenga sólo los dígitos 0 y 1
         2. Separar los datos en conjuntos de train y test
         3. Ajustar modelos KNN variando los atributos
         4. Ajustar modelos KNN variando el K y los atributos
+    Con comparaciones = True se ejecutan además comparaciones de rendimiento, que no forman parte del enunciado y demoran bastante más:
+        - En la etapa 3, KNN con tres atributos agrupando las filas repetidas o precalculado como tabla, la búsqueda de las mejores ternas,
+          la selección hacia adelante de pixeles, y KNN con los 784 pixeles (de lo grueso a lo fino, con las imágenes binarizadas y empaquetadas en bits, en formato disperso CSR,
+          o de a bloques de test)
+        - En la etapa 4, la evaluación de cada K dejando uno afuera (sin partición train/test)
+        - Una etapa 5, que repite la clasificación binaria con KNN para los 45 pares de dígitos, a partir de una única búsqueda de vecinos sobre las 10 clases
 
     Precondiciones
-        Contar con las librerías sklearn, pandas y matplotlib
+        Contar con las librerías sklearn, numpy y matplotlib
+        Recibir el dataset TMNIST como TMNISTDataset (ver Auxiliares/CargaDatos.py)
 
     Aclaración:
         Se presentan en principio las funciones auxiliares, pero la función principal clasificacion_binaria() está definida al final y sigue el orden del enunciado
 '''
 
 from sklearn.model_selection import train_test_split
-from sklearn.neighbors import KNeighborsClassifier
 from sklearn import metrics
-import pandas as pd
+from sklearn.neighbors import KNeighborsClassifier
+import numpy as np
 import matplotlib.pyplot as plt
 
+from Auxiliares.CargaDatos import TMNISTDataset, LADO_IMAGEN
+from Auxiliares.BarridoKNN import barrido_knn_incremental
+from Auxiliares.BusquedaTernas import buscar_ternas
+from Auxiliares.SeleccionPixeles import seleccion_hacia_adelante
+from Auxiliares.KNNPonderado import KNNPonderado, comparar_con_sklearn
+from Auxiliares.KNNTabla import KNNTabla, verificar_contra_knn
+from Auxiliares.KNNPiramide import comparar_con_knn_exacto
+from Auxiliares.KNNBinario import comparar_con_euclidea
+from Auxiliares.RepresentacionDispersa import comparar_denso_disperso
+from Auxiliares.PrediccionPorBloques import predecir_por_bloques, comparar_escalamiento
+from Auxiliares.NucleoDistancias import KNNExacto
+from Auxiliares.DejarUnoAfuera import exactitud_dejando_uno_afuera
+from Auxiliares.SeparabilidadPares import separabilidad_por_pares
+from Auxiliares.AlmacenResultados import memorizar
+
 '''
     FUNCIONES AUXILIARES
 '''
-def aplanar(x: int, y: int):
-    # Función para convertir una coordenada (x, y) con x, y entre [0, 27] a un digito entre 1 y 784
-    # Esto sirve para convertir fácilmente una coordenada a una columna del dataset de dígitos
-    return (x*28) + y + 1
+# Para convertir una coordenada (x, y) con x, y entre [0, 27] a una columna de la matriz de pixeles se utiliza TMNISTDataset.indice_pixel(x, y)
 
 
-def clasificar_tres_atributos(train: pd.DataFrame, test: pd.DataFrame):
+def clasificar_tres_atributos(train: TMNISTDataset, test: TMNISTDataset):
     # Se elijen distintas tuplas (x_1, y_1, x_2, y_2, x_3, y_3) para seleccionar los atributos correspondientes (esto se explica en el informe, Sección 4.1)
     t1 = (10, 9, 15, 19, 21, 22)
     t2 = (8, 16, 15, 25, 22, 14)
     t3 = (15, 3, 15, 11, 22, 11)
     tuplas = [t1, t2, t3]
 
-    # Una lista de valores X que serán dataframes train (habrá uno por cada tupla)
+    # Una lista de valores X que serán matrices train (habrá uno por cada tupla)
     X_list = [] 
     for t in tuplas:
-        # Se utiliza la tupla t para generar el dataframe train "X_t"
-        X_list.append(train[[str(aplanar(t[0], t[1])), str(aplanar(t[2], t[3])), str(aplanar(t[4], t[5]))]])
+        # Se utiliza la tupla t para generar la matriz train "X_t"
+        X_list.append(train.pixeles[:, TMNISTDataset.indices_pixeles([(t[0], t[1]), (t[2], t[3]), (t[4], t[5])])])
 
     # El atributo de testeo será igual para todos los train
-    Y = train['labels']
+    Y = train.etiquetas
 
     # Creación y entrenamiento de los modelos KNN (con K = 5, por tener que elegir un valor)
     k = 5
-    models = []
-    for X in X_list:
-        # Además de crearlos, se los entrena ya con su correspondiente X (de X_list)
-        models.append(KNeighborsClassifier(n_neighbors = k).fit(X, Y))
+    # Además de crearlos, se los entrena ya con su correspondiente X (de X_list)
+    # Con sólo tres pixeles muchas filas de train se repiten: KNNPonderado las agrupa en puntos únicos y predice lo mismo que
+    # KNeighborsClassifier, al que delega sólo las filas cuya votación depende del desempate en distancia (ver Auxiliares/KNNPonderado.py)
+    # Los modelos entrenados se guardan en disco y se reutilizan mientras no cambien los datos ni los parámetros (ver Auxiliares/AlmacenResultados.py)
+    models = memorizar('clasificar_tres_atributos', (train.pixeles, Y), {'tuplas': tuplas, 'k': k, 'modelo': 'KNNPonderado'},
+                       lambda: [KNNPonderado(n_neighbors = k).fit(X, Y) for X in X_list])
 
 
     # Una lista de valores X_test, que serán el subconjunto de test correspondiente a cada tupla
     X_test_list = []
     for t in tuplas:
-        # Se utiliza la tupla t para generar el dataframe train "X_t"
-        X_test_list.append(test[[str(aplanar(t[0], t[1])), str(aplanar(t[2], t[3])), str(aplanar(t[4], t[5]))]])
+        # Se utiliza la tupla t para generar la matriz test "X_test_t"
+        X_test_list.append(test.pixeles[:, TMNISTDataset.indices_pixeles([(t[0], t[1]), (t[2], t[3]), (t[4], t[5])])])
 
     # El atributo de testeo será igual para todos los X_test
-    Y_test = test['labels']
+    Y_test = test.etiquetas
 
     # Realizar predicciones por cada modelo y agregarlas en orden en Y_predict_list
+    # El test se predice de a bloques acotados por un presupuesto de memoria, en varios hilos (ver Auxiliares/PrediccionPorBloques.py)
     Y_predict_list = []
     for i in range(0, len(models)):
-        Y_predict_list.append(models[i].predict(X_test_list[i]))
+        Y_predict_list.append(predecir_por_bloques(models[i], X_test_list[i]))
 
     # Chequear la exactitud (accuracy) de cada conjunto de predicciones
     scores = []
@@ -81,55 +103,66 @@ def clasificar_tres_atributos(train: pd.DataFrame, test: pd.DataFrame):
         print("Exactitud del modelo", str(i), ":", str(scores[i]))
 
 
-def clasificar_variando_atributos(train: pd.DataFrame, test: pd.DataFrame, ruta_graficos: str):
-    # Se varía entre una y diez coordenadas, elegidas "aleatoriamente" y se mide la exactitud para cada cantidad de atributos (coordenadas) a utilizar
-    coordenadas = [(8, 16), (15, 25), (22,14), (20, 20), (15, 6), (20, 23), (15, 15), (20, 6), (10, 9), (25, 15)]
-
-    # Aplicar a cada coordenada la función aplanar, para obtener los atributos exactos a utilizar en el dataframe
-    # Esto resultará en ['241', '446', '631', '436', '427', '584', '290', '567', '716', '424']
-    atributos = [str(aplanar(c1, c2)) for (c1, c2) in coordenadas]
-
-    # Se generarán diez modelos a entrenar, cada uno agregando un nuevo atributo respecto del modelo anterior
-    # Es decir, resultará en una lista [['241'], ['241', '446'], ['241', '446', '631'], ...]
-    atributos_acum = []
-    for i in range(0, len(atributos)):
-        atributos_acum.append(atributos[0:(i+1)])
-
-    # Una lista de valores X que serán dataframes train (habrá uno por cada tupla)
-    X_list = [] 
-    for attrs in atributos_acum:
-        # Se utilizan los atributos a_1, a_2, ..., a_i para generar el dataframe train "X_i"
-        X_list.append(train[attrs])
-
-    # El atributo de testeo será igual para todos los train
-    Y = train['labels']
-
-    # Creación y entrenamiento de los modelos KNN (con K = 5, por tener que elegir un valor)
+def clasificar_tres_atributos_tabla(train: TMNISTDataset, test: TMNISTDataset):
+    # Los modelos de clasificar_tres_atributos, precalculados como una tabla sobre las 256^3 entradas posibles de los tres pixeles
+    # Una vez construida la tabla, predecir es sólo indexarla (ver Auxiliares/KNNTabla.py). Se verifica que prediga lo mismo que KNeighborsClassifier
+    tuplas = [(10, 9, 15, 19, 21, 22), (8, 16, 15, 25, 22, 14), (15, 3, 15, 11, 22, 11)]
+    X_list = [train.pixeles[:, TMNISTDataset.indices_pixeles([(t[0], t[1]), (t[2], t[3]), (t[4], t[5])])] for t in tuplas]
+    X_test_list = [test.pixeles[:, TMNISTDataset.indices_pixeles([(t[0], t[1]), (t[2], t[3]), (t[4], t[5])])] for t in tuplas]
+    Y, Y_test = train.etiquetas, test.etiquetas
     k = 5
-    models = []
-    for X in X_list:
-        # Además de crearlos, se los entrena ya con su correspondiente X (de X_list)
-        models.append(KNeighborsClassifier(n_neighbors = k).fit(X, Y))
+    models = [KNeighborsClassifier(n_neighbors = k).fit(X, Y) for X in X_list]
+
+    niveles = 256
+    tablas = memorizar('clasificar_tres_atributos_tabla', (train.pixeles, Y), {'tuplas': tuplas, 'k': k, 'niveles': niveles},
+                       lambda: [KNNTabla(n_neighbors = k, niveles = niveles).fit(X, Y) for X in X_list])
+    for i in range(0, len(X_list)):
+        tabla = tablas[i]
+        score_tabla = metrics.accuracy_score(Y_test, tabla.predict(X_test_list[i]))
+        print("Exactitud del modelo", str(i), "precalculado como tabla de", str(tabla.niveles_), "niveles por pixel :", str(score_tabla))
+        verificar_contra_knn(tabla, models[i], X_test_list[i])
+
+
+def comparar_tres_atributos(train: TMNISTDataset, test: TMNISTDataset):
+    # KNNPonderado, el modelo de clasificar_tres_atributos, agrupa las filas repetidas de train en puntos únicos (ver Auxiliares/KNNPonderado.py)
+    # Se compara su tiempo con el de KNeighborsClassifier para las tres ternas, y se verifica que sus predicciones coincidan
+    tuplas = [(10, 9, 15, 19, 21, 22), (8, 16, 15, 25, 22, 14), (15, 3, 15, 11, 22, 11)]
+    print("Comparación de KNNPonderado con KNeighborsClassifier para las tres ternas del ejercicio 2.C")
+    for t in tuplas:
+        atributos = TMNISTDataset.indices_pixeles([(t[0], t[1]), (t[2], t[3]), (t[4], t[5])])
+        print("Terna", str(t))
+        comparar_con_sklearn(train.pixeles[:, atributos], train.etiquetas, test.pixeles[:, atributos], k = 5)
 
 
-    # Una lista de valores X_test, que serán el subconjunto de test correspondiente a cada tupla
-    X_test_list = []
-    for attrs in atributos_acum:
-        # Se utilizan los atributos a_1, a_2, ..., a_i para generar el dataframe test "X_test_i"
-        X_test_list.append(test[attrs])
+def clasificar_mejores_ternas(train: TMNISTDataset, test: TMNISTDataset, cantidad_muestras: int = 2000, k: int = 5):
+    # En lugar de elegir las ternas a mano, se buscan las mejores sobre una muestra estratificada de todas las posibles (ver Auxiliares/BusquedaTernas.py)
+    # Las ternas se eligen con una validación separada de train, y sólo las elegidas se evalúan sobre test con KNeighborsClassifier
+    mejores = memorizar('buscar_ternas', (train.pixeles, train.etiquetas), {'cantidad_muestras': cantidad_muestras, 'k': k},
+                        lambda: buscar_ternas(train, k = k, mejores = 3, cantidad_muestras = cantidad_muestras))
+    print("Mejores ternas de una muestra de", str(cantidad_muestras), "ternas, elegidas con una validación separada de train")
+    for exactitud_validacion, t in mejores:
+        atributos = TMNISTDataset.indices_pixeles([(t[0], t[1]), (t[2], t[3]), (t[4], t[5])])
+        modelo = KNeighborsClassifier(n_neighbors = k).fit(train.pixeles[:, atributos], train.etiquetas)
+        exactitud_test = metrics.accuracy_score(test.etiquetas, modelo.predict(test.pixeles[:, atributos]))
+        print("Terna", str(t), "- exactitud en validación :", str(exactitud_validacion), "- exactitud en test :", str(exactitud_test))
 
-    # El atributo de testeo será igual para todos los X_test
-    Y_test = test['labels']
 
-    # Realizar predicciones por cada modelo y agregarlas en orden en Y_predict_list
-    Y_predict_list = []
-    for i in range(0, len(models)):
-        Y_predict_list.append(models[i].predict(X_test_list[i]))
+def clasificar_variando_atributos(train: TMNISTDataset, test: TMNISTDataset, ruta_graficos: str):
+    # Se varía entre una y diez coordenadas, elegidas "aleatoriamente" y se mide la exactitud para cada cantidad de atributos (coordenadas) a utilizar
+    coordenadas = [(8, 16), (15, 25), (22,14), (20, 20), (15, 6), (20, 23), (15, 15), (20, 6), (10, 9), (25, 15)]
 
-    # Chequear la exactitud (accuracy) de cada conjunto de predicciones
-    scores = []
-    for Y_predict in Y_predict_list:
-        scores.append(metrics.accuracy_score(Y_test, Y_predict))
+    # Convertir cada coordenada a su columna en la matriz de pixeles, para obtener los atributos exactos a utilizar
+    # Esto resultará en [240, 445, 630, 435, 426, 583, 289, 566, 715, 423]
+    atributos = list(TMNISTDataset.indices_pixeles(coordenadas))
+
+    # Se evalúan diez modelos, cada uno agregando un nuevo atributo respecto del modelo anterior
+    # Es decir, con los atributos [240], [240, 445], [240, 445, 630], ...
+    # En lugar de entrenar diez modelos KNN, se acumula la distancia pixel a pixel y se evalúan todos en una única pasada (ver Auxiliares/BarridoKNN.py)
+    # Las exactitudes son las de KNeighborsClassifier: las filas cuya votación depende de cómo se desempatan las distancias se predicen con él
+    # K = 5, por tener que elegir un valor
+    k = 5
+    scores = memorizar('clasificar_variando_atributos', (train.pixeles, train.etiquetas, test.pixeles, test.etiquetas), {'atributos': atributos, 'k': k},
+                       lambda: list(barrido_knn_incremental(train.pixeles[:, atributos], train.etiquetas, test.pixeles[:, atributos], test.etiquetas, [k])[:, 0]))
 
     # Guardar el gráfico generado
     plt.clf()
@@ -147,58 +180,84 @@ def clasificar_variando_atributos(train: pd.DataFrame, test: pd.DataFrame, ruta_
         print("Exactitud del modelo", str(i), ":", str(scores[i]))
 
 
-def clasificar_variando_k(train: pd.DataFrame, test: pd.DataFrame, k_list: list, ruta_graficos: str):
-    # Se eligen nuevas diez coordenadas para ver cómo varía la exactitud a medida que se agregan atributos, al igual que en la función clasificar_variando_atributos, pero haciéndolo para distintos k
-    coordenadas = [(4, 7), (7,6), (23, 7), (9, 9), (20, 6), (15, 3), (15, 25), (20, 6), (17, 23),(10, 18) ]
+def clasificar_seleccion_hacia_adelante(train: TMNISTDataset, test: TMNISTDataset, ruta_graficos: str, cantidad: int = 10):
+    # En lugar de fijar la lista de coordenadas, se eligen de a una por selección hacia adelante: en cada paso, el pixel que más mejora la exactitud
+    # Para no elegir los pixeles mirando test, se separa un 20% de train como validación (con la misma semilla que el resto del trabajo)
+    filas_train, filas_validacion = train_test_split(np.arange(len(train)), test_size=0.2, random_state=42, stratify=train.etiquetas)
 
-    # Aplicar a cada coordenada la función aplanar, para obtener los atributos exactos a utilizar en el dataframe
-    # Esto resultará en ['120', '203', '652', '262', '567', '424', '446', '567', '500', '299']
-    atributos = [str(aplanar(c1, c2)) for (c1, c2) in coordenadas]
+    # La selección mantiene la matriz de distancias de los pixeles ya elegidos, en lugar de reentrenar un modelo por candidato (ver Auxiliares/SeleccionPixeles.py)
+    k = 5
+    atributos, _ = memorizar('clasificar_seleccion_hacia_adelante', (train.pixeles, train.etiquetas, filas_validacion), {'cantidad': cantidad, 'k': k},
+                             lambda: seleccion_hacia_adelante(train.pixeles[filas_train], train.etiquetas[filas_train],
+                                                              train.pixeles[filas_validacion], train.etiquetas[filas_validacion], cantidad = cantidad, k = k))
+    coordenadas = [divmod(p, LADO_IMAGEN) for p in atributos]
 
-    # Se generarán diez modelos a entrenar, cada uno agregando un nuevo atributo respecto del modelo anterior
-    # Es decir, resultará en una lista [['120'], ['120', '203'], ['120', '203', '652'], ...]
-    atributos_acum = []
-    for i in range(0, len(atributos)):
-        atributos_acum.append(atributos[0:(i+1)])
+    # La exactitud sobre test de cada prefijo de los pixeles elegidos se calcula igual que en clasificar_variando_atributos
+    scores = list(barrido_knn_incremental(train.pixeles[:, atributos], train.etiquetas, test.pixeles[:, atributos], test.etiquetas, [k])[:, 0])
 
-    # Una lista de valores X que serán dataframes train (habrá uno por cada tupla)
-    X_list = [] 
-    for attrs in atributos_acum:
-        # Se utilizan los atributos a_1, a_2, ..., a_i para generar el dataframe train "X_i"
-        X_list.append(train[attrs])
+    # Guardar el gráfico generado (con el mismo formato que el de la variación de atributos)
+    plt.clf()
+    plt.plot(range(1, len(scores) + 1), scores, label='Selección hacia adelante', marker='o')
+    plt.xlabel('Cantidad de atributos')
+    plt.ylabel('Exactitud del modelo')
+    plt.xticks(range(1, len(scores) + 1))
+    plt.legend()
+    plt.grid(True)
+    plt.savefig(ruta_graficos + 'Clasificacion Binaria - 2.C - Seleccion hacia adelante.png')
 
-    # El atributo de testeo será igual para todos los train
-    Y = train['labels']
-
-    scores_total = []
-    # Entrenar los modelos variando el K en función de la lista pasada como parámetro
-    for k in k_list:
-        models = []
-        for X in X_list:
-            # Además de crearlos, se los entrena ya con su correspondiente X (de X_list)
-            models.append(KNeighborsClassifier(n_neighbors = k).fit(X, Y))
-        
-        
-        # Una lista de valores X_test, que serán el subconjunto de test correspondiente a cada tupla
-        X_test_list = []
-        for attrs in atributos_acum:
-            # Se utilizan los atributos a_1, a_2, ..., a_i para generar el dataframe test "X_test_i"
-            X_test_list.append(test[attrs])
-        
-        # El atributo de testeo será igual para todos los X_test
-        Y_test = test['labels']
-        
-        # Realizar predicciones por cada modelo y agregarlas en orden en Y_predict_list
-        Y_predict_list = []
-        for i in range(0, len(models)):
-            Y_predict_list.append(models[i].predict(X_test_list[i]))
-        
-        # Chequear la exactitud (accuracy) de cada conjunto de predicciones
-        scores = []
-        for Y_predict in Y_predict_list:
-            scores.append(metrics.accuracy_score(Y_test, Y_predict))
+    # Imprimir las coordenadas elegidas y la exactitud de cada modelo en la consola
+    print("Resultados de la selección hacia adelante: exactitud al agregar los pixeles elegidos")
+    for i in range(0, len(scores)):
+        print("Coordenada", str(coordenadas[i]), "- exactitud del modelo", str(i), ":", str(scores[i]))
+
+
+def clasificar_piramide(train: TMNISTDataset, test: TMNISTDataset):
+    # Como referencia, se clasifica con los 784 pixeles: se preseleccionan vecinos con las imágenes reducidas a 7x7 y 14x14,
+    # y sólo esos se comparan en 28x28 (ver Auxiliares/KNNPiramide.py). Se compara contra KNN exacto con distintos tamaños de preselección
+    print("Resultados KNN con los 784 pixeles: búsqueda piramidal de vecinos comparada con KNN exacto")
+    comparar_con_knn_exacto(train.pixeles, train.etiquetas, test.pixeles, test.etiquetas, k = 5)
+
+
+def clasificar_binarizado(train: TMNISTDataset, test: TMNISTDataset):
+    # Los glifos son casi todos de dos tonos: se binariza cada imagen y se la guarda en 98 bytes (en lugar de 784), y se clasifica
+    # con la distancia de Hamming contando bits (ver Auxiliares/KNNBinario.py). Se compara contra KNN euclídeo sobre los grises
+    print("Resultados KNN con los 784 pixeles: imágenes binarizadas (distancia de Hamming) comparadas con grises (distancia euclídea)")
+    comparar_con_euclidea(train.pixeles, train.etiquetas, test.pixeles, test.etiquetas, k = 5)
+
+
+def clasificar_disperso(train: TMNISTDataset, test: TMNISTDataset):
+    # La mayoría de los pixeles son fondo (0): se clasifica con la matriz de pixeles en formato CSR, calculando las distancias como
+    # ||a||^2 + ||b||^2 - 2 a.b sobre los pixeles encendidos (ver Auxiliares/RepresentacionDispersa.py). Se compara tiempo y memoria con la matriz densa
+    print("Resultados con los 784 pixeles: representación densa comparada con la dispersa (CSR)")
+    comparar_denso_disperso(train.pixeles, train.etiquetas, test.pixeles, test.etiquetas, k = 5)
+
+
+def clasificar_por_bloques(train: TMNISTDataset, test: TMNISTDataset):
+    # Con los 784 pixeles, predecir todo el test en una única llamada implica una matriz de distancias (test x train) que crece con el test.
+    # Se predice de a bloques según un presupuesto de memoria, y se mide cómo escalan el tiempo y el pico de memoria (ver Auxiliares/PrediccionPorBloques.py)
+    print("Resultados KNN con los 784 pixeles: predicción de a bloques acotados por un presupuesto de memoria")
+    # El modelo es KNN sobre el núcleo de distancias enteras por teselas (ver Auxiliares/NucleoDistancias.py)
+    modelo = KNNExacto(n_neighbors = 5).fit(train.pixeles, train.etiquetas)
+    comparar_escalamiento(modelo, test.pixeles, memoria_maxima = 16 * 2**20)
+
+
+def clasificar_variando_k(train: TMNISTDataset, test: TMNISTDataset, k_list: list, ruta_graficos: str):
+    # Se eligen nuevas diez coordenadas para ver cómo varía la exactitud a medida que se agregan atributos, al igual que en la función clasificar_variando_atributos, pero haciéndolo para distintos k
+    coordenadas = [(4, 7), (7,6), (23, 7), (9, 9), (20, 6), (15, 3), (15, 25), (20, 6), (17, 23),(10, 18) ]
 
-        scores_total.append(scores)
+    # Convertir cada coordenada a su columna en la matriz de pixeles, para obtener los atributos exactos a utilizar
+    # Esto resultará en [119, 202, 651, 261, 566, 423, 445, 566, 499, 298]
+    atributos = list(TMNISTDataset.indices_pixeles(coordenadas))
+
+    # Se evalúan diez modelos por cada K, cada uno agregando un nuevo atributo respecto del modelo anterior
+    # Es decir, con los atributos [119], [119, 202], [119, 202, 651], ...
+    # Las exactitudes de todos los K y todos los conjuntos de atributos salen de una única pasada incremental (ver Auxiliares/BarridoKNN.py)
+    # Como en clasificar_variando_atributos, son exactamente las exactitudes de KNeighborsClassifier
+    exactitudes = memorizar('clasificar_variando_k', (train.pixeles, train.etiquetas, test.pixeles, test.etiquetas), {'atributos': atributos, 'k_list': k_list},
+                            lambda: barrido_knn_incremental(train.pixeles[:, atributos], train.etiquetas, test.pixeles[:, atributos], test.etiquetas, k_list))
+
+    # scores_total[i] tiene las exactitudes (de 1 a 10 atributos) para K = k_list[i]
+    scores_total = [list(exactitudes[:, i]) for i in range(0, len(k_list))]
             
     # Guardar el gráfico generado
     plt.clf()
@@ -216,42 +275,121 @@ def clasificar_variando_k(train: pd.DataFrame, test: pd.DataFrame, k_list: list,
 
 
 
+def clasificar_dejando_uno_afuera(ceros_unos: TMNISTDataset, k_list: list):
+    # En lugar de la partición 80/20, cada imagen se clasifica con todas las demás como train (leave-one-out), con los mismos diez
+    # atributos de clasificar_variando_k y con los 784 pixeles. Todos los K salen de una única tabla de vecinos (ver Auxiliares/DejarUnoAfuera.py)
+    atributos = list(TMNISTDataset.indices_pixeles([(4, 7), (7,6), (23, 7), (9, 9), (20, 6), (15, 3), (15, 25), (20, 6), (17, 23),(10, 18)]))
+    print("Resultados ejercicio 2.D dejando uno afuera: exactitud para cada K sobre todo el subconjunto de ceros y unos")
+    for nombre, columnas in (('10 atributos', atributos), ('784 pixeles', list(range(ceros_unos.pixeles.shape[1])))):
+        exactitudes = memorizar('clasificar_dejando_uno_afuera', (ceros_unos.pixeles, ceros_unos.etiquetas), {'atributos': columnas, 'k_list': k_list},
+                                lambda: exactitud_dejando_uno_afuera(ceros_unos.pixeles[:, columnas], ceros_unos.etiquetas, k_list))
+        for i in range(0, len(k_list)):
+            print("Con", nombre, "- K =", str(k_list[i]), ": exactitud", str(exactitudes[i]))
+
+
+def clasificar_todos_los_pares(dataset: TMNISTDataset, ruta_graficos: str, k: int = 5):
+    # Exactitud de KNN binario (dejando uno afuera, con los 784 pixeles) para cada par de dígitos, y no sólo para 0 y 1.
+    # Los vecinos se buscan una única vez sobre las 10 clases, y cada par se evalúa quedándose con los vecinos de sus dos dígitos (ver Auxiliares/SeparabilidadPares.py)
+    clases, separabilidad, busquedas_directas = memorizar('separabilidad_por_pares', (dataset.pixeles, dataset.etiquetas), {'k': k},
+                                                          lambda: separabilidad_por_pares(dataset.pixeles, dataset.etiquetas, k = k))
+    print("Resultados clasificación binaria de todos los pares de dígitos: exactitud de KNN (K = " + str(k) + ") dejando uno afuera")
+    print("Imágenes cuyos vecinos se buscaron directamente dentro de su par:", str(busquedas_directas))
+    i, j = np.unravel_index(np.nanargmin(separabilidad), separabilidad.shape)
+    print("Par menos separable:", str((int(clases[i]), int(clases[j]))), "- exactitud :", str(separabilidad[i, j]))
+
+    # Guardar el heatmap de exactitudes (la diagonal queda vacía)
+    plt.figure(figsize=(8, 8))
+    plt.imshow(separabilidad, cmap='hot', interpolation='nearest')
+    plt.colorbar(label='Exactitud de KNN binario')
+    plt.xlabel('Dígito')
+    plt.ylabel('Dígito')
+    plt.xticks(range(len(clases)), clases)
+    plt.yticks(range(len(clases)), clases)
+    plt.savefig(ruta_graficos + 'Clasificacion Binaria - Separabilidad entre pares de digitos.png')
+    plt.close()
+
 
 '''
     FUNCIÓN PRINCIPAL
 '''
-def clasificacion_binaria(df_digitos: pd.DataFrame, ruta_graficos: str):
-    # %% ETAPA 1: Construccion de un nuevo dataframe sólo con dígitos 0 y 1 y balanceo
-    df_ceros_unos = df_digitos[(df_digitos['labels'] == 0) | (df_digitos['labels'] == 1)].copy()
+def clasificacion_binaria(dataset: TMNISTDataset, ruta_graficos: str, comparaciones: bool = False):
+    # %% ETAPA 1: Construccion de un nuevo dataset sólo con dígitos 0 y 1 y balanceo
+    # Al ser dígitos consecutivos, el subconjunto es una porción del dataset (no se copian datos)
+    ceros_unos = dataset.de_etiquetas([0, 1])
 
     # Chequeo del subconjunto anterior sobre balanceo de clases en la muestra
-    df_ceros = df_ceros_unos[(df_ceros_unos['labels'] == 0)]
-    df_unos = df_ceros_unos[(df_ceros_unos['labels'] == 1)]
+    filas_ceros = ceros_unos.filas(0)
+    filas_unos = ceros_unos.filas(1)
 
-    assert df_ceros.shape[0] == df_unos.shape[0], "Error: hay distinta cantidad de ceros y unos en el subconjunto df_ceros_unos"
-    assert df_ceros.groupby('names')['names'].count().equals(df_unos.groupby('names')['names'].count()), "Error"
+    assert ceros_unos.cantidad(0) == ceros_unos.cantidad(1), "Error: hay distinta cantidad de ceros y unos en el subconjunto ceros_unos"
+    cantidad_fuentes = len(ceros_unos.fuentes.categories)
+    assert np.array_equal(np.bincount(ceros_unos.fuentes.codes[filas_ceros], minlength=cantidad_fuentes),
+                          np.bincount(ceros_unos.fuentes.codes[filas_unos], minlength=cantidad_fuentes)), "Error"
 
 
     # %% ETAPA 2: Separar los datos en conjuntos de train y test
     # Se realiza una partición aleatoria (aunque con una semilla/seed definida, para poder reproducir el mismo resultado en distintas ejecuciones)
     # El 80% será destinado a train y 20% a test
-    train_ceros, test_ceros = train_test_split(df_ceros, test_size=0.2, random_state=42)
-    train_unos, test_unos = train_test_split(df_unos, test_size=0.2, random_state=42)
+    # Se particionan los números de fila de cada dígito (y no sus imágenes), y luego se toman sólo esas filas del dataset
+    # La partición se guarda en disco junto con los resultados, y se reutiliza mientras el subconjunto no cambie
+    def particionar():
+        train_ceros, test_ceros = train_test_split(np.arange(filas_ceros.start, filas_ceros.stop), test_size=0.2, random_state=42)
+        train_unos, test_unos = train_test_split(np.arange(filas_unos.start, filas_unos.stop), test_size=0.2, random_state=42)
+        return train_ceros, test_ceros, train_unos, test_unos
+
+    train_ceros, test_ceros, train_unos, test_unos = memorizar('particion_binaria', (ceros_unos.etiquetas,),
+                                                                 {'filas_ceros': (filas_ceros.start, filas_ceros.stop), 'filas_unos': (filas_unos.start, filas_unos.stop),
+                                                                  'test_size': 0.2, 'random_state': 42}, particionar)
 
-    train = pd.concat([train_ceros, train_unos], ignore_index=True, sort=False)
-    test = pd.concat([test_ceros, test_unos], ignore_index=True, sort=False)
+    train = ceros_unos.subconjunto(np.concatenate([train_ceros, train_unos]))
+    test = ceros_unos.subconjunto(np.concatenate([test_ceros, test_unos]))
 
 
     # %% ETAPA 3: Ajustar modelos de KNN considerando distintos atributos
     # Se clasifica eligiendo tres distintos conjuntos de tres atributos cada uno (Ejercicio 2.C, parte 1)
     clasificar_tres_atributos(train, test)
 
+    if comparaciones:
+        # Tiempos de KNNPonderado, que agrupa las filas repetidas de train, comparados con los de KNeighborsClassifier (con las mismas predicciones)
+        comparar_tres_atributos(train, test)
+
+        # Los mismos modelos precalculados como tablas sobre todas las entradas posibles
+        clasificar_tres_atributos_tabla(train, test)
+
+        # En lugar de elegir las ternas a mano, se buscan las mejores sobre una muestra de todas las posibles
+        clasificar_mejores_ternas(train, test)
+
     # Se clasifica variando la cantidad de atributos, dado una lista de coordenadas a elegir (Ejercicio 2.C, parte 2)
     clasificar_variando_atributos(train, test, ruta_graficos)
 
+    if comparaciones:
+        # Se clasifica agregando los pixeles elegidos por selección hacia adelante, en lugar de una lista fija de coordenadas
+        clasificar_seleccion_hacia_adelante(train, test, ruta_graficos)
+
+        # Se clasifica con todos los pixeles, buscando los vecinos de lo grueso a lo fino
+        clasificar_piramide(train, test)
+
+        # Se clasifica con todos los pixeles binarizados y empaquetados en bits
+        clasificar_binarizado(train, test)
+
+        # Se clasifica con todos los pixeles en formato disperso
+        clasificar_disperso(train, test)
+
+        # Se clasifica con todos los pixeles, prediciendo el test de a bloques en varios hilos
+        clasificar_por_bloques(train, test)
+
 
 
     # %% ETAPA 4: Ajustar modelos de KNN considerando distintos valores de k y atributos
     # Se clasifica variando la cantidad de atributos y el K del algoritmo KNN (Ejercicio 2.D)
     k_values = [1, 3, 7, 15, 30]
     clasificar_variando_k(train, test, k_values, ruta_graficos)
+
+    if comparaciones:
+        # Los mismos K, evaluados dejando uno afuera sobre todo el subconjunto (una estimación con menos varianza que una única partición)
+        clasificar_dejando_uno_afuera(ceros_unos, k_values)
+
+
+    # %% ETAPA 5: Clasificación binaria de todos los pares de dígitos, con una única búsqueda de vecinos sobre el dataset completo
+    if comparaciones:
+        clasificar_todos_los_pares(dataset, ruta_graficos)
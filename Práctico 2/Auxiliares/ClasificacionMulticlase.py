@@ -9,44 +9,80 @@
         1. Preparación de los datos, dividiéndolos en datos de desarrollo y held-out.
         2. Entrenamiento de modelos con profundidades de 1 a 10, calculando su precisión en el conjunto de desarrollo.
         3. Validación cruzada.
+        Opcionalmente, se puede ajustar un único árbol (por fold) y cortarlo en cada profundidad, lo que es más rápido pero aproximado (ver Auxiliares/BarridoArboles.py).
         4. Evaluación final entrenando el modelo óptimo utilizando los datos de desarrollo completos y evalúa su desempeño en el conjunto de validación, 
         generando métricas finales de precisión, informe de clasificación y una matriz de confusión visualizada con un mapa de calor.
+    Con comparaciones = True se ejecutan además las siguientes comparaciones de rendimiento, que no forman parte del enunciado:
+        5. Comparación con KNN sobre los 784 pixeles, buscando los vecinos con un índice aproximado (ver Auxiliares/IndiceVecinos.py)
+        y de lo grueso a lo fino con imágenes reducidas (ver Auxiliares/KNNPiramide.py), y con las imágenes binarizadas (ver Auxiliares/KNNBinario.py).
+        6. Comparación de tiempo y memoria de KNN y del árbol con la matriz de pixeles densa y en formato disperso CSR, con el conjunto de desarrollo
+        y con uno sintético más grande de glifos desplazados (ver Auxiliares/RepresentacionDispersa.py).
+        7. Comparación de KNN y del árbol con un clasificador de referencia por centroide más cercano (ver Auxiliares/Centroides.py).
+        8. Cascada: un árbol poco profundo o el centroide más cercano responde las filas fáciles y sólo las dudosas pasan a KNN (ver Auxiliares/Cascada.py).
+        9. Exactitud de KNN sobre los 784 pixeles dejando uno afuera, para varios K, sobre todo el dataset (ver Auxiliares/DejarUnoAfuera.py).
 
 """
 
 '''
 
 # %% Importación de paquetes necesarios.
+import time
+
 import pandas as pd
 import numpy as np
-from sklearn.model_selection import train_test_split, cross_val_score
+from sklearn.model_selection import train_test_split
 from sklearn.tree import DecisionTreeClassifier
 from sklearn.metrics import accuracy_score, confusion_matrix, classification_report
 import seaborn as sns
 import matplotlib.pyplot as plt
 
+from Auxiliares.CargaDatos import TMNISTDataset
+from Auxiliares.BarridoArboles import barrido_profundidades, validacion_cruzada_por_profundidad
+from Auxiliares.ArbolPlano import ArbolPlano
+from Auxiliares.AlmacenResultados import memorizar
+from Auxiliares.IndiceVecinos import BosqueProyecciones, recall
+from Auxiliares.NucleoDistancias import vecinos_exactos, KNNExacto
+from Auxiliares.KNNPiramide import comparar_con_knn_exacto
+from Auxiliares.KNNBinario import comparar_con_euclidea
+from Auxiliares.RepresentacionDispersa import comparar_denso_disperso, ampliar_glifos
+from Auxiliares.Centroides import ClasificadorCentroides, comparar_centroides
+from Auxiliares.Cascada import barrer_umbrales
+from Auxiliares.DejarUnoAfuera import exactitud_dejando_uno_afuera
+
+# Motores de árbol de decisión disponibles. ArbolHistogramas (ver Auxiliares/ArbolHistogramas.py) no es uno de ellos: es una implementación
+# de referencia del entrenamiento con histogramas de pixeles uint8, más lenta que DecisionTreeClassifier
+MOTORES = ('sklearn',)
+
 # %% Funciones.
 
-def entrenar_arbol_decision(x_entrenamiento: pd.DataFrame, y_entrenamiento: pd.Series, profundidad_maxima: int) -> DecisionTreeClassifier:
+def crear_arbol(profundidad_maxima: int, motor: str = 'sklearn'):
+    # Árbol de decisión sin entrenar del motor indicado (ambos tienen los métodos fit y predict)
+    if motor not in MOTORES:
+        raise ValueError('Motor de árbol desconocido: ' + str(motor) + '. Debe ser uno de ' + str(MOTORES))
+    return DecisionTreeClassifier(max_depth=profundidad_maxima, random_state=42)
+
+def entrenar_arbol_decision(x_entrenamiento: pd.DataFrame, y_entrenamiento: pd.Series, profundidad_maxima: int, motor: str = 'sklearn') -> DecisionTreeClassifier:
 
     """
     Entrenar un clasificador de árbol de decisión con una profundidad máxima dada.
     
     Parámetros:
-        x_entrenamiento (pd.DataFrame): Conjunto de características de entrenamiento.
+        x_entrenamiento (pd.DataFrame): Conjunto de características de entrenamiento (también puede ser una matriz dispersa CSR, ver TMNISTDataset.dispersa()).
         y_entrenamiento (pd.Series): Conjunto de etiquetas de entrenamiento.
         profundidad_maxima (int): Profundidad máxima del árbol de decisión.
+        motor (str): Motor del árbol, uno de MOTORES ('sklearn', DecisionTreeClassifier).
     
     Retorna:
         DecisionTreeClassifier: El modelo entrenado.
 
     """
 
-    modelo = DecisionTreeClassifier(max_depth=profundidad_maxima, random_state=42)
+    modelo = crear_arbol(profundidad_maxima, motor)
     modelo.fit(x_entrenamiento, y_entrenamiento)
     return modelo
 
-def evaluar_con_validacion_cruzada(x_entrenamiento: pd.DataFrame, y_entrenamiento: pd.Series, rango_profundidades: range, ruta_guardado: str = None) -> dict:
+def evaluar_con_validacion_cruzada(x_entrenamiento: pd.DataFrame, y_entrenamiento: pd.Series, rango_profundidades: range, ruta_guardado: str = None,
+                                   procesos: int = 1) -> dict:
 
     """
     Evaluar árboles de decisión con diferentes profundidades utilizando validación cruzada k-fold.
@@ -55,6 +91,8 @@ def evaluar_con_validacion_cruzada(x_entrenamiento: pd.DataFrame, y_entrenamient
         x_entrenamiento (pd.DataFrame): Conjunto de características de entrenamiento.
         y_entrenamiento (pd.Series): Conjunto de etiquetas de entrenamiento.
         rango_profundidades (range): Rango de valores de profundidad máxima a evaluar.
+        procesos (int): Cantidad de procesos entre los que se reparten las celdas (profundidad, fold). Por defecto 1 (sin pool de procesos);
+            con más de 1, el script que llama debe estar protegido por if __name__ == '__main__' (ver tmnist_serendipicos.py).
     
     Retorna:
         dict: Diccionario con la mejor profundidad y su puntuación correspondiente.
@@ -64,11 +102,14 @@ def evaluar_con_validacion_cruzada(x_entrenamiento: pd.DataFrame, y_entrenamient
     mejor_profundidad = None
     puntuaciones_promedio = []  # Lista para almacenar las puntuaciones promedio de cada profundidad.
 
-    for profundidad in rango_profundidades:
-        modelo = DecisionTreeClassifier(max_depth=profundidad, random_state=42)
-        puntuaciones = cross_val_score(modelo, x_entrenamiento, y_entrenamiento, cv=5, scoring='accuracy')  # Validación cruzada k-fold de 5.
-        puntuacion_promedio = np.mean(puntuaciones)
-        
+    # Validación cruzada k-fold de 5, con los mismos folds y las mismas exactitudes que cross_val_score (ver Auxiliares/BarridoArboles.py).
+    # Cada celda (profundidad, fold) ajusta su propio árbol. Por defecto se ejecutan en el proceso actual; con procesos > 1 se reparten
+    # entre varios procesos, que comparten la matriz de atributos en memoria (uint8).
+    # Las puntuaciones se guardan en disco y se reutilizan mientras no cambien los datos ni las profundidades (ver Auxiliares/AlmacenResultados.py).
+    puntuaciones = memorizar('evaluar_con_validacion_cruzada', (x_entrenamiento, y_entrenamiento), {'profundidades': rango_profundidades, 'cv': 5, 'cortar_arbol': False},
+                             lambda: validacion_cruzada_por_profundidad(np.asarray(x_entrenamiento), np.asarray(y_entrenamiento), list(rango_profundidades), cv=5, procesos=procesos))
+
+    for profundidad, puntuacion_promedio in zip(rango_profundidades, puntuaciones.mean(axis=0)):
         puntuaciones_promedio.append(puntuacion_promedio)
         
         if puntuacion_promedio > mejor_puntuacion:
@@ -93,7 +134,7 @@ def evaluar_con_validacion_cruzada(x_entrenamiento: pd.DataFrame, y_entrenamient
 
 def evaluar_modelo_conjunto_validacion(x_entrenamiento: pd.DataFrame, y_entrenamiento: pd.Series, 
                                        x_prueba: pd.DataFrame, y_prueba: pd.Series, 
-                                       mejor_profundidad: int, ruta_guardado: str = None) -> None:
+                                       mejor_profundidad: int, ruta_guardado: str = None, motor: str = 'sklearn') -> None:
     
     """
     Entrenar el mejor modelo de árbol de decisión en el conjunto completo de desarrollo 
@@ -106,15 +147,17 @@ def evaluar_modelo_conjunto_validacion(x_entrenamiento: pd.DataFrame, y_entrenam
         y_prueba (pd.Series): Conjunto de etiquetas de validación.
         mejor_profundidad (int): La mejor profundidad máxima determinada previamente.
         ruta_guardado (str, opcional): Ruta donde guardar la imagen de la matriz de confusión.
+        motor (str): Motor del árbol, uno de MOTORES ('sklearn', DecisionTreeClassifier).
     
     """
     
-    # Entrenar el modelo con la mejor profundidad.
-    modelo = DecisionTreeClassifier(max_depth=mejor_profundidad, random_state=42)
-    modelo.fit(x_entrenamiento, y_entrenamiento)
+    # Entrenar el modelo con la mejor profundidad (o cargarlo, si ya se lo entrenó con los mismos datos y parámetros).
+    modelo = memorizar('evaluar_modelo_conjunto_validacion', (x_entrenamiento, y_entrenamiento), {'profundidad': mejor_profundidad, 'motor': motor},
+                       lambda: crear_arbol(mejor_profundidad, motor).fit(x_entrenamiento, y_entrenamiento))
     
     # Realizar predicciones en el conjunto de validación.
-    y_pred = modelo.predict(x_prueba)
+    # Se exporta el árbol a arreglos planos y se predice recorriéndolo nivel por nivel sobre los pixeles uint8 (ver Auxiliares/ArbolPlano.py).
+    y_pred = ArbolPlano.desde_modelo(modelo).predict(x_prueba)
     
     # Calcular precisión en el conjunto de validación.
     precision = accuracy_score(y_prueba, y_pred)
@@ -138,29 +181,104 @@ def evaluar_modelo_conjunto_validacion(x_entrenamiento: pd.DataFrame, y_entrenam
     else:
         plt.show()  
 
+def evaluar_knn_aproximado(x_entrenamiento: np.ndarray, y_entrenamiento: np.ndarray, x_prueba: np.ndarray, y_prueba: np.ndarray,
+                           k: int = 5, cantidad_arboles: int = 8, tamano_hoja: int = 64) -> dict:
+
+    """
+    Clasificar el conjunto de validación con KNN sobre los 784 pixeles, buscando los vecinos con un índice aproximado
+    (ver Auxiliares/IndiceVecinos.py), y comparar la búsqueda contra la exacta.
+
+    Parámetros:
+        x_entrenamiento (np.ndarray): Pixeles de desarrollo.
+        y_entrenamiento (np.ndarray): Etiquetas de desarrollo.
+        x_prueba (np.ndarray): Pixeles de validación.
+        y_prueba (np.ndarray): Etiquetas de validación.
+        k (int): Cantidad de vecinos.
+        cantidad_arboles (int): Cantidad de árboles del índice (más árboles: más recall y más memoria).
+        tamano_hoja (int): Máxima cantidad de imágenes por hoja (hojas más grandes: más recall y menos consultas por segundo).
+
+    Retorna:
+        dict: Precisión de KNN aproximado y exacto, recall@k contra la búsqueda exacta y consultas por segundo de ambas búsquedas.
+
+    """
+
+    # El índice se construye una única vez y se reutiliza mientras no cambien los datos ni los parámetros.
+    indice = memorizar('evaluar_knn_aproximado', (x_entrenamiento,), {'cantidad_arboles': cantidad_arboles, 'tamano_hoja': tamano_hoja},
+                       lambda: BosqueProyecciones(cantidad_arboles, tamano_hoja).fit(x_entrenamiento))
+
+    inicio = time.perf_counter()
+    _, aproximados = indice.kneighbors(x_prueba, k)
+    tiempo_aproximado = time.perf_counter() - inicio
+    inicio = time.perf_counter()
+    exactos = vecinos_exactos(x_entrenamiento, x_prueba, k)
+    tiempo_exacto = time.perf_counter() - inicio
+
+    resultado = {
+        'precision': accuracy_score(y_prueba, indice.predecir(y_entrenamiento, x_prueba, k)),
+        # KNN exacto, con las mismas predicciones que KNeighborsClassifier (ver Auxiliares/NucleoDistancias.py)
+        'precision_exacta': accuracy_score(y_prueba, KNNExacto(n_neighbors = k).fit(x_entrenamiento, y_entrenamiento).predict(x_prueba)),
+        'recall': recall(aproximados, exactos),
+        'consultas_por_segundo': len(x_prueba) / tiempo_aproximado,
+        'consultas_por_segundo_exacta': len(x_prueba) / tiempo_exacto,
+    }
+    print(f"Precisión de KNN aproximado (k = {k}, 784 pixeles) en el conjunto de validación: {resultado['precision']:.4f} "
+          f"(KNN exacto: {resultado['precision_exacta']:.4f}).")
+    print(f"Recall@{k} del índice: {resultado['recall']:.4f}, con {resultado['consultas_por_segundo']:,.0f} consultas por segundo "
+          f"(búsqueda exacta: {resultado['consultas_por_segundo_exacta']:,.0f}).")
+    return resultado
+
+def evaluar_cascada(x_entrenamiento: np.ndarray, y_entrenamiento: np.ndarray, x_prueba: np.ndarray, y_prueba: np.ndarray,
+                    profundidad_maxima: int = 3, k: int = 5) -> dict:
+
+    """
+    Evaluar la cascada (primera etapa barata y KNN sobre los 784 pixeles para las filas dudosas) con distintos umbrales de margen,
+    usando como primera etapa un árbol de decisión poco profundo y el clasificador por centroide más cercano (ver Auxiliares/Cascada.py).
+
+    Parámetros:
+        x_entrenamiento (np.ndarray): Pixeles de desarrollo.
+        y_entrenamiento (np.ndarray): Etiquetas de desarrollo.
+        x_prueba (np.ndarray): Pixeles de validación.
+        y_prueba (np.ndarray): Etiquetas de validación.
+        profundidad_maxima (int): Profundidad máxima del árbol de la primera etapa.
+        k (int): Cantidad de vecinos de KNN.
+
+    Retorna:
+        dict: Para cada primera etapa, la proporción de filas escaladas, la precisión y la latencia de cada umbral.
+
+    """
+
+    primeras_etapas = {
+        'árbol de profundidad ' + str(profundidad_maxima): entrenar_arbol_decision(x_entrenamiento, y_entrenamiento, profundidad_maxima),
+        'centroide más cercano': ClasificadorCentroides().fit(x_entrenamiento, y_entrenamiento),
+    }
+    return {nombre: barrer_umbrales(modelo, x_entrenamiento, y_entrenamiento, x_prueba, y_prueba, k = k, nombre = nombre)
+            for nombre, modelo in primeras_etapas.items()}
+
 # %% Carga de datos y preparación del conjunto de entrenamiento y validación.
 
-def clasificacion_multiclase(df: pd.DataFrame, ruta_guardado: str = None):
+def clasificacion_multiclase(dataset: TMNISTDataset, ruta_guardado: str = None, comparaciones: bool = False):
     print('=====================================')
     print('  PUNTO 3. CLASIFICACIÓN MULTICLASE')
     print('=====================================')
-    # Separar en variables explicativas (X) y variable objetivo (y).
-    x = df.iloc[:, 2:].values  # Características: 784 píxeles de cada imagen.
-    y = df.iloc[:, 1].values   # Etiquetas: Dígitos (clase a predecir).
+    # Filas del dataset en el orden del CSV, para que la partición sea la misma que si se la hiciera sobre el CSV.
+    filas = dataset.orden_original()
+
+    # Dividir las filas en conjunto de desarrollo (entrenamiento) y de validación (held-out).
+    # La partición se guarda en disco y se reutiliza mientras el dataset no cambie.
+    filas_desarrollo, filas_validacion = memorizar('particion_multiclase', (filas, dataset.etiquetas), {'test_size': 0.2, 'random_state': 42},
+                                                   lambda: train_test_split(filas, test_size=0.2, random_state=42))
 
-    # Dividir los datos en conjunto de desarrollo (entrenamiento) y de validación (held-out).
-    x_desarrollo, x_validacion, y_desarrollo, y_validacion = train_test_split(x, y, test_size=0.2, random_state=42)
+    # Separar en variables explicativas (X) y variable objetivo (y).
+    x_desarrollo, y_desarrollo = dataset.pixeles[filas_desarrollo], dataset.etiquetas[filas_desarrollo]  # Características: 784 píxeles de cada imagen (uint8).
+    x_validacion, y_validacion = dataset.pixeles[filas_validacion], dataset.etiquetas[filas_validacion]  # Etiquetas: Dígitos (clase a predecir).
 
     # %% Entrenamiento de modelos de árboles de decisión con distintas profundidades.
 
     profundidades = range(1, 11)  # Profundidades de 1 a 10.
-    precisiones = []
 
-    for profundidad in profundidades:
-        modelo = entrenar_arbol_decision(x_desarrollo, y_desarrollo, profundidad)
-        y_pred = modelo.predict(x_desarrollo)
-        precision = accuracy_score(y_desarrollo, y_pred)
-        precisiones.append(precision)
+    # Se ajusta un árbol por profundidad (cortar un único árbol de profundidad 10 es más rápido, pero no da los mismos árboles; ver Auxiliares/BarridoArboles.py).
+    precisiones = memorizar('barrido_profundidades', (x_desarrollo, y_desarrollo), {'profundidades': profundidades, 'cortar_arbol': False},
+                            lambda: list(barrido_profundidades(x_desarrollo, y_desarrollo, x_desarrollo, y_desarrollo, list(profundidades), cortar_arbol=False)))
 
     # Identificar la mejor profundidad según la precisión.
     mejor_profundidad = profundidades[precisiones.index(max(precisiones))]
@@ -176,3 +294,47 @@ def clasificacion_multiclase(df: pd.DataFrame, ruta_guardado: str = None):
 
     # Entrenar el mejor modelo en el conjunto de desarrollo y evaluarlo en el conjunto de validación.
     evaluar_modelo_conjunto_validacion(x_desarrollo, y_desarrollo, x_validacion, y_validacion, resultado_cv['mejor_profundidad'], ruta_guardado = ruta_guardado)
+
+    # %% Comparaciones de rendimiento (pasos 5 a 9): no forman parte del enunciado y demoran bastante más, por lo que sólo se ejecutan con comparaciones = True.
+
+    if not comparaciones:
+        return
+
+    # %% Comparación con KNN sobre los 784 pixeles, buscando los vecinos con un índice aproximado.
+
+    evaluar_knn_aproximado(x_desarrollo, y_desarrollo, x_validacion, y_validacion)
+
+    # Preseleccionando los vecinos con las imágenes reducidas a 7x7 y 14x14, comparado con KNN exacto.
+    comparar_con_knn_exacto(x_desarrollo, y_desarrollo, x_validacion, y_validacion, k = 5)
+
+    # Con las imágenes binarizadas y empaquetadas en bits (distancia de Hamming), comparado con KNN euclídeo sobre los grises.
+    comparar_con_euclidea(x_desarrollo, y_desarrollo, x_validacion, y_validacion, k = 5)
+
+    # %% Comparación de la representación densa con la dispersa (CSR), que guarda sólo los pixeles distintos de 0.
+
+    # Tanto KNN como DecisionTreeClassifier reciben directamente la matriz CSR.
+    comparar_denso_disperso(x_desarrollo, y_desarrollo, x_validacion, y_validacion, k = 5, profundidad = resultado_cv['mejor_profundidad'])
+
+    # Para ver cómo escala cada representación con más filas que las del dataset, se repite la comparación con un conjunto de desarrollo
+    # sintético del triple de tamaño: cada glifo y dos copias desplazadas al azar hasta 2 pixeles (el test es el mismo).
+    x_ampliado, y_ampliado = ampliar_glifos(x_desarrollo, y_desarrollo, veces = 2)
+    print(f"Conjunto de desarrollo ampliado con glifos desplazados: {len(x_desarrollo) + len(x_ampliado)} filas.")
+    comparar_denso_disperso(np.concatenate([x_desarrollo, x_ampliado]), np.concatenate([y_desarrollo, y_ampliado]), x_validacion, y_validacion,
+                            k = 5, profundidad = resultado_cv['mejor_profundidad'])
+
+    # %% Clasificador de referencia: centroide (imagen promedio) más cercano, comparado con KNN y con el árbol.
+
+    comparar_centroides(x_desarrollo, y_desarrollo, x_validacion, y_validacion, k = 5, profundidad = resultado_cv['mejor_profundidad'])
+
+    # %% Cascada: la primera etapa responde cuando su margen supera el umbral, y sólo las filas dudosas se clasifican con KNN.
+
+    evaluar_cascada(x_desarrollo, y_desarrollo, x_validacion, y_validacion, profundidad_maxima = 3, k = 5)
+
+    # %% KNN dejando uno afuera: cada imagen del dataset se clasifica con todas las demás, sin partición ni reentrenamiento.
+
+    # Todos los K salen de una única búsqueda de los K+1 vecinos de cada imagen dentro del dataset.
+    k_values = [1, 3, 7, 15, 30]
+    exactitudes_loo = memorizar('exactitud_dejando_uno_afuera', (dataset.pixeles, dataset.etiquetas), {'k_list': k_values},
+                                lambda: exactitud_dejando_uno_afuera(dataset.pixeles, dataset.etiquetas, k_values))
+    for k, exactitud in zip(k_values, exactitudes_loo):
+        print(f"Precisión de KNN (k = {k}, 784 pixeles) dejando uno afuera: {exactitud:.4f}.")
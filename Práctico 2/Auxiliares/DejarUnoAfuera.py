@@ -0,0 +1,84 @@
+'''
+    Autores:
+    - Alvarez, Matías
+    - Dumas, Román
+    - Nogueroles, Patricio
+
+    Archivo encargado de evaluar KNN dejando uno afuera (leave-one-out): cada fila se clasifica con todas las demás como train.
+    En lugar de una única partición 80/20, se usan todas las filas como test, por lo que la estimación de la exactitud tiene mucha
+    menos varianza, y no hace falta reentrenar nada:
+        1. Se buscan una única vez los K+1 vecinos más cercanos de cada fila dentro del mismo conjunto (recorriéndolo por teselas,
+           ver Auxiliares/NucleoDistancias.py). Cada fila está a distancia 0 de sí misma, por lo que aparece entre sus vecinos.
+        2. Se quita a cada fila de su lista de vecinos, y quedan sus K vecinos entre las demás filas.
+        3. La exactitud para cada K sale de esa única tabla de vecinos (ver predecir_para_cada_k en Auxiliares/BarridoKNN.py).
+    El costo es el de una pasada de predicción con el conjunto completo como test.
+
+    La semántica es la misma que la de vecinos_mas_cercanos y predecir_para_cada_k (Auxiliares/BarridoKNN.py): empates en distancia a
+    favor de la fila de menor índice y empates de votos a favor de la clase menor.
+
+    Modo de uso:
+        exactitudes = exactitud_dejando_uno_afuera(X, Y, k_list = [1, 3, 7, 15, 30])
+'''
+
+import numpy as np
+
+from Auxiliares.BarridoKNN import predecir_para_cada_k
+from Auxiliares.NucleoDistancias import normas_cuadradas, vecinos_exactos
+
+
+'''
+    Funciones auxiliares
+'''
+
+def vecinos_sin_si_mismo(X: np.ndarray, k: int, filas_por_bloque: int = 4096) -> np.ndarray:
+    """
+    Buscar los k vecinos más cercanos de cada fila de X entre las demás filas de X.
+
+    Parámetros:
+        X (np.ndarray): Matriz (filas, atributos) de pixeles uint8.
+        k (int): Cantidad de vecinos (a lo sumo filas - 1).
+        filas_por_bloque (int): Cantidad de filas buscadas a la vez (acota la memoria de la tabla de k + 1 vecinos y de sus claves).
+
+    Retorna:
+        np.ndarray: Matriz (filas, k) de índices de X, ordenados por distancia (y por índice ante empates), sin la propia fila.
+    """
+
+    X = np.asarray(X)
+    k = min(k, len(X) - 1)
+    normas = normas_cuadradas(X)
+    vecinos = np.empty((len(X), k), dtype=np.int64)
+
+    for inicio in range(0, len(X), filas_por_bloque):
+        filas = np.arange(inicio, min(inicio + filas_por_bloque, len(X)))
+        candidatos = vecinos_exactos(X, X[filas], k + 1, normas_base=normas)
+        # Normalmente la propia fila es el primer vecino, pero si tiene filas idénticas de menor índice aparece después,
+        # o incluso no aparece (si hay más de k de ellas): en ese caso se descarta el último candidato
+        propia = candidatos == filas[:, None]
+        propia[~propia.any(axis=1), -1] = True
+        vecinos[filas] = candidatos[~propia].reshape(len(filas), k)
+
+    return vecinos
+
+
+'''
+    Función principal
+'''
+
+def exactitud_dejando_uno_afuera(X: np.ndarray, y: np.ndarray, k_list: list) -> np.ndarray:
+    """
+    Calcular la exactitud de KNN dejando uno afuera para cada K, a partir de una única tabla de vecinos.
+
+    Parámetros:
+        X (np.ndarray): Matriz (filas, atributos) de pixeles uint8.
+        y (np.ndarray): Etiquetas.
+        k_list (list): Valores de K a evaluar.
+
+    Retorna:
+        np.ndarray: Vector (len(k_list),) de exactitudes.
+    """
+
+    y = np.asarray(y)
+    clases, indices = np.unique(y, return_inverse=True)
+    vecinos = vecinos_sin_si_mismo(X, max(k_list))
+    predicciones = predecir_para_cada_k(indices[vecinos], [min(k, vecinos.shape[1]) for k in k_list], clases)
+    return (predicciones == y[None, :]).mean(axis=1)
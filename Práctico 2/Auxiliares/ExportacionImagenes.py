@@ -0,0 +1,187 @@
+'''
+    Autores:
+    - Alvarez, Matías
+    - Dumas, Román
+    - Nogueroles, Patricio
+
+    Archivo encargado de exportar las imágenes del dataset TMNIST a formato PNG.
+    El método principal es exportar_imagenes(...), que admite los siguientes modos:
+        - 'individual': un PNG por imagen (29.900 archivos), con el nombre '<fuente> - Digito <d>.png'
+        - 'atlas_digito': un PNG por dígito, con todas sus imágenes en una grilla, más un índice CSV con la posición de cada fuente
+        - 'atlas_fuente': un PNG por fuente, con sus diez dígitos en una fila
+        - 'tar' / 'zip': un único archivo comprimido con todos los PNG individuales y un índice CSV
+
+    Cada imagen se construye directamente desde su bloque de 28x28 pixeles uint8 con Image.fromarray (sin asignar pixel por pixel),
+    y el trabajo se reparte entre varios procesos.
+
+    Modo de uso:
+        exportar_imagenes(dataset, 'Graficos/Raw/', modo='atlas_digito')
+'''
+
+import csv
+import io
+import math
+import os
+import tarfile
+import zipfile
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+from PIL import Image
+
+from Auxiliares.CargaDatos import TMNISTDataset, LADO_IMAGEN
+
+MODOS = ('individual', 'atlas_digito', 'atlas_fuente', 'tar', 'zip')
+
+
+'''
+    Funciones auxiliares
+'''
+
+def ampliar(imagenes: np.ndarray, escala: int) -> np.ndarray:
+    # Agranda las imágenes (..., 28, 28) repitiendo cada pixel escala x escala veces (equivale a un resize con Image.NEAREST)
+    if escala == 1:
+        return imagenes
+    return np.repeat(np.repeat(imagenes, escala, axis=-2), escala, axis=-1)
+
+
+def codificar_png(imagen: np.ndarray) -> bytes:
+    # Codifica una imagen en escala de grises (matriz uint8) como PNG en memoria
+    buffer = io.BytesIO()
+    Image.fromarray(np.ascontiguousarray(imagen, dtype=np.uint8)).save(buffer, format='PNG')
+    return buffer.getvalue()
+
+
+def armar_grilla(imagenes: np.ndarray, columnas: int) -> np.ndarray:
+    # Ubica las imágenes (n, alto, ancho) en una grilla de 'columnas' columnas, completando con negro las celdas sobrantes
+    n, alto, ancho = imagenes.shape
+    filas = max(1, math.ceil(n / columnas))
+    grilla = np.zeros((filas * columnas, alto, ancho), dtype=np.uint8)
+    grilla[:n] = imagenes
+    return grilla.reshape(filas, columnas, alto, ancho).transpose(0, 2, 1, 3).reshape(filas * alto, columnas * ancho)
+
+
+def nombre_imagen(fuente: str, digito: int) -> str:
+    return str(fuente) + ' - Digito ' + str(digito) + '.png'
+
+
+def _codificar_bloque(pixeles: np.ndarray, nombres: list, escala: int, ruta_destino: str = None) -> list:
+    # Tarea de cada proceso: codifica un bloque de imágenes. Si se indica ruta_destino las guarda y no devuelve los bytes
+    imagenes = ampliar(pixeles.reshape(-1, LADO_IMAGEN, LADO_IMAGEN), escala)
+    resultado = []
+    for imagen, nombre in zip(imagenes, nombres):
+        contenido = codificar_png(imagen)
+        if ruta_destino is None:
+            resultado.append((nombre, contenido))
+        else:
+            with open(os.path.join(ruta_destino, nombre), 'wb') as archivo:
+                archivo.write(contenido)
+    return resultado
+
+
+def _ejecutar(funcion, argumentos: list, procesos: int) -> list:
+    # Ejecuta funcion(*args) para cada elemento de argumentos, en un pool de procesos (o en el proceso actual si procesos es 1)
+    if procesos == 1 or len(argumentos) <= 1:
+        return [funcion(*args) for args in argumentos]
+    with ProcessPoolExecutor(max_workers=procesos) as pool:
+        return list(pool.map(funcion, *zip(*argumentos)))
+
+
+def _codificar_bloque_atlas(grilla: np.ndarray, nombres: list, escala: int, ruta_destino: str) -> list:
+    # Un atlas es una única imagen (más grande que 28x28), por lo que se amplía y guarda directamente
+    with open(os.path.join(ruta_destino, nombres[0]), 'wb') as archivo:
+        archivo.write(codificar_png(ampliar(grilla, escala)))
+    return []
+
+
+def _guardar_indice(ruta: str, encabezado: list, registros: list) -> None:
+    with open(ruta, 'w', newline='', encoding='utf-8') as archivo:
+        escritor = csv.writer(archivo)
+        escritor.writerow(encabezado)
+        escritor.writerows(registros)
+
+
+def _guardar_archivo_comprimido(bloques: list, nombres: list, fuentes: np.ndarray, etiquetas: np.ndarray, ruta_destino: str, modo: str) -> None:
+    # Genera el índice CSV en memoria y lo guarda junto con todas las imágenes en un único archivo tar o zip
+    indice = io.StringIO()
+    escritor = csv.writer(indice)
+    escritor.writerow(['archivo', 'fuente', 'digito'])
+    escritor.writerows(zip(nombres, fuentes, etiquetas))
+    contenidos = [('indice.csv', indice.getvalue().encode('utf-8'))] + [par for bloque in bloques for par in bloque]
+
+    if modo == 'zip':
+        # Los PNG ya están comprimidos, por lo que se guardan sin volver a comprimir
+        with zipfile.ZipFile(os.path.join(ruta_destino, 'imagenes.zip'), 'w', compression=zipfile.ZIP_STORED) as archivo:
+            for nombre, contenido in contenidos:
+                archivo.writestr(nombre, contenido)
+    else:
+        with tarfile.open(os.path.join(ruta_destino, 'imagenes.tar'), 'w') as archivo:
+            for nombre, contenido in contenidos:
+                info = tarfile.TarInfo(nombre)
+                info.size = len(contenido)
+                archivo.addfile(info, io.BytesIO(contenido))
+
+
+'''
+    Función principal
+'''
+
+def exportar_imagenes(dataset: TMNISTDataset, ruta_destino: str, modo: str = 'individual', escala: int = None,
+                      procesos: int = None, filas_por_tarea: int = 1000) -> None:
+    """
+    Exportar las imágenes del dataset a PNG.
+
+    Parámetros:
+        dataset (TMNISTDataset): Dataset TMNIST.
+        ruta_destino (str): Carpeta donde se guardan los archivos.
+        modo (str): Uno de 'individual', 'atlas_digito', 'atlas_fuente', 'tar' o 'zip'.
+        escala (int, opcional): Factor de ampliación de cada imagen (28x28 pasa a ser 28*escala x 28*escala).
+            Si es None, se usa 10 para las imágenes individuales y 1 para los atlas (que de por sí son grandes).
+        procesos (int, opcional): Cantidad de procesos. Si es None, se usa la cantidad de CPUs.
+        filas_por_tarea (int): Cantidad de imágenes que procesa cada tarea en los modos individual, tar y zip.
+    """
+
+    if modo not in MODOS:
+        raise ValueError('Modo de exportación desconocido: ' + str(modo) + '. Debe ser uno de ' + str(MODOS))
+
+    procesos = procesos or os.cpu_count() or 1
+    if escala is None:
+        escala = 1 if modo.startswith('atlas') else 10
+    os.makedirs(ruta_destino, exist_ok=True)
+    nombres_fuentes = np.asarray(dataset.fuentes.astype(str))
+
+    if modo in ('individual', 'tar', 'zip'):
+        nombres = [nombre_imagen(f, d) for f, d in zip(nombres_fuentes, dataset.etiquetas)]
+        ruta_archivos = ruta_destino if modo == 'individual' else None
+        argumentos = [(np.asarray(dataset.pixeles[inicio:inicio + filas_por_tarea]), nombres[inicio:inicio + filas_por_tarea], escala, ruta_archivos)
+                      for inicio in range(0, len(dataset), filas_por_tarea)]
+        bloques = _ejecutar(_codificar_bloque, argumentos, procesos)
+
+        if modo != 'individual':
+            _guardar_archivo_comprimido(bloques, nombres, nombres_fuentes, dataset.etiquetas, ruta_destino, modo)
+
+    elif modo == 'atlas_digito':
+        # Un atlas por dígito: cada celda de la grilla es una fuente (el índice CSV indica cuál)
+        argumentos = []
+        indice = []
+        for digito in dataset.clases:
+            filas = dataset.filas(digito)
+            columnas = math.ceil(math.sqrt(filas.stop - filas.start))
+            nombre = 'Atlas Digito ' + str(digito) + '.png'
+            argumentos.append((armar_grilla(np.asarray(dataset.imagenes[filas]), columnas), [nombre], escala, ruta_destino))
+            for j, fuente in enumerate(nombres_fuentes[filas]):
+                indice.append((nombre, j // columnas, j % columnas, fuente, digito))
+        _ejecutar(_codificar_bloque_atlas, argumentos, procesos)
+        _guardar_indice(os.path.join(ruta_destino, 'indice_atlas.csv'), ['archivo', 'fila', 'columna', 'fuente', 'digito'], indice)
+
+    else:
+        # Un atlas por fuente: los dígitos de la fuente en una fila, en orden ascendente
+        codigos = dataset.fuentes.codes
+        orden = np.lexsort((dataset.etiquetas, codigos))
+        cortes = np.flatnonzero(np.diff(codigos[orden])) + 1
+        argumentos = []
+        for filas_fuente in np.split(orden, cortes):
+            imagenes = np.asarray(dataset.imagenes[filas_fuente])
+            nombre = str(nombres_fuentes[filas_fuente[0]]) + '.png'
+            argumentos.append((armar_grilla(imagenes, len(filas_fuente)), [nombre], escala, ruta_destino))
+        _ejecutar(_codificar_bloque_atlas, argumentos, procesos)
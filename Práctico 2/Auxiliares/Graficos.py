@@ -8,12 +8,13 @@
     El método principal es graficar(...)
 
     Prerrequisito:
-        Se debe recibir como parámetro el dataset TMNIST como DataFrame
+        Se debe recibir como parámetro el dataset TMNIST como TMNISTDataset (ver Auxiliares/CargaDatos.py)
     
     Modo de uso:
         Importar el archivo actual y llamar a la función graficar(...), pasando como parámetros:
-            - df_digitos, dataframe del dataset TMNIST
+            - dataset, el dataset TMNIST
             - ruta_destino, carpeta en donde se almacenarán los gráficos (i.e. '../Graficos/')
+            - pares (opcional), pares de dígitos para los heatmaps de diferencias del ejercicio 1.B (por defecto, los 45 pares)
 
 '''
 
@@ -21,24 +22,39 @@
 import pandas as pd
 import numpy as np
 import matplotlib.pyplot as plt
-from PIL import Image
+
+from Auxiliares.CargaDatos import TMNISTDataset, LADO_IMAGEN
+from Auxiliares.Histogramas import calcular_histogramas, valores_unicos_por_clase, valores_unicos_global, diferencia_simetrica, cuantificadores_similitud
+from Auxiliares.Similitud import similitud_media_entre_clases
+from Auxiliares.ExportacionImagenes import exportar_imagenes
+from Auxiliares.AlmacenResultados import memorizar
+from Auxiliares.Centroides import sumas_por_clase, promedios
 
 # Función principal que será llamada al importar el archivo desde otro archivo
-def graficar(df_digitos: pd.DataFrame, ruta_destino: str):
+def graficar(dataset: TMNISTDataset, ruta_destino: str, pares: list = None):
+
+    # Histograma de intensidades de cada pixel para cada dígito, calculado una única vez para todos los heatmaps
+    # (y guardado en disco, para no recalcularlo si el dataset no cambió; ver Auxiliares/AlmacenResultados.py)
+    histogramas = memorizar('calcular_histogramas', (dataset.pixeles, dataset.etiquetas), {}, lambda: calcular_histogramas(dataset))
 
     # Graficos para ejercicio 1.A (usados en Sección 2.2 y 2.3)
-    generar_heatmaps_variaciones(df_digitos, ruta_destino)
+    generar_heatmaps_variaciones(dataset, ruta_destino, histogramas)
 
     # Graficos para ejercicio 1.B (usados en Sección 2.4)
-    generar_heatmaps_diferencias(df_digitos, ruta_destino, 1, 3)
-    generar_heatmaps_diferencias(df_digitos, ruta_destino, 3, 8)
-    generar_heatmaps_diferencias(df_digitos, ruta_destino, 0, 1)
+    # Si no se indican los pares, se grafican los 45 pares de dígitos; al partir del mismo histograma, ninguno requiere recorrer el dataset
+    if pares is None:
+        pares = [(int(a), int(b)) for i, a in enumerate(dataset.clases) for b in dataset.clases[i + 1:]]
+    for digito1, digito2 in pares:
+        generar_heatmaps_diferencias(dataset, ruta_destino, digito1, digito2, histogramas)
+
+    # Diferencia de la imagen promedio entre cada par de dígitos, los 45 pares en una única figura
+    generar_heatmaps_promedio_diferencias(dataset, ruta_destino)
 
-    # Generacion de las 29.900 imágenes (OJO, demora ~2 min) 
-        # generar_imagenes_raw(df_digitos, ruta_destino + 'Raw/')
+    # Generacion de las 29.900 imágenes (demora unos segundos; con modo = 'atlas_digito' se genera un único PNG por dígito)
+        # generar_imagenes_raw(dataset, ruta_destino + 'Raw/')
 
-    # Item 1.c. Atencion, tarda más de 10min
-    # generar_grafico_proyecciones0(df_digitos, ruta_destino)
+    # Item 1.c. Similitud promedio entre las imágenes de cada par de dígitos (segundos, con productos de matrices por bloques)
+    # generar_grafico_proyecciones0(dataset, ruta_destino)
     
     # [DEPRECATED] Comparacion de la clasificacion binaria para las 3 ternas y distintos k's.
     # generar_grafico_binaria_k(df_digitos, ruta_destino)
@@ -49,43 +65,18 @@ def graficar(df_digitos: pd.DataFrame, ruta_destino: str):
 '''
 
 # %% # Gráficos de heatmap para análisis inicial del dataset e importancia de atributos
-def generar_heatmaps_variaciones(df_digitos: pd.DataFrame, ruta_destino: str):
-    columnas = df_digitos.columns
-    columnas = columnas[2:] # Remover las columnas 'names' y 'labels'
-
-    # Matriz para analizar pixel a pixel (columna a columna) el dataset completo
-    # Se llena de -1 para tener una noción de si ya fue actualizada o no cada celda
-    matriz_variabilidad_global = [[-1]*28 for z in range(28)]
-
-    # Filtrar por cada dígito entre 0 y 9 y generar su gráfico
-    for digito in df_digitos['labels'].unique():
-        df_digito_actual = df_digitos[df_digitos['labels'] == digito]
-    
-        # La matriz de 28x28 comienza con ceros y almacenará la cantidad de valores únicos de la escala de grises de entre las imágenes del dígito actual
-        matriz_variabilidad_clase = [[0]*28 for z in range(28)]
-        
-        for col in columnas:
-            x, y = 0, 0
-            col_num = int(col)
-            
-            if col_num <= 28:
-                x = col_num - 1
-                y = 0
-            elif col_num < 784:
-                x = col_num % 28
-                y = col_num // 28
-            else:
-                x, y = 27, 27
-        
-            # Almacenar la cantidad de valores únicos de intensidad del pixel (x,y) en la escala de grises
-            matriz_variabilidad_clase[y][x] = len(df_digito_actual[col].unique())
-            
-            # Para el pixel (x,y) almacenar variabilidad, pero esta vez tomando todas las clases/dígitos 
-            if (matriz_variabilidad_global[y][x] == -1):
-                matriz_variabilidad_global[y][x] = len(df_digitos[col].unique())
-        
-        # Cambiar a tipo np.array para ser graficado
-        matriz_variabilidad_clase = np.array(matriz_variabilidad_clase)
+def generar_heatmaps_variaciones(dataset: TMNISTDataset, ruta_destino: str, histogramas: np.ndarray = None):
+    # Tensor de conteos (dígito, pixel, intensidad), calculado en una sola pasada sobre el dataset (ver Auxiliares/Histogramas.py)
+    if histogramas is None:
+        histogramas = calcular_histogramas(dataset)
+
+    # Matriz (10, 784) con la cantidad de valores únicos de la escala de grises de cada pixel, para cada dígito
+    variabilidad_por_clase = valores_unicos_por_clase(histogramas)
+
+    # Tomar cada dígito entre 0 y 9 y generar su gráfico
+    for digito in dataset.clases:
+        # La matriz de 28x28 almacena la cantidad de valores únicos de la escala de grises de entre las imágenes del dígito actual
+        matriz_variabilidad_clase = variabilidad_por_clase[digito].reshape(LADO_IMAGEN, LADO_IMAGEN)
         
         # Crear el heatmap
         # plt.title('Distribución de valores únicos en imágenes de 28x28 - Dígito ' + str(digito))
@@ -95,9 +86,10 @@ def generar_heatmaps_variaciones(df_digitos: pd.DataFrame, ruta_destino: str):
         plt.xlabel('Eje X')
         plt.ylabel('Eje Y')
         plt.savefig(ruta_destino + 'Distribucion Digito ' + str(digito) + '.png')
+        plt.close()
 
-    # Cambiar a tipo np.array para ser graficado
-    matriz_variabilidad_global = np.array(matriz_variabilidad_global)
+    # Matriz para analizar pixel a pixel el dataset completo (todas las clases/dígitos juntas)
+    matriz_variabilidad_global = valores_unicos_global(histogramas).reshape(LADO_IMAGEN, LADO_IMAGEN)
     
     # Crear el heatmap
     # plt.title('Distribución de cantidad de valores únicos en imágenes de 28x28')
@@ -108,51 +100,17 @@ def generar_heatmaps_variaciones(df_digitos: pd.DataFrame, ruta_destino: str):
     plt.ylabel('Eje Y')
     #plt.show()
     plt.savefig(ruta_destino + 'Distribucion general de digitos.png')
+    plt.close()
 
 
     # %% # Gráficos de heatmap para análisis de diferencias entre dígitos (diferencia pixel a pixel, diferencia simétrica de valores de intensidad únicos)
-def generar_heatmaps_diferencias(df_digitos: pd.DataFrame, ruta_destino: str, digito1: int, digito2: int):
-    columnas = df_digitos.columns
+def generar_heatmaps_diferencias(dataset: TMNISTDataset, ruta_destino: str, digito1: int, digito2: int, histogramas: np.ndarray = None):
+    if histogramas is None:
+        histogramas = calcular_histogramas(dataset)
 
-    # Remover las columnas 'names' y 'labels' para que sólo queden las referentes a coordenadas de la imagen (ordenadas)
-    columnas = columnas[2:]
-
-    df_digito_1 = df_digitos[df_digitos['labels'] == digito1]
-    df_digito_2 = df_digitos[df_digitos['labels'] == digito2]
-    
-    # La matriz de 28x28 comienza con ceros
-    matriz_variabilidad_diferencias = [[0]*28 for z in range(28)]
-    
-    # Variables para el cálculo de la Sección 2.4 del informe (opcional, no hace al gráfico)
-    s1 = 0
-    s2 = 0
-    umbral = 12 # de 255
-    u = 0
-    
-    for col in columnas:
-        x, y = 0, 0
-        col_num = int(col)
-        
-        if col_num <= 28:
-            x = col_num - 1
-            y = 0
-        elif col_num < 784:
-            x = col_num % 28
-            y = col_num // 28
-        else:
-            x, y = 27, 27
-
-        # Almacenar la diferencia simétrica de valores únicos de intensidad del pixel (x,y) en escala de grises
-        matriz_variabilidad_diferencias[y][x] = len(set(df_digito_1[col].unique()).symmetric_difference(set(df_digito_2[col].unique())))
-
-        # Calculo de variables para cuantificadores de similitud de la Sección 2.4
-        s1 = s1 + matriz_variabilidad_diferencias[y][x]
-        if matriz_variabilidad_diferencias[y][x] >= umbral:
-            s2 = s2 + matriz_variabilidad_diferencias[y][x]
-            u = u + 1
-        
-    # Cambiar a tipo np.array para graficar
-    matriz_variabilidad_diferencias = np.array(matriz_variabilidad_diferencias)
+    # Diferencia simétrica de valores únicos de intensidad de cada pixel (x,y) en escala de grises, como matriz de 28x28
+    diferencias = diferencia_simetrica(histogramas, digito1, digito2)
+    matriz_variabilidad_diferencias = diferencias.reshape(LADO_IMAGEN, LADO_IMAGEN)
 
     
     # Crear el heatmap
@@ -163,81 +121,70 @@ def generar_heatmaps_diferencias(df_digitos: pd.DataFrame, ruta_destino: str, di
     plt.xlabel('Eje X')
     plt.ylabel('Eje Y')
     plt.savefig(ruta_destino + 'Diferencia simetrica entre ' + str(digito1) + ' y ' + str(digito2) + '.png')
+    plt.close()
 
-    # Cálculo final de cuantificadores
-    s1 = s1 / (784*256)
-    s2 = s2 / (u*256)
+    # Cuantificadores de similitud de la Sección 2.4 del informe (opcional, no hace al gráfico)
+    s1, s2 = cuantificadores_similitud(diferencias, umbral = 12)
     print('Cuantificador S1 entre dígitos' + str(digito1) + ' y ' + str(digito2) + ': ' + str(s1))
     print('Cuantificador S2 entre dígitos' + str(digito1) + ' y ' + str(digito2) + ': ' + str(s2))
     
-
 # %% # Gráficos de heatmap de promedio de diferencias entre dígitos
-def generar_heatmaps_promedio_diferencias(df_digitos: pd.DataFrame, ruta_destino: str):
-    # TODO
-    pass
+def generar_heatmaps_promedio_diferencias(dataset: TMNISTDataset, ruta_destino: str):
+    # Suma de las imágenes y cantidad de imágenes de cada dígito, acumuladas en una única pasada por bloques (ver Auxiliares/Centroides.py)
+    cantidad_clases = len(dataset.limites) - 1
+    sumas, conteos = memorizar('sumas_por_clase', (dataset.pixeles, dataset.etiquetas), {},
+                               lambda: sumas_por_clase(dataset.pixeles, dataset.etiquetas, cantidad_clases))
+    medias = promedios(sumas, conteos).reshape(cantidad_clases, LADO_IMAGEN, LADO_IMAGEN)
+
+    # Diferencias de las imágenes promedio de los 45 pares (digito1 < digito2), calculadas todas juntas como un tensor (pares, 28, 28)
+    clases = dataset.clases
+    digitos1, digitos2 = np.triu_indices(len(clases), k=1)
+    diferencias = medias[clases[digitos1]] - medias[clases[digitos2]]
+    limite = max(1.0, float(np.abs(diferencias).max()))
+
+    # Todos los pares en una única figura, con la misma escala de colores (positivo: más intenso en digito1, negativo: en digito2)
+    columnas = 9
+    filas = max(1, -(-len(diferencias) // columnas))
+    figura, ejes = plt.subplots(filas, columnas, figsize=(2 * columnas, 2 * filas + 1), squeeze=False)
+    for eje in ejes.ravel():
+        eje.axis('off')
+    for eje, diferencia, digito1, digito2 in zip(ejes.ravel(), diferencias, clases[digitos1], clases[digitos2]):
+        imagen = eje.imshow(diferencia, cmap='seismic', interpolation='nearest', vmin=-limite, vmax=limite)
+        eje.set_title(str(digito1) + ' - ' + str(digito2))
+    if len(diferencias) > 0:
+        figura.colorbar(imagen, ax=ejes.ravel().tolist(), label='Diferencia de intensidad promedio')
+    plt.savefig(ruta_destino + 'Diferencia de promedios entre digitos.png')
+    plt.close(figura)
 
 # Gráfico para el item 1.c), donde se pide comparar la similitud del las imagenes de la clase 0
-def generar_grafico_proyecciones0(df_digitos: pd.DataFrame, ruta_destino: str):
+def generar_grafico_proyecciones0(dataset: TMNISTDataset, ruta_destino: str, tamano_bloque: int = 2048, procesos: int = None):
 
-    import numpy as np
-        
-    data = df_digitos #renombre
-    
-    # Separo en imgs (matrices de 28 x 28) y Labels (que dígito es cada una)
-    imgs = data.drop(['names', 'labels'], axis = 1)
-    imgs = imgs.values.reshape(data.shape[0], 28, 28)
-    labels = data[['names', 'labels']]
-    
-    # imagenes de cada numero
-    imgs_num = []
-    names_num = []
-    
-    for i in range(10):
-      ims = data[data['labels'] == i].drop(['names', 'labels'], axis = 1)
-      imgs_num.append((ims.values.reshape(data[data['labels'] == i].shape[0], 28, 28)))
-      names_num.append(data[data['labels'] == i]['names'])
-    
-    #funcion de proyeccion entre dos matrices
-    def corr(img1, img2):
-      img1 = img1.flatten()
-      img2 = img2.flatten()
-      proy = np.dot(img1, img2) / (np.linalg.norm(img1) * np.linalg.norm(img2))
-      return proy
-    
-    
-    corrs = np.zeros((10,10)) # matriz de correlacion entre los digitos
-    
-    
-    #Todos los 0's contra todos los otros digitos
-    for i in range(1,10):
-      n= 0
-      for i1, im in enumerate(imgs_num[0]):
-        for i2, im2 in enumerate(imgs_num[i]):
-          corrs[0,i] += corr(im, im2)
-          n+=1
-    
-      corrs[0,i] /= n #Promedio
-      #print(corrs[0,i], n)
-    
-    #Todos los 0's contra todos los 0's
-    n= 0
-    
-    for i1, im in enumerate(imgs_num[0]):
-      for i2, im2 in enumerate(imgs_num[0]):
-        if(i1 >= i2): continue #no repito cuentas
-        corrs[0,0] += corr(im, im2)
-        n+=1
-    
-    corrs[0,0] /= n #promedio
-    #print(corrs[0,0], n)
+    # Matriz de similitud coseno promedio entre los dígitos (se llena completa, no sólo la fila del 0)
+    # Ver Auxiliares/Similitud.py: las imágenes se normalizan una única vez y se comparan de a bloques con productos de matrices
+    # El resultado no depende del tamaño de bloque ni de la cantidad de procesos, por lo que se guarda sólo según el dataset
+    corrs = memorizar('similitud_media_entre_clases', (dataset.pixeles, dataset.etiquetas), {},
+                      lambda: similitud_media_entre_clases(dataset, tamano_bloque = tamano_bloque, procesos = procesos))
     
     
     #Grafico
+    plt.figure()
     plt.bar(range(10), corrs[0, :])
     plt.xlabel("Clases de dígitos")
     plt.ylabel("Similitud promedio con la clase '0' ")
     plt.xticks(range(10))
     plt.savefig(ruta_destino + 'grafico1c.png')
+    plt.close()
+
+    #Grafico de la matriz completa (similitud promedio entre todos los pares de dígitos)
+    plt.figure(figsize=(8, 8))
+    plt.imshow(corrs, cmap='hot', interpolation='nearest')
+    plt.colorbar(label='Similitud coseno promedio')
+    plt.xlabel("Clases de dígitos")
+    plt.ylabel("Clases de dígitos")
+    plt.xticks(range(10))
+    plt.yticks(range(10))
+    plt.savefig(ruta_destino + 'grafico1c - matriz.png')
+    plt.close()
 
 
 '''
@@ -277,26 +224,8 @@ def generar_grafico_binaria_k(df_digitos: pd.DataFrame, ruta_destino: str):
 
     
 # %% # Generacion de todas las imagenes en formato PNG
-def generar_imagenes_raw(df_digitos: pd.DataFrame, ruta_destino: str):
-    ancho_img = 28
-    alto_img = 28
-
-    # Para cada registro del dataset (de las 29.900 totales)
-    for i in range(0, df_digitos.shape[0]):
-        registro = df_digitos.iloc[[i]]                         # Tomar el i-ésimo registro
-        fuente = registro.names.values[0]                       # Obtener la fuente con la que se dibujó
-        digito = registro.labels.values[0]                      # El dígito que representa la imagen
-        pixels = registro[registro.columns[-784:]].to_numpy()   # Las restantes 784 columnas, en forma de np.array, cada una representando un pixel
-        
-        # La imagen será en escala de grises (por eso el 'L')
-        img = Image.new('L', (ancho_img, alto_img))
-        img_matrix = img.load()
-        for y in range(0, ancho_img):
-            for x in range(0, alto_img):
-                # Asignamos la columna (y*28 + x)-ésima al pixel (x,y)
-                img_matrix[x, y] = int(pixels[0][y*28 + x])
-
-        # Agrandar la imagen (de lo contrario sería difícil ver una imagen de 28x28) y guardarla
-        img = img.resize((ancho_img * 10, alto_img * 10), resample=Image.NEAREST)
-        img.save(ruta_destino + fuente + ' - Digito ' + str(digito) + '.png')
-
+def generar_imagenes_raw(dataset: TMNISTDataset, ruta_destino: str, modo: str = 'individual'):
+    # Cada imagen se arma con Image.fromarray desde su bloque de 28x28 pixeles y se reparten entre varios procesos (ver Auxiliares/ExportacionImagenes.py)
+    # Además del modo 'individual' (un PNG por imagen, agrandado 10 veces), se puede exportar un atlas por dígito o por fuente,
+    # o un único archivo tar/zip con un índice, con modo = 'atlas_digito', 'atlas_fuente', 'tar' o 'zip'
+    exportar_imagenes(dataset, ruta_destino, modo = modo)
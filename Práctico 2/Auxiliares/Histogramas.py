@@ -0,0 +1,92 @@
+'''
+    Autores:
+    - Alvarez, Matías
+    - Dumas, Román
+    - Nogueroles, Patricio
+
+    Archivo encargado de calcular, en una única pasada, el histograma de intensidades de cada pixel para cada dígito.
+    El método principal es calcular_histogramas(...), que devuelve un tensor de conteos H de forma (10, 784, 256), donde
+    H[d, p, v] es la cantidad de imágenes del dígito d cuyo pixel p tiene intensidad v.
+
+    Todos los heatmaps de Graficos.py (ejercicios 1.A y 1.B) se obtienen como reducciones sobre ese tensor:
+        - Cantidad de valores únicos de un pixel en un dígito: cantidad de intensidades v con H[d, p, v] > 0
+        - Diferencia simétrica de valores únicos entre dos dígitos: cantidad de v presentes en sólo uno de ellos
+        - Cuantificadores S1 y S2 de la Sección 2.4 del informe
+'''
+
+import numpy as np
+
+from Auxiliares.CargaDatos import TMNISTDataset, CANTIDAD_PIXELES
+
+CANTIDAD_INTENSIDADES = 256
+
+
+def calcular_histogramas(dataset: TMNISTDataset, filas_por_bloque: int = 4096) -> np.ndarray:
+    """
+    Calcular el tensor de conteos (clases, pixeles, intensidades) con np.bincount.
+    Cada combinación (dígito, pixel, intensidad) se codifica como un único entero, y se cuentan todas a la vez.
+    Las filas se procesan por bloques para acotar la memoria de los códigos intermedios.
+
+    Parámetros:
+        dataset (TMNISTDataset): Dataset TMNIST.
+        filas_por_bloque (int): Cantidad de imágenes procesadas por cada llamada a bincount.
+
+    Retorna:
+        np.ndarray: Tensor int64 de forma (cantidad de clases, 784, 256).
+    """
+
+    cantidad_clases = len(dataset.limites) - 1
+    tamano = cantidad_clases * CANTIDAD_PIXELES * CANTIDAD_INTENSIDADES
+    conteos = np.zeros(tamano, dtype=np.int64)
+
+    # Desplazamiento de cada pixel dentro del código: p * 256
+    desplazamiento_pixel = np.arange(CANTIDAD_PIXELES, dtype=np.int64) * CANTIDAD_INTENSIDADES
+
+    for inicio in range(0, len(dataset), filas_por_bloque):
+        pixeles = dataset.pixeles[inicio:inicio + filas_por_bloque]
+        etiquetas = dataset.etiquetas[inicio:inicio + filas_por_bloque].astype(np.int64)
+
+        # código = (d * 784 + p) * 256 + v
+        codigos = (etiquetas[:, None] * (CANTIDAD_PIXELES * CANTIDAD_INTENSIDADES)) + desplazamiento_pixel[None, :] + pixeles
+        conteos += np.bincount(codigos.ravel(), minlength=tamano)
+
+    return conteos.reshape(cantidad_clases, CANTIDAD_PIXELES, CANTIDAD_INTENSIDADES)
+
+
+def valores_unicos_por_clase(histogramas: np.ndarray) -> np.ndarray:
+    # Matriz (clases, 784) con la cantidad de intensidades distintas de cada pixel en cada dígito
+    return np.count_nonzero(histogramas, axis=2)
+
+
+def valores_unicos_global(histogramas: np.ndarray) -> np.ndarray:
+    # Vector (784,) con la cantidad de intensidades distintas de cada pixel, considerando todos los dígitos
+    return np.count_nonzero(histogramas.sum(axis=0), axis=1)
+
+
+def diferencia_simetrica(histogramas: np.ndarray, digito1: int, digito2: int) -> np.ndarray:
+    # Vector (784,) con la cantidad de intensidades que aparecen en uno solo de los dos dígitos, para cada pixel
+    return np.count_nonzero((histogramas[digito1] > 0) != (histogramas[digito2] > 0), axis=1)
+
+
+def cuantificadores_similitud(diferencias: np.ndarray, umbral: int = 12) -> tuple:
+    """
+    Calcular los cuantificadores S1 y S2 de la Sección 2.4 del informe a partir de la diferencia simétrica de cada pixel.
+        - S1: suma de las diferencias de todos los pixeles, normalizada por 784 * 256
+        - S2: suma de las diferencias de los pixeles que superan el umbral, normalizada por (cantidad de esos pixeles) * 256
+
+    Parámetros:
+        diferencias (np.ndarray): Diferencias simétricas por pixel; la última dimensión debe ser la de los 784 pixeles.
+        umbral (int): Diferencia mínima (de 255) para que un pixel se considere en S2.
+
+    Retorna:
+        tuple: (s1, s2), con la misma forma que diferencias sin su última dimensión.
+    """
+
+    s1 = diferencias.sum(axis=-1) / (CANTIDAD_PIXELES * CANTIDAD_INTENSIDADES)
+
+    superan_umbral = diferencias >= umbral
+    u = superan_umbral.sum(axis=-1)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        s2 = np.where(superan_umbral, diferencias, 0).sum(axis=-1) / (u * CANTIDAD_INTENSIDADES)
+
+    return s1, s2
@@ -0,0 +1,283 @@
+'''
+    Autores:
+    - Alvarez, Matías
+    - Dumas, Román
+    - Nogueroles, Patricio
+
+    Archivo que define BosqueProyecciones, un índice de vecinos más cercanos aproximados para KNN sobre los 784 pixeles y los 10 dígitos.
+
+    Cada árbol del bosque parte recursivamente las imágenes de train con hiperplanos aleatorios: en cada nodo se eligen dos imágenes
+    al azar, se proyecta sobre la dirección que las une y se corta en la mediana, hasta que cada hoja tiene a lo sumo tamano_hoja
+    imágenes. Para buscar los vecinos de una consulta se la baja por cada árbol hasta su hoja, y sólo se calculan las distancias
+    (exactas) a las imágenes de esas hojas. Las consultas se procesan todas juntas, nivel por nivel.
+
+    El compromiso entre memoria, velocidad y exactitud se regula con dos parámetros:
+        - cantidad_arboles: más árboles encuentran más vecinos verdaderos (más recall), pero ocupan más memoria y revisan más candidatos.
+        - tamano_hoja: hojas más grandes revisan más candidatos por árbol (más recall, menos consultas por segundo) y el árbol tiene menos nodos.
+    comparar_con_busqueda_exacta(...) mide recall@k y consultas por segundo de varias configuraciones contra la búsqueda exacta.
+
+    La semántica es la misma que la de vecinos_mas_cercanos y predecir_para_cada_k (Auxiliares/BarridoKNN.py): distancia euclídea,
+    empates en distancia a favor de la fila de train de menor índice y empates de votos a favor de la clase menor.
+
+    Modo de uso:
+        indice = BosqueProyecciones(cantidad_arboles = 8, tamano_hoja = 64).fit(X_train)
+        indice.guardar('indice.npz')
+        distancias, vecinos = BosqueProyecciones.cargar('indice.npz').kneighbors(X_test, k = 5)
+        Y_predict = indice.predecir(Y_train, X_test, k = 5)
+'''
+
+import time
+
+import numpy as np
+
+from Auxiliares.BarridoKNN import predecir_para_cada_k
+from Auxiliares.NucleoDistancias import vecinos_exactos
+
+# Cantidad de elementos (consultas x candidatos x pixeles) que se procesan a la vez al calcular distancias
+ELEMENTOS_POR_BLOQUE = 1 << 22
+
+
+'''
+    Funciones auxiliares
+'''
+
+def recall(vecinos_aproximados: np.ndarray, vecinos_verdaderos: np.ndarray) -> float:
+    # Proporción de los k vecinos verdaderos que aparecen entre los k aproximados (promediada sobre las consultas)
+    k = vecinos_verdaderos.shape[1]
+    encontrados = (vecinos_aproximados[:, :, None] == vecinos_verdaderos[:, None, :]).any(axis=1)
+    return float(encontrados.sum() / (len(vecinos_verdaderos) * k))
+
+
+'''
+    Índice
+'''
+
+class BosqueProyecciones:
+    """
+    Bosque de árboles de proyecciones aleatorias para buscar vecinos más cercanos aproximados.
+
+    Atributos (luego de fit):
+        direccion (np.ndarray): Matriz (nodos, 784) float32 con la dirección de proyección de cada nodo (de todos los árboles).
+        umbral (np.ndarray): Umbral de cada nodo (las proyecciones <= umbral van al hijo izquierdo).
+        hijos (np.ndarray): Matriz (nodos, 2) con los hijos izquierdo y derecho de cada nodo (-1 en las hojas).
+        hoja (np.ndarray): Índice (en hojas) de cada nodo hoja (-1 en los nodos internos).
+        hojas (np.ndarray): Matriz (hojas, tamano_hoja) con las filas de train de cada hoja (completada con -1).
+        raices (np.ndarray): Nodo raíz de cada árbol.
+        x_base (np.ndarray): Matriz (train, 784) de pixeles uint8 sobre la que se calculan las distancias.
+    """
+
+    def __init__(self, cantidad_arboles: int = 8, tamano_hoja: int = 64, semilla: int = 42):
+        self.cantidad_arboles = cantidad_arboles
+        self.tamano_hoja = tamano_hoja
+        self.semilla = semilla
+
+    def _construir_arbol(self, generador: np.random.Generator, nodos: dict) -> int:
+        # Agrega a 'nodos' los nodos de un árbol (en preorden) y devuelve el índice de su raíz
+        raiz = len(nodos['umbral'])
+        pila = [(np.arange(len(self.x_base)), None, 0)]
+        while pila:
+            filas, padre, lado = pila.pop()
+            nodo = len(nodos['umbral'])
+            if padre is not None:
+                nodos['hijos'][padre][lado] = nodo
+
+            direccion = self._elegir_direccion(generador, filas) if len(filas) > self.tamano_hoja else None
+            if direccion is None:
+                nodos['direccion'].append(None)
+                nodos['umbral'].append(0.0)
+                nodos['hijos'].append([-1, -1])
+                nodos['filas_hoja'].append(filas)
+                continue
+
+            # Corte en la mediana: cada hijo recibe la mitad de las filas, por lo que el árbol queda balanceado
+            proyecciones = self.x_base[filas].astype(np.float32) @ direccion
+            orden = np.argsort(proyecciones, kind='stable')
+            mitad = len(filas) // 2
+            nodos['direccion'].append(direccion)
+            nodos['umbral'].append((float(proyecciones[orden[mitad - 1]]) + float(proyecciones[orden[mitad]])) / 2)
+            nodos['hijos'].append([-1, -1])
+            nodos['filas_hoja'].append(None)
+            pila.append((filas[orden[mitad:]], nodo, 1))
+            pila.append((filas[orden[:mitad]], nodo, 0))
+        return raiz
+
+    def _elegir_direccion(self, generador: np.random.Generator, filas: np.ndarray):
+        # Dirección entre dos imágenes distintas elegidas al azar; None si todas las imágenes del nodo son iguales
+        for _ in range(8):
+            a, b = generador.choice(filas, size=2, replace=False)
+            direccion = self.x_base[a].astype(np.float32) - self.x_base[b].astype(np.float32)
+            if direccion.any():
+                return direccion / np.linalg.norm(direccion)
+        if (self.x_base[filas] == self.x_base[filas[0]]).all():
+            return None
+        direccion = generador.standard_normal(self.x_base.shape[1]).astype(np.float32)
+        return direccion / np.linalg.norm(direccion)
+
+    def fit(self, X: np.ndarray) -> 'BosqueProyecciones':
+        self.x_base = np.ascontiguousarray(X, dtype=np.uint8)
+        generador = np.random.default_rng(self.semilla)
+        nodos = {'direccion': [], 'umbral': [], 'hijos': [], 'filas_hoja': []}
+        self.raices = np.array([self._construir_arbol(generador, nodos) for _ in range(self.cantidad_arboles)], dtype=np.int32)
+
+        es_hoja = np.array([filas is not None for filas in nodos['filas_hoja']])
+        cantidad_atributos = self.x_base.shape[1]
+        self.direccion = np.stack([d if d is not None else np.zeros(cantidad_atributos, dtype=np.float32) for d in nodos['direccion']])
+        self.umbral = np.array(nodos['umbral'], dtype=np.float32)
+        self.hijos = np.array(nodos['hijos'], dtype=np.int32)
+        self.hoja = np.full(len(es_hoja), -1, dtype=np.int32)
+        self.hoja[es_hoja] = np.arange(es_hoja.sum(), dtype=np.int32)
+
+        # Las hojas se guardan como una matriz rectangular (completada con -1) para reunir los candidatos sin recorrer listas
+        filas_hojas = [filas for filas in nodos['filas_hoja'] if filas is not None]
+        self.hojas = np.full((len(filas_hojas), max(len(filas) for filas in filas_hojas)), -1, dtype=np.int32)
+        for i, filas in enumerate(filas_hojas):
+            self.hojas[i, :len(filas)] = filas
+        return self
+
+    def memoria(self) -> int:
+        # Bytes que ocupa el índice, sin contar la matriz de pixeles de train
+        return self.direccion.nbytes + self.umbral.nbytes + self.hijos.nbytes + self.hoja.nbytes + self.hojas.nbytes + self.raices.nbytes
+
+    def guardar(self, ruta: str) -> None:
+        np.savez(ruta, direccion=self.direccion, umbral=self.umbral, hijos=self.hijos, hoja=self.hoja, hojas=self.hojas,
+                 raices=self.raices, x_base=self.x_base, parametros=np.array([self.cantidad_arboles, self.tamano_hoja, self.semilla]))
+
+    @classmethod
+    def cargar(cls, ruta: str) -> 'BosqueProyecciones':
+        with np.load(ruta, allow_pickle=False) as archivo:
+            indice = cls(*(int(p) for p in archivo['parametros']))
+            for nombre in ('direccion', 'umbral', 'hijos', 'hoja', 'hojas', 'raices', 'x_base'):
+                setattr(indice, nombre, archivo[nombre])
+        return indice
+
+    def candidatos(self, X: np.ndarray) -> np.ndarray:
+        """
+        Reunir, para cada consulta, las filas de train de las hojas a las que llega en cada árbol.
+
+        Parámetros:
+            X (np.ndarray): Matriz (consultas, 784) de pixeles.
+
+        Retorna:
+            np.ndarray: Matriz (consultas, cantidad_arboles * tamano_hoja) de filas de train, ordenadas, sin repetidos (completada con -1).
+        """
+
+        X = np.asarray(X, dtype=np.float32)
+        filas = np.arange(len(X))
+        hojas = []
+        for raiz in self.raices:
+            nodos = np.full(len(X), raiz, dtype=np.int32)
+            activas = filas[self.hoja[nodos] == -1]
+            while len(activas):
+                nodos_activos = nodos[activas]
+                proyecciones = np.einsum('ij,ij->i', X[activas], self.direccion[nodos_activos])
+                nodos[activas] = self.hijos[nodos_activos, (proyecciones > self.umbral[nodos_activos]).view(np.uint8)]
+                activas = activas[self.hoja[nodos[activas]] == -1]
+            hojas.append(self.hojas[self.hoja[nodos]])
+
+        # Una misma fila de train puede estar en las hojas de varios árboles: se marcan los repetidos con -1
+        candidatos = np.sort(np.concatenate(hojas, axis=1), axis=1)
+        candidatos[:, 1:][candidatos[:, 1:] == candidatos[:, :-1]] = -1
+        return candidatos
+
+    def kneighbors(self, X: np.ndarray, k: int = 5) -> tuple:
+        """
+        Buscar los k vecinos más cercanos aproximados de cada consulta (los más cercanos entre sus candidatos).
+
+        Parámetros:
+            X (np.ndarray): Matriz (consultas, 784) de pixeles.
+            k (int): Cantidad de vecinos.
+
+        Retorna:
+            tuple: (matriz (consultas, k) de distancias euclídeas, matriz (consultas, k) de índices de train ordenados por distancia).
+            Si una consulta tiene menos de k candidatos, se completa con distancia infinita e índice -1.
+        """
+
+        X = np.asarray(X, dtype=np.uint8)
+        candidatos = self.candidatos(X)
+        cantidad_train = len(self.x_base)
+        filas_por_bloque = max(1, ELEMENTOS_POR_BLOQUE // (candidatos.shape[1] * X.shape[1]))
+        k_efectivo = min(k, candidatos.shape[1])
+
+        distancias = np.full((len(X), k), np.inf)
+        vecinos = np.full((len(X), k), -1, dtype=np.int64)
+        for inicio in range(0, len(X), filas_por_bloque):
+            bloque = candidatos[inicio:inicio + filas_por_bloque]
+            # Las diferencias entran en int16 y la suma de sus cuadrados (a lo sumo 784 * 255^2) en int32
+            diferencias = self.x_base[bloque].astype(np.int16) - X[inicio:inicio + len(bloque), None, :].astype(np.int16)
+            cuadrados = np.einsum('ijk,ijk->ij', diferencias, diferencias, dtype=np.int32).astype(np.int64)
+
+            # Clave entera distancia * train + índice (como en vecinos_mas_cercanos); los -1 quedan al final
+            claves = np.where(bloque >= 0, cuadrados * cantidad_train + bloque, np.iinfo(np.int64).max)
+            posiciones = np.argsort(claves, axis=1, kind='stable')[:, :k_efectivo]
+            validos = np.take_along_axis(bloque, posiciones, axis=1) >= 0
+            distancias[inicio:inicio + len(bloque), :k_efectivo] = np.where(validos, np.sqrt(np.take_along_axis(cuadrados, posiciones, axis=1)), np.inf)
+            vecinos[inicio:inicio + len(bloque), :k_efectivo] = np.where(validos, np.take_along_axis(bloque, posiciones, axis=1), -1)
+        return distancias, vecinos
+
+    def predecir(self, y_base: np.ndarray, X: np.ndarray, k: int = 5) -> np.ndarray:
+        """
+        Clasificar las consultas por votación de sus k vecinos aproximados (pesos uniformes, empate a favor de la clase menor).
+
+        Parámetros:
+            y_base (np.ndarray): Etiquetas de las filas de train con las que se construyó el índice.
+            X (np.ndarray): Matriz (consultas, 784) de pixeles.
+            k (int): Cantidad de vecinos.
+
+        Retorna:
+            np.ndarray: Predicción para cada consulta.
+        """
+
+        clases, indices_base = np.unique(y_base, return_inverse=True)
+        _, vecinos = self.kneighbors(X, k)
+        # Si faltan candidatos, los lugares vacíos repiten al vecino más cercano (siempre hay al menos uno: la hoja nunca está vacía)
+        vecinos = np.where(vecinos >= 0, vecinos, vecinos[:, :1])
+        return predecir_para_cada_k(indices_base[vecinos], [vecinos.shape[1]], clases)[0]
+
+
+'''
+    Función principal
+'''
+
+def comparar_con_busqueda_exacta(x_base: np.ndarray, x_consulta: np.ndarray, k: int = 5,
+                                 configuraciones: tuple = ((1, 64), (4, 64), (8, 64), (8, 128), (16, 128))) -> list:
+    """
+    Medir recall@k, consultas por segundo y memoria de distintas configuraciones del índice, contra la búsqueda exacta.
+
+    Parámetros:
+        x_base (np.ndarray): Matriz (train, 784) de pixeles uint8.
+        x_consulta (np.ndarray): Matriz (consultas, 784) de pixeles uint8.
+        k (int): Cantidad de vecinos.
+        configuraciones (tuple): Pares (cantidad_arboles, tamano_hoja) a evaluar.
+
+    Retorna:
+        list: Un diccionario de resultados por configuración (también se imprimen por consola).
+    """
+
+    inicio = time.perf_counter()
+    verdaderos = vecinos_exactos(x_base, x_consulta, k)
+    consultas_por_segundo_exacta = len(x_consulta) / (time.perf_counter() - inicio)
+    print(f"Búsqueda exacta: {consultas_por_segundo_exacta:,.0f} consultas por segundo")
+
+    resultados = []
+    for cantidad_arboles, tamano_hoja in configuraciones:
+        inicio = time.perf_counter()
+        indice = BosqueProyecciones(cantidad_arboles, tamano_hoja).fit(x_base)
+        tiempo_construccion = time.perf_counter() - inicio
+
+        inicio = time.perf_counter()
+        _, aproximados = indice.kneighbors(x_consulta, k)
+        tiempo_consulta = time.perf_counter() - inicio
+
+        resultados.append({
+            'cantidad_arboles': cantidad_arboles,
+            'tamano_hoja': tamano_hoja,
+            'recall': recall(aproximados, verdaderos),
+            'consultas_por_segundo': len(x_consulta) / tiempo_consulta,
+            'consultas_por_segundo_exacta': consultas_por_segundo_exacta,
+            'memoria_bytes': indice.memoria(),
+            'tiempo_construccion': tiempo_construccion,
+        })
+        print(f"{cantidad_arboles} árboles, hojas de {tamano_hoja}: recall@{k} {resultados[-1]['recall']:.4f}, "
+              f"{resultados[-1]['consultas_por_segundo']:,.0f} consultas por segundo, "
+              f"{resultados[-1]['memoria_bytes'] / 2**20:.1f} MB, construcción {tiempo_construccion:.2f} s")
+    return resultados
@@ -0,0 +1,177 @@
+'''
+    Autores:
+    - Alvarez, Matías
+    - Dumas, Román
+    - Nogueroles, Patricio
+
+    Archivo que define KNNHamming, un clasificador KNN sobre las imágenes binarizadas y empaquetadas en bits.
+
+    Los glifos de TMNIST son casi todos de dos tonos, por lo que cada imagen se puede umbralizar (pixel encendido si su intensidad
+    es >= umbral) y guardar como 784 bits: 98 bytes en lugar de 784 (8 veces menos memoria que uint8). Para usar palabras de 64 bits
+    se completa cada fila con ceros hasta 104 bytes (13 palabras).
+
+    La distancia entre dos imágenes binarizadas es la de Hamming: la cantidad de bits distintos, es decir la cantidad de unos del XOR
+    de sus palabras. Se calcula con np.bitwise_count (numpy >= 2.0) o, si no está disponible, con una tabla de 256 entradas por byte.
+    Para imágenes binarias, la distancia de Hamming es igual a la euclídea al cuadrado, por lo que KNN elige los mismos vecinos.
+
+    La semántica es la misma que la de vecinos_mas_cercanos y predecir_para_cada_k (Auxiliares/BarridoKNN.py): empates en distancia a
+    favor de la fila de train de menor índice y empates de votos a favor de la clase menor.
+
+    Modo de uso:
+        knn = KNNHamming(n_neighbors = 5, umbral = 128).fit(X_train, Y_train)
+        Y_predict = knn.predict(X_test)
+'''
+
+import time
+
+import numpy as np
+
+from Auxiliares.BarridoKNN import vecinos_mas_cercanos, predecir_para_cada_k
+from Auxiliares.NucleoDistancias import vecinos_exactos
+
+UMBRAL_POR_DEFECTO = 128
+BYTES_POR_PALABRA = 8
+
+# Cantidad de unos de cada byte, para contar bits cuando no existe np.bitwise_count
+UNOS_POR_BYTE = np.array([bin(b).count('1') for b in range(256)], dtype=np.uint8)
+
+
+'''
+    Funciones auxiliares
+'''
+
+def empaquetar(X: np.ndarray, umbral: int = UMBRAL_POR_DEFECTO) -> np.ndarray:
+    """
+    Binarizar cada imagen y empaquetarla en palabras de 64 bits.
+
+    Parámetros:
+        X (np.ndarray): Matriz (filas, 784) de pixeles uint8.
+        umbral (int): Intensidad mínima para que un pixel se considere encendido.
+
+    Retorna:
+        np.ndarray: Matriz (filas, 13) uint64 (98 bytes de bits y 6 bytes de ceros por fila).
+    """
+
+    bits = np.packbits(np.asarray(X) >= umbral, axis=1)
+    palabras = -(-bits.shape[1] // BYTES_POR_PALABRA)
+    empaquetadas = np.zeros((len(bits), palabras * BYTES_POR_PALABRA), dtype=np.uint8)
+    empaquetadas[:, :bits.shape[1]] = bits
+    return empaquetadas.view(np.uint64)
+
+
+def contar_unos(palabras: np.ndarray) -> np.ndarray:
+    # Cantidad de unos de cada palabra (uint8, a lo sumo 64)
+    if hasattr(np, 'bitwise_count'):
+        return np.bitwise_count(palabras)
+    return UNOS_POR_BYTE[palabras.view(np.uint8)].reshape(palabras.shape + (palabras.itemsize,)).sum(axis=-1, dtype=np.uint8)
+
+
+def distancias_hamming(base_por_palabra: np.ndarray, consultas: np.ndarray) -> np.ndarray:
+    """
+    Calcular la distancia de Hamming entre cada consulta y cada imagen de la base.
+
+    Parámetros:
+        base_por_palabra (np.ndarray): Matriz (palabras, base) uint64 de imágenes empaquetadas, transpuesta para que cada palabra
+            de todas las imágenes sea contigua en memoria.
+        consultas (np.ndarray): Matriz (consultas, palabras) uint64 de imágenes empaquetadas.
+
+    Retorna:
+        np.ndarray: Matriz (consultas, base) int32 de distancias.
+    """
+
+    distancias = np.zeros((len(consultas), base_por_palabra.shape[1]), dtype=np.int32)
+    # Se recorre palabra por palabra para que los temporales sean (consultas, base) y no (consultas, base, palabras)
+    for palabra, columna in enumerate(base_por_palabra):
+        distancias += contar_unos(consultas[:, palabra, None] ^ columna[None, :])
+    return distancias
+
+
+'''
+    Clasificador
+'''
+
+class KNNHamming:
+    """
+    Clasificador KNN con distancia de Hamming sobre imágenes binarizadas y empaquetadas en bits.
+
+    Atributos (luego de fit):
+        base (np.ndarray): Matriz (train, 13) uint64 de imágenes de train empaquetadas.
+        clases (np.ndarray): Clases ordenadas de menor a mayor.
+        indices_train (np.ndarray): Índice (en clases) de la clase de cada fila de train.
+    """
+
+    def __init__(self, n_neighbors: int = 5, umbral: int = UMBRAL_POR_DEFECTO, filas_por_bloque: int = 128):
+        self.n_neighbors = n_neighbors
+        self.umbral = umbral
+        self.filas_por_bloque = filas_por_bloque
+
+    def fit(self, X: np.ndarray, y: np.ndarray) -> 'KNNHamming':
+        self.base = empaquetar(X, self.umbral)
+        self._base_por_palabra = np.ascontiguousarray(self.base.T)
+        self.clases, self.indices_train = np.unique(y, return_inverse=True)
+        return self
+
+    def kneighbors(self, X: np.ndarray) -> np.ndarray:
+        # Índices de train de los vecinos de cada fila de X, ordenados por distancia de Hamming
+        consultas = empaquetar(X, self.umbral)
+        k = min(self.n_neighbors, len(self.base))
+        vecinos = np.empty((len(consultas), k), dtype=np.int64)
+        for inicio in range(0, len(consultas), self.filas_por_bloque):
+            bloque = consultas[inicio:inicio + self.filas_por_bloque]
+            vecinos[inicio:inicio + len(bloque)] = vecinos_mas_cercanos(distancias_hamming(self._base_por_palabra, bloque), k)
+        return vecinos
+
+    def predict(self, X: np.ndarray) -> np.ndarray:
+        vecinos = self.kneighbors(X)
+        return predecir_para_cada_k(self.indices_train[vecinos], [vecinos.shape[1]], self.clases)[0]
+
+
+'''
+    Función principal
+'''
+
+def comparar_con_euclidea(x_train: np.ndarray, y_train: np.ndarray, x_test: np.ndarray, y_test: np.ndarray,
+                          k: int = 5, umbral: int = UMBRAL_POR_DEFECTO) -> dict:
+    """
+    Comparar KNN con distancia de Hamming sobre imágenes binarizadas contra KNN con distancia euclídea sobre los grises:
+    exactitud, tiempo de predicción y memoria de la matriz de train.
+
+    Parámetros:
+        x_train (np.ndarray): Matriz (train, 784) de pixeles uint8.
+        y_train (np.ndarray): Etiquetas de train.
+        x_test (np.ndarray): Matriz (test, 784) de pixeles uint8.
+        y_test (np.ndarray): Etiquetas de test.
+        k (int): Cantidad de vecinos.
+        umbral (int): Intensidad mínima para que un pixel se considere encendido.
+
+    Retorna:
+        dict: Resultados de la comparación (también se imprimen por consola).
+    """
+
+    x_train = np.asarray(x_train)
+    y_test = np.asarray(y_test)
+    clases, indices_train = np.unique(y_train, return_inverse=True)
+
+    inicio = time.perf_counter()
+    vecinos = vecinos_exactos(x_train, x_test, k)
+    prediccion_euclidea = predecir_para_cada_k(indices_train[vecinos], [vecinos.shape[1]], clases)[0]
+    tiempo_euclidea = time.perf_counter() - inicio
+
+    knn = KNNHamming(n_neighbors = k, umbral = umbral).fit(x_train, y_train)
+    inicio = time.perf_counter()
+    prediccion_hamming = knn.predict(x_test)
+    tiempo_hamming = time.perf_counter() - inicio
+
+    resultado = {
+        'exactitud_euclidea': float(np.mean(prediccion_euclidea == y_test)),
+        'exactitud_hamming': float(np.mean(prediccion_hamming == y_test)),
+        'tiempo_euclidea': tiempo_euclidea,
+        'tiempo_hamming': tiempo_hamming,
+        'bytes_euclidea': x_train.nbytes,
+        'bytes_hamming': knn.base.nbytes,
+    }
+    print(f"KNN euclídeo sobre grises (K = {k}): exactitud {resultado['exactitud_euclidea']:.4f}, {tiempo_euclidea:.2f} s, "
+          f"train de {resultado['bytes_euclidea'] / 2**20:.2f} MB")
+    print(f"KNN de Hamming sobre bits (K = {k}, umbral {umbral}): exactitud {resultado['exactitud_hamming']:.4f}, {tiempo_hamming:.2f} s, "
+          f"train de {resultado['bytes_hamming'] / 2**20:.2f} MB")
+    return resultado
@@ -0,0 +1,191 @@
+'''
+    Autores:
+    - Alvarez, Matías
+    - Dumas, Román
+    - Nogueroles, Patricio
+
+    Archivo que define KNNPiramide, un clasificador KNN sobre los 784 pixeles que busca los vecinos de lo grueso a lo fino.
+
+    Al entrenar se calcula una única vez la pirámide de cada imagen: la versión 7x7 (sumando bloques de 4x4 pixeles),
+    la 14x14 (bloques de 2x2) y la original de 28x28. Para cada imagen de test:
+        1. Se calcula la distancia a todas las imágenes de train en 7x7 (49 atributos en lugar de 784) y se preseleccionan las candidatos[0] más cercanas.
+        2. Se reordenan esas candidatas según su distancia en 14x14 y se conservan las candidatos[1] más cercanas.
+        3. Se reordenan las últimas candidatas según la distancia en 28x28 y se toman los K vecinos.
+    Cuanto más grandes las preselecciones, más se parece el resultado a KNN exacto (con candidatos >= cantidad de train, es idéntico).
+    comparar_con_knn_exacto(...) mide exactitud, recall de vecinos y tiempo de varias preselecciones contra KNN exacto.
+
+    La semántica es la misma que la de vecinos_mas_cercanos y predecir_para_cada_k (Auxiliares/BarridoKNN.py): distancia euclídea,
+    empates en distancia a favor de la fila de train de menor índice y empates de votos a favor de la clase menor.
+
+    Modo de uso:
+        knn = KNNPiramide(n_neighbors = 5, candidatos = (256, 64)).fit(X_train, Y_train)
+        Y_predict = knn.predict(X_test)
+'''
+
+import time
+
+import numpy as np
+
+from Auxiliares.CargaDatos import LADO_IMAGEN
+from Auxiliares.BarridoKNN import predecir_para_cada_k
+from Auxiliares.NucleoDistancias import vecinos_exactos
+from Auxiliares.IndiceVecinos import recall
+
+# Lado del bloque que se suma en cada nivel de la pirámide, del más grueso al más fino (4: 7x7, 2: 14x14, 1: 28x28)
+FACTORES = (4, 2, 1)
+
+
+'''
+    Funciones auxiliares
+'''
+
+def reducir(X: np.ndarray, factor: int) -> np.ndarray:
+    """
+    Reducir cada imagen sumando bloques de factor x factor pixeles.
+
+    Parámetros:
+        X (np.ndarray): Matriz (filas, 784) de pixeles uint8 (el pixel (x, y) está en la columna x * 28 + y).
+        factor (int): Lado del bloque (debe dividir a 28).
+
+    Retorna:
+        np.ndarray: Matriz (filas, (28 / factor)^2) int16 (la suma de un bloque de 4x4 es a lo sumo 16 * 255 = 4080).
+    """
+
+    lado = LADO_IMAGEN // factor
+    bloques = np.asarray(X).reshape(len(X), lado, factor, lado, factor)
+    return bloques.sum(axis=(2, 4), dtype=np.int16).reshape(len(X), lado * lado)
+
+
+def construir_piramide(X: np.ndarray) -> list:
+    # Versiones de cada imagen en todos los niveles de la pirámide, del más grueso al más fino
+    return [reducir(X, factor) for factor in FACTORES]
+
+
+def reordenar(base: np.ndarray, consultas: np.ndarray, candidatos: np.ndarray, cantidad: int) -> np.ndarray:
+    """
+    Quedarse, para cada consulta, con sus 'cantidad' candidatos más cercanos según las distancias en un nivel de la pirámide.
+
+    Parámetros:
+        base (np.ndarray): Matriz (train, atributos) int16 del nivel.
+        consultas (np.ndarray): Matriz (consultas, atributos) int16 del nivel.
+        candidatos (np.ndarray): Matriz (consultas, candidatos) de filas de train.
+        cantidad (int): Cantidad de candidatos a conservar.
+
+    Retorna:
+        np.ndarray: Matriz (consultas, cantidad) de filas de train, ordenadas por distancia (y por índice ante empates).
+    """
+
+    # Las diferencias entran en int16 y la suma de sus cuadrados en int32 en todos los niveles (a lo sumo 49 * 4080^2 en 7x7)
+    diferencias = base[candidatos] - consultas[:, None, :]
+    distancias = np.einsum('ijk,ijk->ij', diferencias, diferencias, dtype=np.int32).astype(np.int64)
+    claves = distancias * len(base) + candidatos
+
+    if cantidad < candidatos.shape[1]:
+        posiciones = np.argpartition(claves, cantidad - 1, axis=1)[:, :cantidad]
+    else:
+        posiciones = np.broadcast_to(np.arange(candidatos.shape[1]), candidatos.shape)
+    orden = np.argsort(np.take_along_axis(claves, posiciones, axis=1), axis=1)
+    return np.take_along_axis(candidatos, np.take_along_axis(posiciones, orden, axis=1), axis=1)
+
+
+'''
+    Clasificador
+'''
+
+class KNNPiramide:
+    """
+    Clasificador KNN que preselecciona candidatos con versiones reducidas de las imágenes y reordena sólo esos en 28x28.
+
+    Atributos (luego de fit):
+        piramide (list): Matrices de train de cada nivel (7x7, 14x14 y 28x28), int16.
+        clases (np.ndarray): Clases ordenadas de menor a mayor.
+        indices_train (np.ndarray): Índice (en clases) de la clase de cada fila de train.
+    """
+
+    def __init__(self, n_neighbors: int = 5, candidatos: tuple = (256, 64), filas_por_bloque: int = 256):
+        if len(candidatos) != len(FACTORES) - 1:
+            raise ValueError('Se debe indicar una preselección por cada nivel reducido de la pirámide: ' + str(len(FACTORES) - 1))
+        self.n_neighbors = n_neighbors
+        self.candidatos = candidatos
+        self.filas_por_bloque = filas_por_bloque
+
+    def fit(self, X: np.ndarray, y: np.ndarray) -> 'KNNPiramide':
+        self.piramide = construir_piramide(X)
+        self.clases, self.indices_train = np.unique(y, return_inverse=True)
+        return self
+
+    def kneighbors(self, X: np.ndarray) -> np.ndarray:
+        """
+        Buscar los vecinos de cada fila de X, de lo grueso a lo fino.
+
+        Parámetros:
+            X (np.ndarray): Matriz (filas, 784) de pixeles uint8.
+
+        Retorna:
+            np.ndarray: Matriz (filas, n_neighbors) de índices de train, ordenados por distancia en 28x28.
+        """
+
+        cantidad_train = len(self.indices_train)
+        # Cada preselección no puede ser menor que la siguiente ni que K, ni mayor que la cantidad de train
+        cantidades = [min(cantidad_train, max(c, self.n_neighbors)) for c in self.candidatos] + [min(cantidad_train, self.n_neighbors)]
+        cantidades = list(np.minimum.accumulate(cantidades))
+        piramide_consultas = construir_piramide(X)
+
+        vecinos = np.empty((len(X), cantidades[-1]), dtype=np.int64)
+        for inicio in range(0, len(X), self.filas_por_bloque):
+            consultas = [nivel[inicio:inicio + self.filas_por_bloque] for nivel in piramide_consultas]
+            # Primer nivel: distancia a todas las filas de train (con 49 atributos, recorriendo train por teselas, ver Auxiliares/NucleoDistancias.py)
+            candidatos = vecinos_exactos(self.piramide[0], consultas[0], cantidades[0])
+            for nivel in range(1, len(FACTORES)):
+                candidatos = reordenar(self.piramide[nivel], consultas[nivel], candidatos, cantidades[nivel])
+            vecinos[inicio:inicio + len(candidatos)] = candidatos
+        return vecinos
+
+    def predict(self, X: np.ndarray) -> np.ndarray:
+        vecinos = self.kneighbors(X)
+        return predecir_para_cada_k(self.indices_train[vecinos], [vecinos.shape[1]], self.clases)[0]
+
+
+'''
+    Función principal
+'''
+
+def comparar_con_knn_exacto(x_train: np.ndarray, y_train: np.ndarray, x_test: np.ndarray, y_test: np.ndarray, k: int = 5,
+                            preselecciones: tuple = ((64, 16), (256, 64), (1024, 256))) -> list:
+    """
+    Comparar KNNPiramide con distintas preselecciones contra KNN exacto: exactitud, recall de los K vecinos y tiempo de predicción.
+
+    Parámetros:
+        x_train (np.ndarray): Matriz (train, 784) de pixeles uint8.
+        y_train (np.ndarray): Etiquetas de train.
+        x_test (np.ndarray): Matriz (test, 784) de pixeles uint8.
+        y_test (np.ndarray): Etiquetas de test.
+        k (int): Cantidad de vecinos.
+        preselecciones (tuple): Pares (candidatos en 7x7, candidatos en 14x14) a evaluar.
+
+    Retorna:
+        list: Un diccionario de resultados por preselección, empezando por KNN exacto (también se imprimen por consola).
+    """
+
+    x_train = np.asarray(x_train)
+    x_test = np.asarray(x_test)
+    y_test = np.asarray(y_test)
+    clases, indices_train = np.unique(y_train, return_inverse=True)
+
+    inicio = time.perf_counter()
+    exactos = vecinos_exactos(x_train, x_test, k)
+    prediccion_exacta = predecir_para_cada_k(indices_train[exactos], [exactos.shape[1]], clases)[0]
+    tiempo_exacto = time.perf_counter() - inicio
+    resultados = [{'candidatos': None, 'exactitud': float(np.mean(prediccion_exacta == y_test)), 'recall': 1.0, 'tiempo': tiempo_exacto}]
+    print(f"KNN exacto (K = {k}): exactitud {resultados[0]['exactitud']:.4f}, {tiempo_exacto:.2f} s")
+
+    for candidatos in preselecciones:
+        knn = KNNPiramide(n_neighbors = k, candidatos = candidatos).fit(x_train, y_train)
+        inicio = time.perf_counter()
+        vecinos = knn.kneighbors(x_test)
+        prediccion = predecir_para_cada_k(knn.indices_train[vecinos], [vecinos.shape[1]], knn.clases)[0]
+        tiempo = time.perf_counter() - inicio
+        resultados.append({'candidatos': candidatos, 'exactitud': float(np.mean(prediccion == y_test)), 'recall': recall(vecinos, exactos), 'tiempo': tiempo})
+        print(f"KNN piramidal (K = {k}, preselección {candidatos[0]} en 7x7 y {candidatos[1]} en 14x14): "
+              f"exactitud {resultados[-1]['exactitud']:.4f}, recall {resultados[-1]['recall']:.4f}, {tiempo:.2f} s")
+    return resultados
@@ -0,0 +1,195 @@
+'''
+    Autores:
+    - Alvarez, Matías
+    - Dumas, Román
+    - Nogueroles, Patricio
+
+    Archivo que define KNNPonderado, un clasificador KNN para pocos atributos uint8 (por ejemplo, los 3 pixeles del ejercicio 2.C).
+    Con tan pocos atributos muchas imágenes de train tienen exactamente los mismos valores (el fondo es 0), por lo que se
+    agrupan las filas repetidas en puntos únicos con un conteo por clase, y la búsqueda de vecinos se hace sobre esos puntos.
+    Del mismo modo, las filas de test repetidas se predicen una única vez.
+
+    Semántica: la misma que KNeighborsClassifier (distancia euclídea, pesos uniformes, empates de votos a favor de la clase menor).
+    Los K vecinos son las filas de los puntos más cercanos que el K-ésimo vecino, más algunas de las filas empatadas con él. Como
+    KNeighborsClassifier toma esas filas empatadas en el orden en que recorre su kd_tree (que no se puede reproducir), cada consulta
+    se certifica o se delega, como en Auxiliares/BarridoKNN.py:
+        - Si la clase ganadora es la misma sin importar qué filas empatadas se tomen (ver votacion_con_empates(...)), se predice directamente.
+        - Si no, la consulta se predice con KNeighborsClassifier entrenado sobre las mismas filas (se entrena sólo si alguna consulta lo necesita).
+    Con 3 pixeles uint8 los empates en el límite son frecuentes, pero en la mayoría la votación no depende del desempate.
+
+    Modo de uso (mismos métodos que KNeighborsClassifier):
+        modelo = KNNPonderado(n_neighbors = 5).fit(X, Y)
+        Y_predict = modelo.predict(X_test)
+
+    La función comparar_con_sklearn(...) mide los tiempos de ambos clasificadores y verifica que sus predicciones coincidan.
+'''
+
+import time
+
+import numpy as np
+from sklearn.neighbors import KNeighborsClassifier
+
+from Auxiliares.NucleoDistancias import normas_cuadradas, distancias_cuadradas
+from Auxiliares.BarridoKNN import votos_alrededor_del_k_esimo, votacion_con_empates
+
+
+def agrupar_filas(X: np.ndarray) -> tuple:
+    """
+    Obtener las filas únicas de X (en orden lexicográfico) y, para cada fila, el índice de su fila única.
+    Si X es uint8 con a lo sumo 7 columnas, cada fila se empaqueta en un único entero y se ordenan esos enteros,
+    lo que es bastante más rápido que np.unique(X, axis=0) y da el mismo resultado.
+
+    Parámetros:
+        X (np.ndarray): Matriz (filas, atributos).
+
+    Retorna:
+        tuple: (filas únicas, índice de la fila única de cada fila).
+    """
+
+    if X.dtype != np.uint8 or not 1 <= X.shape[1] <= 7:
+        unicas, inversa = np.unique(X, axis=0, return_inverse=True)
+        return unicas, inversa.ravel()
+
+    claves = np.zeros(len(X), dtype=np.int64)
+    for columna in range(X.shape[1]):
+        claves = (claves << 8) | X[:, columna]
+    _, primera, inversa = np.unique(claves, return_index=True, return_inverse=True)
+    return X[primera], inversa
+
+
+class KNNPonderado:
+    """
+    Clasificador KNN sobre los puntos únicos de train, cada uno con su conteo de filas por clase.
+
+    Atributos (luego de fit):
+        puntos (np.ndarray): Matriz (U, atributos) con los vectores únicos de train.
+        conteos (np.ndarray): Matriz (U, clases) con la cantidad de filas de cada clase en cada punto único.
+        clases (np.ndarray): Clases ordenadas de menor a mayor.
+        consultas_delegadas_ (int): Cantidad de consultas únicas que se predijeron con KNeighborsClassifier en la última predicción.
+    """
+
+    def __init__(self, n_neighbors: int = 5, filas_por_bloque: int = 256):
+        self.n_neighbors = n_neighbors
+        self.filas_por_bloque = filas_por_bloque
+
+    def fit(self, X: np.ndarray, y: np.ndarray) -> 'KNNPonderado':
+        X = np.asarray(X)
+        self.clases, clase_fila = np.unique(np.asarray(y), return_inverse=True)
+        self.puntos, punto_fila = agrupar_filas(X)
+
+        self.conteos = np.zeros((len(self.puntos), len(self.clases)), dtype=np.int64)
+        np.add.at(self.conteos, (punto_fila, clase_fila), 1)
+
+        # Las filas originales se guardan para entrenar KNeighborsClassifier sólo si alguna consulta depende del desempate
+        self._X, self._y = X, np.asarray(y)
+        self._knn = None
+        return self
+
+    def _votos(self, distancias: np.ndarray) -> tuple:
+        """
+        Calcular los votos por clase de los K vecinos más cercanos de cada consulta, dada su distancia a cada punto único.
+        Los puntos más cercanos que el K-ésimo vecino votan con todas sus filas, y los empatados con él con las que falten.
+
+        Parámetros:
+            distancias (np.ndarray): Matriz (consultas, U) de distancias al cuadrado.
+
+        Retorna:
+            tuple: (índice (en clases) de la clase ganadora de cada consulta, vector booleano con True en las consultas cuya
+                    ganadora no depende de qué filas empatadas se tomen).
+        """
+
+        k = min(self.n_neighbors, int(self.conteos.sum()))
+
+        # Los K vecinos están entre las filas de los K puntos más cercanos (cada punto tiene al menos una fila),
+        # por lo que sólo se ordenan esos K puntos candidatos en lugar de todos
+        k_puntos = min(k, distancias.shape[1])
+        if k_puntos < distancias.shape[1]:
+            candidatos = np.argpartition(distancias, k_puntos - 1, axis=1)[:, :k_puntos]
+        else:
+            candidatos = np.broadcast_to(np.arange(distancias.shape[1]), distancias.shape)
+        orden = np.argsort(np.take_along_axis(distancias, candidatos, axis=1), axis=1, kind='stable')
+        candidatos = np.take_along_axis(candidatos, orden, axis=1)
+        acumulado = np.cumsum(self.conteos.sum(axis=1)[candidatos], axis=1)
+
+        # Distancia del punto que contiene al K-ésimo vecino
+        posicion_limite = (acumulado < k).sum(axis=1)
+        distancia_limite = distancias[np.arange(len(distancias)), candidatos[np.arange(len(distancias)), posicion_limite]]
+
+        return votacion_con_empates(*votos_alrededor_del_k_esimo(distancias, distancia_limite, self.conteos), k)
+
+    def predecir_unicos(self, consultas: np.ndarray) -> np.ndarray:
+        # Predicción para consultas sin filas repetidas (no vuelve a agruparlas), procesadas de a bloques
+        normas_puntos = normas_cuadradas(self.puntos)
+        predicciones = np.empty(len(consultas), dtype=self.clases.dtype)
+        aseguradas = np.ones(len(consultas), dtype=bool)
+
+        for inicio in range(0, len(consultas), self.filas_por_bloque):
+            bloque = np.asarray(consultas[inicio:inicio + self.filas_por_bloque])
+            # ||q - p||^2 = ||q||^2 + ||p||^2 - 2 q.p, calculado directamente desde uint8 con acumulación entera (exacto, ver Auxiliares/NucleoDistancias.py)
+            distancias = distancias_cuadradas(bloque, self.puntos, normas_puntos)
+            ganadora, asegurada = self._votos(distancias)
+            predicciones[inicio:inicio + len(bloque)] = self.clases[ganadora]
+            aseguradas[inicio:inicio + len(bloque)] = asegurada
+
+        # Las consultas cuya votación depende del desempate en distancia se predicen con KNeighborsClassifier
+        delegadas = np.flatnonzero(~aseguradas)
+        self.consultas_delegadas_ = len(delegadas)
+        if len(delegadas) > 0:
+            if self._knn is None:
+                self._knn = KNeighborsClassifier(n_neighbors = self.n_neighbors).fit(self._X, self._y)
+            predicciones[delegadas] = self._knn.predict(np.asarray(consultas)[delegadas])
+        return predicciones
+
+    def predict(self, X: np.ndarray) -> np.ndarray:
+        consultas, consulta_fila = agrupar_filas(np.asarray(X))
+        return self.predecir_unicos(consultas)[consulta_fila]
+
+
+def comparar_con_sklearn(X: np.ndarray, y: np.ndarray, X_test: np.ndarray, k: int = 5, repeticiones: int = 3) -> dict:
+    """
+    Comparar KNNPonderado contra KNeighborsClassifier: tiempos de entrenamiento y predicción, tamaño del conjunto de búsqueda,
+    cantidad de consultas delegadas a KNeighborsClassifier y proporción de predicciones coincidentes (1.0 si coinciden todas, lo esperado).
+
+    Parámetros:
+        X (np.ndarray): Atributos de train.
+        y (np.ndarray): Etiquetas de train.
+        X_test (np.ndarray): Atributos de test.
+        k (int): Cantidad de vecinos.
+        repeticiones (int): Se toma el menor tiempo entre varias repeticiones.
+
+    Retorna:
+        dict: Resultados de la comparación (también se imprimen por consola).
+    """
+
+    def medir(modelo):
+        tiempos_fit, tiempos_predict = [], []
+        for _ in range(repeticiones):
+            inicio = time.perf_counter()
+            modelo.fit(X, y)
+            tiempos_fit.append(time.perf_counter() - inicio)
+            inicio = time.perf_counter()
+            predicciones = modelo.predict(X_test)
+            tiempos_predict.append(time.perf_counter() - inicio)
+        return min(tiempos_fit), min(tiempos_predict), predicciones
+
+    fit_sklearn, predict_sklearn, y_sklearn = medir(KNeighborsClassifier(n_neighbors = k))
+    ponderado = KNNPonderado(n_neighbors = k)
+    fit_ponderado, predict_ponderado, y_ponderado = medir(ponderado)
+
+    resultado = {
+        'filas_train': len(X),
+        'puntos_unicos': len(ponderado.puntos),
+        'fit_sklearn': fit_sklearn,
+        'predict_sklearn': predict_sklearn,
+        'fit_ponderado': fit_ponderado,
+        'predict_ponderado': predict_ponderado,
+        'consultas_delegadas': ponderado.consultas_delegadas_,
+        'coincidencia': float(np.mean(y_sklearn == y_ponderado)),
+    }
+
+    print('Filas de train:', resultado['filas_train'], '- puntos únicos:', resultado['puntos_unicos'])
+    print(f"KNeighborsClassifier: fit {fit_sklearn*1000:.2f} ms, predict {predict_sklearn*1000:.2f} ms")
+    print(f"KNNPonderado:         fit {fit_ponderado*1000:.2f} ms, predict {predict_ponderado*1000:.2f} ms")
+    print(f"Consultas únicas delegadas a KNeighborsClassifier: {resultado['consultas_delegadas']}")
+    print(f"Coincidencia de predicciones: {resultado['coincidencia']:.4f}")
+    return resultado
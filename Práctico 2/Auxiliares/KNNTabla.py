@@ -0,0 +1,211 @@
+'''
+    Autores:
+    - Alvarez, Matías
+    - Dumas, Román
+    - Nogueroles, Patricio
+
+    Archivo que define KNNTabla, un clasificador KNN para 1 a 3 atributos uint8 (como las tuplas t1, t2 y t3 del ejercicio 2.C)
+    que precalcula la predicción de KNeighborsClassifier para todas las entradas posibles y la guarda en una tabla.
+    Luego de construir la tabla, predecir es indexarla: una única operación vectorizada, sin cálculo de distancias.
+
+    Con d atributos uint8 hay 256^d entradas posibles (16.777.216 con 3 pixeles). En lugar de predecir cada una, la grilla se recorre
+    por bloques (cubos de celdas), de los más grandes a los más chicos:
+        1. Se buscan los K vecinos del centro del bloque (dK: distancia al K-ésimo vecino del centro; r: distancia del centro a la
+           esquina del bloque). Por desigualdad triangular, los K vecinos de cualquier celda del bloque están a menos de dK + 2r
+           del centro, y las filas a menos de dK - 2r del centro están entre ellos. Todo el bloque se llena con la clase c si:
+               - Los K vecinos del centro son de la clase c y la fila más cercana de otra clase está a más de dK + 2r, o
+               - Más de K / 2 de las filas a menos de dK - 2r del centro son de la clase c.
+           En ambos casos, KNN predice c en todas las celdas del bloque sin importar cómo se resuelvan los empates en distancia.
+        2. Los bloques que no se pueden asegurar se dividen en 2^d bloques de la mitad de lado, y se repite.
+        3. Las celdas de los bloques de lado 2 que no se pudieron asegurar (las cercanas a la frontera entre clases) se predicen
+           directamente con KNeighborsClassifier.
+    Así, la tabla coincide exactamente con las predicciones de KNeighborsClassifier (incluso ante empates en distancia), y sólo
+    se predicen una por una las celdas cercanas a la frontera (ver verificar_contra_knn(...)).
+
+    Opcionalmente se cuantiza cada atributo a 'niveles' valores (cada valor v se reemplaza por el centro de su intervalo), y la tabla
+    pasa a tener niveles^d celdas. En ese caso las predicciones son las de KNN entrenado y evaluado sobre los datos cuantizados,
+    que pueden diferir bastante de las de KNN sobre los datos originales; por eso por defecto no se cuantiza (niveles = 256).
+'''
+
+import numpy as np
+from sklearn.neighbors import KNeighborsClassifier, KDTree
+
+MAXIMO_ATRIBUTOS = 3
+# Lado (en celdas) de los bloques con los que se empieza a recorrer la grilla
+LADO_INICIAL = 32
+# Cantidad de celdas que se predicen a la vez con KNeighborsClassifier (acota la memoria)
+CELDAS_POR_BLOQUE = 1 << 18
+
+
+'''
+    Funciones auxiliares
+'''
+
+def vista_por_bloques(tabla: np.ndarray, lado: int) -> np.ndarray:
+    # Vista de la tabla con forma (bloques por eje,) * d + (lado,) * d: asignar sobre la vista escribe en la tabla
+    d = tabla.ndim
+    forma = []
+    for n in tabla.shape:
+        forma += [n // lado, lado]
+    return tabla.reshape(forma).transpose(list(range(0, 2 * d, 2)) + list(range(1, 2 * d, 2)))
+
+
+def celdas_de_bloques(bloques: np.ndarray, lado: int) -> np.ndarray:
+    # Índices de todas las celdas de los bloques (dados por su esquina inferior), de forma (bloques * lado^d, d)
+    d = bloques.shape[1]
+    desplazamientos = np.indices((lado,) * d).reshape(d, -1).T
+    return (bloques[:, None, :] + desplazamientos[None, :, :]).reshape(-1, d)
+
+
+def subdividir(bloques: np.ndarray, lado: int) -> np.ndarray:
+    # Esquinas de los 2^d bloques de lado / 2 en que se divide cada bloque
+    d = bloques.shape[1]
+    desplazamientos = np.indices((2,) * d).reshape(d, -1).T * (lado // 2)
+    return (bloques[:, None, :] + desplazamientos[None, :, :]).reshape(-1, d)
+
+
+class KNNTabla:
+    """
+    Clasificador KNN precalculado como tabla sobre la grilla (opcionalmente cuantizada) de entradas posibles.
+
+    Atributos (luego de fit):
+        tabla (np.ndarray): Arreglo uint8 de forma (niveles,) * d con el índice (en clases) de la clase predicha en cada celda.
+        clases (np.ndarray): Clases ordenadas de menor a mayor.
+        celdas_predichas_ (int): Cantidad de celdas que se predijeron directamente con KNeighborsClassifier (el resto se aseguró por bloques).
+    """
+
+    def __init__(self, n_neighbors: int = 5, niveles: int = 256):
+        self.n_neighbors = n_neighbors
+        self.niveles = niveles
+
+    def cuantizar(self, X: np.ndarray) -> np.ndarray:
+        # Índice de la celda de cada valor (entre 0 y niveles - 1)
+        return np.asarray(X, dtype=np.uint8) // self._paso
+
+    def representar(self, X: np.ndarray) -> np.ndarray:
+        # Valor que representa a cada celda (el centro de su intervalo; sin cuantizar es el valor mismo)
+        return self.cuantizar(X).astype(np.int64) * self._paso + self._paso // 2
+
+    def _representar_celdas(self, celdas: np.ndarray) -> np.ndarray:
+        # Coordenadas (en la escala de los pixeles) de celdas o de centros de bloques dados como índices de la grilla
+        return celdas * self._paso + self._paso // 2
+
+    def _asegurar_bloques(self, knn: KNeighborsClassifier, otras_clases: list, indices_train: np.ndarray,
+                          bloques: np.ndarray, lado: int) -> tuple:
+        """
+        Determinar qué bloques tienen asegurada una única clase (ver el paso 1 en la descripción del archivo).
+
+        Parámetros:
+            knn (KNeighborsClassifier): KNN entrenado sobre los datos (representados).
+            otras_clases (list): Para cada clase, un KDTree con las filas de train de las demás clases (None si no hay).
+            indices_train (np.ndarray): Índice (en clases) de la clase de cada fila de train.
+            bloques (np.ndarray): Matriz (bloques, d) con la esquina inferior de cada bloque, en índices de la grilla.
+            lado (int): Lado de los bloques, en celdas.
+
+        Retorna:
+            tuple: (vector booleano de bloques asegurados, índice de la clase de cada bloque).
+        """
+
+        d = bloques.shape[1]
+        centros = self._representar_celdas(bloques + (lado - 1) / 2)
+        radio = self._paso * (lado - 1) / 2 * np.sqrt(d)
+
+        distancias, vecinos = knn.kneighbors(centros)
+        clases_vecinos = indices_train[vecinos]
+        k = vecinos.shape[1]
+
+        # Criterio de mayoría: las filas a menos de dK - 2r del centro están entre los K vecinos de todas las celdas del bloque.
+        # Si más de la mitad de ellas son de una clase, esa clase gana la votación en todas las celdas
+        seguras = distancias < distancias[:, -1:] - 2 * radio - 1e-6
+        votos_seguros = np.stack([(seguras & (clases_vecinos == c)).sum(axis=1) for c in range(len(otras_clases))], axis=1)
+        clase = np.argmax(votos_seguros, axis=1)
+        asegurados = 2 * votos_seguros[np.arange(len(bloques)), clase] > k
+
+        # Criterio de unanimidad (ver el paso 1 en la descripción del archivo), para los bloques que no se aseguraron por mayoría
+        clase = np.where(asegurados, clase, clases_vecinos[:, 0])
+        unanimes = ~asegurados & (clases_vecinos == clase[:, None]).all(axis=1)
+
+        for c, arbol in enumerate(otras_clases):
+            filas = np.flatnonzero(unanimes & (clase == c))
+            if len(filas) == 0:
+                continue
+            if arbol is None:
+                asegurados[filas] = True
+                continue
+            mas_cercana = arbol.query(centros[filas], k = 1)[0][:, 0]
+            # Margen para los errores de redondeo de las distancias en punto flotante
+            asegurados[filas] = mas_cercana > distancias[filas, -1] + 2 * radio + 1e-6
+
+        return asegurados, clase
+
+    def fit(self, X: np.ndarray, y: np.ndarray) -> 'KNNTabla':
+        X = np.asarray(X)
+        cantidad_atributos = X.shape[1]
+        if not 1 <= cantidad_atributos <= MAXIMO_ATRIBUTOS:
+            raise ValueError('KNNTabla admite entre 1 y ' + str(MAXIMO_ATRIBUTOS) + ' atributos, se recibieron ' + str(cantidad_atributos))
+
+        niveles = self.niveles
+        if niveles not in (1, 2, 4, 8, 16, 32, 64, 128, 256):
+            raise ValueError('La cantidad de niveles debe ser una potencia de 2 entre 1 y 256, se recibió ' + str(niveles))
+        self.niveles_ = niveles
+        self._paso = 256 // niveles
+
+        # KNN sobre los datos (cuantizados si niveles < 256), evaluado en el representante de cada celda de la grilla
+        representantes = self.representar(X)
+        knn = KNeighborsClassifier(n_neighbors = self.n_neighbors).fit(representantes, y)
+        self.clases = knn.classes_
+        indices_train = np.searchsorted(self.clases, np.asarray(y))
+        otras_clases = [KDTree(representantes[indices_train != c]) if (indices_train != c).any() else None
+                        for c in range(len(self.clases))]
+
+        self.tabla = np.zeros((niveles,) * cantidad_atributos, dtype=np.uint8)
+
+        # Se recorre la grilla por bloques, de lado LADO_INICIAL hasta 2, llenando los bloques asegurados y dividiendo el resto
+        lado = min(LADO_INICIAL, niveles)
+        bloques = np.indices((niveles // lado,) * cantidad_atributos).reshape(cantidad_atributos, -1).T * lado
+        while lado > 1 and len(bloques) > 0:
+            asegurados, clase = self._asegurar_bloques(knn, otras_clases, indices_train, bloques, lado)
+            vista = vista_por_bloques(self.tabla, lado)
+            vista[tuple((bloques[asegurados] // lado).T)] = clase[asegurados].reshape((-1,) + (1,) * cantidad_atributos)
+            bloques = bloques[~asegurados]
+            if lado == 2:
+                break
+            bloques = subdividir(bloques, lado)
+            lado //= 2
+
+        # Las celdas de los bloques que no se pudieron asegurar se predicen directamente
+        celdas = celdas_de_bloques(bloques, lado) if len(bloques) > 0 else np.zeros((0, cantidad_atributos), dtype=np.int64)
+        self.celdas_predichas_ = len(celdas)
+        for inicio in range(0, len(celdas), CELDAS_POR_BLOQUE):
+            bloque = celdas[inicio:inicio + CELDAS_POR_BLOQUE]
+            predicciones = knn.predict(self._representar_celdas(bloque))
+            self.tabla[tuple(bloque.T)] = np.searchsorted(self.clases, predicciones)
+
+        return self
+
+    def predict(self, X: np.ndarray) -> np.ndarray:
+        celdas = self.cuantizar(X)
+        return self.clases[self.tabla[tuple(celdas.T)]]
+
+
+'''
+    Función principal
+'''
+
+def verificar_contra_knn(tabla: KNNTabla, modelo: KNeighborsClassifier, X_test: np.ndarray) -> float:
+    """
+    Verificar que KNNTabla prediga lo mismo que KNeighborsClassifier entrenado sobre los mismos datos (sin cuantizar).
+
+    Parámetros:
+        tabla (KNNTabla): Tabla entrenada.
+        modelo (KNeighborsClassifier): KNN entrenado sobre los mismos datos y con el mismo K.
+        X_test (np.ndarray): Atributos de test.
+
+    Retorna:
+        float: Proporción de predicciones coincidentes (1.0 si coinciden todas, lo esperado con niveles = 256).
+    """
+
+    coincidencia = float(np.mean(tabla.predict(X_test) == modelo.predict(X_test)))
+    print(f"Coincidencia entre KNNTabla ({tabla.niveles_} niveles, {tabla.celdas_predichas_} celdas predichas directamente) "
+          f"y KNeighborsClassifier: {coincidencia:.4f}")
+    return coincidencia
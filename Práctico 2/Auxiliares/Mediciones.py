@@ -0,0 +1,35 @@
+'''
+    Autores:
+    - Alvarez, Matías
+    - Dumas, Román
+    - Nogueroles, Patricio
+
+    Archivo con la función para medir el tiempo y el pico de memoria de una ejecución, que usan las comparaciones de rendimiento
+    (ver Auxiliares/RepresentacionDispersa.py y Auxiliares/PrediccionPorBloques.py).
+
+    Modo de uso:
+        resultado, tiempo, pico = medir(lambda: modelo.predict(X_test))
+'''
+
+import time
+import tracemalloc
+
+
+def medir(funcion) -> tuple:
+    """
+    Ejecutar funcion() midiendo el tiempo y el pico de memoria reservada durante la ejecución (numpy y scipy la informan a tracemalloc).
+
+    Parámetros:
+        funcion: Función sin parámetros a ejecutar.
+
+    Retorna:
+        tuple: (resultado de funcion(), tiempo en segundos, pico de memoria en bytes).
+    """
+
+    tracemalloc.start()
+    inicio = time.perf_counter()
+    resultado = funcion()
+    tiempo = time.perf_counter() - inicio
+    _, pico = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return resultado, tiempo, pico
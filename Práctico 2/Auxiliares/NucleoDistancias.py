@@ -0,0 +1,228 @@
+'''
+    Autores:
+    - Alvarez, Matías
+    - Dumas, Román
+    - Nogueroles, Patricio
+
+    Archivo encargado de calcular distancias euclídeas al cuadrado directamente a partir de pixeles uint8, sin pasar a float64
+    (como hace KNeighborsClassifier), y de obtener con ellas los K vecinos más cercanos.
+    Los métodos principales son distancias_cuadradas(...) (bloque completo de distancias) y vecinos_exactos(...) (K vecinos).
+
+    Se usa ||a - b||^2 = ||a||^2 + ||b||^2 - 2 a.b, con los productos a.b calculados por teselas:
+        - Se recorren teselas de FILAS_POR_TESELA consultas por COLUMNAS_POR_TESELA filas de train, que entran en la caché.
+        - Dentro de cada tesela, los 784 pixeles se dividen en tramos de PIXELES_POR_TRAMO. El producto de un tramo es a lo sumo
+          256 * 255^2 < 2^24, por lo que se calcula con una multiplicación de matrices en float32 (4 bytes por valor en lugar de 8)
+          y el resultado es un entero exacto. Los productos de los tramos se acumulan en int32 (784 * 255^2 también entra en int32).
+    Las distancias son enteros exactos, sin errores de redondeo, y son las mismas que calcula KNeighborsClassifier (métrica euclídea
+    por defecto, también exacta para pixeles enteros).
+
+    Para los K vecinos, cada tesela de train se combina con los K mejores de las teselas anteriores, por lo que nunca se guarda
+    la matriz completa (consultas x train). Los empates en distancia se resuelven a favor de la fila de train de menor índice,
+    como en vecinos_mas_cercanos (Auxiliares/BarridoKNN.py); sklearn, en cambio, toma los vecinos empatados en el orden de su
+    estructura de búsqueda.
+
+    KNNExacto envuelve vecinos_exactos(...) en un clasificador con fit y predict que predice exactamente lo mismo que KNeighborsClassifier:
+        - Se buscan K + 1 vecinos. Si el (K + 1)-ésimo está más lejos que el K-ésimo, los K vecinos son los mismos que los de sklearn.
+        - Si empatan, se calcula la fila completa de distancias de esa consulta y se verifica que la votación no dependa de qué filas
+          empatadas se tomen (ver votacion_con_empates(...) en Auxiliares/BarridoKNN.py).
+        - Las consultas que no se pueden asegurar (con los 784 pixeles, casi ninguna) se predicen con KNeighborsClassifier.
+
+    Modo de uso:
+        distancias = distancias_cuadradas(X_test, X_train)
+        vecinos = vecinos_exactos(X_train, X_test, k = 5)
+        Y_predict = KNNExacto(n_neighbors = 5).fit(X_train, Y_train).predict(X_test)
+'''
+
+import numpy as np
+
+from sklearn.neighbors import KNeighborsClassifier
+
+from Auxiliares.BarridoKNN import predecir_para_cada_k, votos_alrededor_del_k_esimo, votacion_con_empates
+
+PIXELES_POR_TRAMO = 256
+FILAS_POR_TESELA = 512
+COLUMNAS_POR_TESELA = 2048
+
+
+'''
+    Funciones auxiliares
+'''
+
+def normas_cuadradas(X: np.ndarray) -> np.ndarray:
+    # ||x||^2 de cada fila (int32 para uint8, ya que 784 * 255^2 < 2^31), sumando tramo por tramo en float32
+    X = np.asarray(X)
+    if X.dtype != np.uint8:
+        valores = X.astype(np.int64)
+        return (valores * valores).sum(axis=1)
+    normas = np.zeros(len(X), dtype=np.int32)
+    for inicio in range(0, X.shape[1], PIXELES_POR_TRAMO):
+        tramo = X[:, inicio:inicio + PIXELES_POR_TRAMO].astype(np.float32)
+        normas += np.einsum('ij,ij->i', tramo, tramo).astype(np.int32)
+    return normas
+
+
+def productos_tesela(consultas: np.ndarray, base: np.ndarray) -> np.ndarray:
+    """
+    Calcular los productos a.b entre una tesela de consultas y una de train, acumulando en int32 los productos de cada tramo.
+
+    Parámetros:
+        consultas (np.ndarray): Matriz (consultas, pixeles) float32 con valores enteros entre 0 y 255.
+        base (np.ndarray): Matriz (train, pixeles) float32 con valores enteros entre 0 y 255.
+
+    Retorna:
+        np.ndarray: Matriz (consultas, train) int32.
+    """
+
+    productos = np.zeros((len(consultas), len(base)), dtype=np.int32)
+    for inicio in range(0, consultas.shape[1], PIXELES_POR_TRAMO):
+        fin = inicio + PIXELES_POR_TRAMO
+        productos += (consultas[:, inicio:fin] @ base[:, inicio:fin].T).astype(np.int32)
+    return productos
+
+
+def distancias_tesela(consultas: np.ndarray, normas_consultas: np.ndarray, base: np.ndarray, normas_base: np.ndarray) -> np.ndarray:
+    # Distancias al cuadrado de una tesela; las filas ya vienen en float32 (enteros exactos) y las normas en int32
+    if consultas.dtype == np.float32:
+        productos = productos_tesela(consultas, base)
+    else:
+        # Para valores que no son uint8 el producto se calcula en float64 (exacto para enteros mientras no superen 2^53)
+        productos = np.rint(consultas @ base.T).astype(np.int64)
+    return normas_consultas[:, None] + normas_base[None, :] - 2 * productos
+
+
+def a_tesela(X: np.ndarray) -> np.ndarray:
+    # Valores de una tesela listos para multiplicar: float32 para uint8 (exacto por tramos), float64 para otros enteros
+    return X.astype(np.float32 if X.dtype == np.uint8 else np.float64)
+
+
+'''
+    Funciones principales
+'''
+
+def distancias_cuadradas(x_consulta: np.ndarray, x_base: np.ndarray, normas_base: np.ndarray = None) -> np.ndarray:
+    """
+    Calcular el bloque completo de distancias euclídeas al cuadrado entre cada consulta y cada fila de la base.
+
+    Parámetros:
+        x_consulta (np.ndarray): Matriz (consultas, pixeles) de pixeles uint8 (u otros enteros, calculados en float64).
+        x_base (np.ndarray): Matriz (base, pixeles) del mismo tipo.
+        normas_base (np.ndarray, opcional): ||b||^2 de cada fila de la base (normas_cuadradas(x_base)), si ya se calcularon.
+
+    Retorna:
+        np.ndarray: Matriz (consultas, base) de distancias al cuadrado (int32 para uint8, int64 para otros tipos).
+    """
+
+    x_consulta = np.asarray(x_consulta)
+    x_base = np.asarray(x_base)
+    normas_base = normas_cuadradas(x_base) if normas_base is None else normas_base
+    normas_consulta = normas_cuadradas(x_consulta)
+
+    distancias = np.empty((len(x_consulta), len(x_base)), dtype=np.int32 if x_base.dtype == np.uint8 else np.int64)
+    for columna in range(0, len(x_base), COLUMNAS_POR_TESELA):
+        # Cada tesela de train se convierte una única vez, y se recorre contra todas las teselas de consultas
+        base = a_tesela(x_base[columna:columna + COLUMNAS_POR_TESELA])
+        normas = normas_base[columna:columna + COLUMNAS_POR_TESELA]
+        for fila in range(0, len(x_consulta), FILAS_POR_TESELA):
+            consultas = a_tesela(x_consulta[fila:fila + FILAS_POR_TESELA])
+            distancias[fila:fila + len(consultas), columna:columna + len(base)] = distancias_tesela(
+                consultas, normas_consulta[fila:fila + FILAS_POR_TESELA], base, normas)
+    return distancias
+
+
+def vecinos_exactos(x_base: np.ndarray, x_consulta: np.ndarray, k: int, normas_base: np.ndarray = None,
+                    devolver_distancias: bool = False):
+    """
+    Búsqueda exacta de los k vecinos más cercanos de cada consulta, recorriendo la base por teselas y conservando sólo
+    los k mejores hasta el momento (nunca se guarda la matriz completa de distancias).
+
+    Parámetros:
+        x_base (np.ndarray): Matriz (base, pixeles) de pixeles uint8.
+        x_consulta (np.ndarray): Matriz (consultas, pixeles) de pixeles uint8.
+        k (int): Cantidad de vecinos.
+        normas_base (np.ndarray, opcional): ||b||^2 de cada fila de la base, si ya se calcularon.
+        devolver_distancias (bool): Si además se devuelven las distancias al cuadrado de los vecinos.
+
+    Retorna:
+        np.ndarray: Matriz (consultas, k) de índices de la base, ordenados por distancia (y por índice ante empates).
+        Si devolver_distancias es True, la tupla (índices, distancias al cuadrado).
+    """
+
+    x_base = np.asarray(x_base)
+    x_consulta = np.asarray(x_consulta)
+    cantidad_base = len(x_base)
+    k = min(k, cantidad_base)
+    normas_base = normas_cuadradas(x_base) if normas_base is None else normas_base
+    normas_consulta = normas_cuadradas(x_consulta)
+
+    # La distancia y el índice se combinan en una única clave entera, como en vecinos_mas_cercanos (Auxiliares/BarridoKNN.py)
+    mejores = np.full((len(x_consulta), k), np.iinfo(np.int64).max, dtype=np.int64)
+    for columna in range(0, cantidad_base, COLUMNAS_POR_TESELA):
+        base = a_tesela(x_base[columna:columna + COLUMNAS_POR_TESELA])
+        normas = normas_base[columna:columna + COLUMNAS_POR_TESELA]
+        indices = np.arange(columna, columna + len(base), dtype=np.int64)
+        for fila in range(0, len(x_consulta), FILAS_POR_TESELA):
+            consultas = a_tesela(x_consulta[fila:fila + FILAS_POR_TESELA])
+            distancias = distancias_tesela(consultas, normas_consulta[fila:fila + FILAS_POR_TESELA], base, normas)
+            claves = np.concatenate([mejores[fila:fila + len(consultas)], distancias.astype(np.int64) * cantidad_base + indices[None, :]], axis=1)
+            mejores[fila:fila + len(consultas)] = np.partition(claves, k - 1, axis=1)[:, :k]
+
+    mejores.sort(axis=1)
+    vecinos = mejores % cantidad_base
+    if devolver_distancias:
+        return vecinos, mejores // cantidad_base
+    return vecinos
+
+
+'''
+    Clasificador
+'''
+
+class KNNExacto:
+    """
+    Clasificador KNN sobre los pixeles uint8 con vecinos_exactos(...), con las mismas predicciones que KNeighborsClassifier
+    (ver la descripción del archivo).
+
+    Atributos (luego de fit):
+        base (np.ndarray): Matriz (train, pixeles) de pixeles de train.
+        clases (np.ndarray): Clases ordenadas de menor a mayor.
+        indices_train (np.ndarray): Índice (en clases) de la clase de cada fila de train.
+        consultas_delegadas_ (int): Cantidad de consultas que se predijeron con KNeighborsClassifier en la última predicción.
+    """
+
+    def __init__(self, n_neighbors: int = 5):
+        self.n_neighbors = n_neighbors
+
+    def fit(self, X: np.ndarray, y: np.ndarray) -> 'KNNExacto':
+        # Sólo se guardan los datos, y las normas para no recalcularlas en cada predicción
+        self.base = np.asarray(X)
+        self._normas_base = normas_cuadradas(self.base)
+        self._y = np.asarray(y)
+        self.clases, self.indices_train = np.unique(self._y, return_inverse=True)
+        # KNeighborsClassifier se entrena sólo si alguna consulta depende del desempate en distancia
+        self._knn = None
+        return self
+
+    def predict(self, X: np.ndarray) -> np.ndarray:
+        X = np.asarray(X)
+        k = min(self.n_neighbors, len(self.base))
+        vecinos, distancias = vecinos_exactos(self.base, X, k + 1, normas_base=self._normas_base, devolver_distancias=True)
+        predicciones = predecir_para_cada_k(self.indices_train[vecinos[:, :k]], [k], self.clases)[0]
+
+        # Consultas con una fila empatada con el K-ésimo vecino fuera de los K elegidos: se revisa su fila completa de distancias
+        self.consultas_delegadas_ = 0
+        empatadas = np.flatnonzero(distancias[:, k - 1] == distancias[:, -1]) if vecinos.shape[1] > k else np.zeros(0, dtype=np.int64)
+        if len(empatadas) == 0:
+            return predicciones
+
+        pesos = self.indices_train[:, None] == np.arange(len(self.clases))[None, :]
+        filas = distancias_cuadradas(X[empatadas], self.base, self._normas_base)
+        ganadora, asegurada = votacion_con_empates(*votos_alrededor_del_k_esimo(filas, distancias[empatadas, k - 1], pesos), k)
+        predicciones[empatadas] = self.clases[ganadora]
+
+        delegadas = empatadas[~asegurada]
+        self.consultas_delegadas_ = len(delegadas)
+        if len(delegadas) > 0:
+            if self._knn is None:
+                self._knn = KNeighborsClassifier(n_neighbors = self.n_neighbors).fit(self.base, self._y)
+            predicciones[delegadas] = self._knn.predict(X[delegadas])
+        return predicciones
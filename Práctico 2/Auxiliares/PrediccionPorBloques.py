@@ -0,0 +1,141 @@
+'''
+    Autores:
+    - Alvarez, Matías
+    - Dumas, Román
+    - Nogueroles, Patricio
+
+    Archivo encargado de predecir con un modelo KNN ya entrenado sin pasarle todo el conjunto de test en una única llamada.
+    Predecir una matriz de test implica, implícitamente, una matriz de distancias (test x train): con TMNIST completo y los 784 pixeles
+    son varios GB. predecir_por_bloques(...) divide las consultas en bloques cuyo tamaño sale de un presupuesto de memoria:
+        - Cada fila de test ocupa aproximadamente BYTES_POR_DISTANCIA bytes por fila de train (distancias, claves e índices temporales).
+        - El presupuesto se reparte entre los hilos, ya que cada hilo tiene un bloque en proceso a la vez.
+    Los bloques se ejecutan en un pool de hilos (numpy libera el GIL durante las operaciones sobre matrices, por lo que los hilos
+    trabajan en paralelo sin copiar el modelo a otros procesos) y los resultados se concatenan en el orden de las consultas.
+    Así, el pico de memoria depende del presupuesto y no de la cantidad de filas de test.
+
+    comparar_escalamiento(...) mide el tiempo y el pico de memoria al aumentar la cantidad de filas de test y la cantidad de hilos.
+
+    Modo de uso:
+        Y_predict = predecir_por_bloques(modelo, X_test, memoria_maxima = 256 * 2**20)
+'''
+
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+
+from Auxiliares.Mediciones import medir
+
+MEMORIA_POR_DEFECTO = 256 * 2**20
+# Bytes temporales por par (consulta, fila de train): distancia (int32 o float64), clave o índice int64 de la selección de vecinos, etc.
+BYTES_POR_DISTANCIA = 32
+
+
+'''
+    Funciones auxiliares
+'''
+
+def filas_de_train(modelo) -> int:
+    # Cantidad de filas (o puntos únicos) de train contra las que se compara cada consulta; 1 si el modelo no las recorre (tablas, árboles)
+    if hasattr(modelo, 'n_samples_fit_'):
+        return int(modelo.n_samples_fit_)
+    if hasattr(modelo, 'puntos'):
+        return len(modelo.puntos)
+    if hasattr(modelo, 'indices_train'):
+        return len(modelo.indices_train)
+    return 1
+
+
+def filas_por_bloque(filas_train: int, memoria_maxima: int, hilos: int) -> int:
+    """
+    Calcular cuántas filas de test puede procesar cada hilo a la vez sin superar el presupuesto de memoria entre todos los hilos.
+
+    Parámetros:
+        filas_train (int): Cantidad de filas de train contra las que se compara cada consulta.
+        memoria_maxima (int): Presupuesto de memoria temporal, en bytes, para todos los hilos.
+        hilos (int): Cantidad de hilos.
+
+    Retorna:
+        int: Cantidad de filas por bloque (al menos 1).
+    """
+
+    return max(1, memoria_maxima // (hilos * max(1, filas_train) * BYTES_POR_DISTANCIA))
+
+
+'''
+    Funciones principales
+'''
+
+def predecir_por_bloques(modelo, X: np.ndarray, memoria_maxima: int = MEMORIA_POR_DEFECTO, hilos: int = None) -> np.ndarray:
+    """
+    Predecir las filas de X con modelo.predict, de a bloques acotados por un presupuesto de memoria y en un pool de hilos.
+    El resultado es el mismo que modelo.predict(X).
+
+    Parámetros:
+        modelo: Modelo entrenado con método predict (KNNExacto, KNeighborsClassifier, KNNPonderado, KNNPiramide, KNNHamming, ...).
+        X (np.ndarray): Matriz (filas, atributos) de consultas.
+        memoria_maxima (int): Presupuesto de memoria temporal, en bytes, para todos los hilos.
+        hilos (int, opcional): Cantidad de hilos. Si es None, se usa la cantidad de CPUs.
+
+    Retorna:
+        np.ndarray: Predicción de cada fila de X, en el mismo orden.
+    """
+
+    hilos = hilos or os.cpu_count() or 1
+    tamano = filas_por_bloque(filas_de_train(modelo), memoria_maxima, hilos)
+    bloques = [X[inicio:inicio + tamano] for inicio in range(0, len(X), tamano)]
+    if len(bloques) <= 1 or hilos == 1:
+        return np.concatenate([modelo.predict(bloque) for bloque in bloques]) if bloques else modelo.predict(X)
+
+    # pool.map devuelve los resultados en el orden de los bloques, aunque terminen en otro orden
+    with ThreadPoolExecutor(max_workers=hilos) as pool:
+        return np.concatenate(list(pool.map(modelo.predict, bloques)))
+
+
+def comparar_escalamiento(modelo, X: np.ndarray, memoria_maxima: int = MEMORIA_POR_DEFECTO,
+                          repeticiones: tuple = (1, 2, 4), hilos: tuple = (1, 2, 4)) -> dict:
+    """
+    Medir el tiempo y el pico de memoria de predecir_por_bloques(...) contra una única llamada a modelo.predict:
+        - Con cantidades crecientes de filas de test (X repetido varias veces), con un único hilo
+        - Con distintas cantidades de hilos, sobre X
+    Las predicciones por bloques deben coincidir con las de la única llamada.
+
+    Parámetros:
+        modelo: Modelo entrenado con método predict.
+        X (np.ndarray): Matriz (filas, atributos) de consultas.
+        memoria_maxima (int): Presupuesto de memoria temporal, en bytes.
+        repeticiones (tuple): Cantidades de veces que se repite X para agrandar el test.
+        hilos (tuple): Cantidades de hilos a evaluar.
+
+    Retorna:
+        dict: Resultados de la comparación (también se imprimen por consola).
+    """
+
+    X = np.asarray(X)
+    resultado = {'filas_por_bloque': filas_por_bloque(filas_de_train(modelo), memoria_maxima, 1), 'tamanos': [], 'hilos': []}
+    print(f"Presupuesto de {memoria_maxima / 2**20:.0f} MB: {resultado['filas_por_bloque']} filas de test por bloque con un hilo")
+
+    for veces in repeticiones:
+        consultas = np.tile(X, (veces, 1))
+        completa, tiempo_completo, pico_completo = medir(lambda: modelo.predict(consultas))
+        por_bloques, tiempo_bloques, pico_bloques = medir(lambda: predecir_por_bloques(modelo, consultas, memoria_maxima, hilos = 1))
+        resultado['tamanos'].append({
+            'filas_test': len(consultas),
+            'tiempo_completo': tiempo_completo,
+            'pico_completo': pico_completo,
+            'tiempo_bloques': tiempo_bloques,
+            'pico_bloques': pico_bloques,
+            'coincidencia': float(np.mean(completa == por_bloques)),
+        })
+        print(f"{len(consultas)} filas de test: una llamada {tiempo_completo:.2f} s y {pico_completo / 2**20:.1f} MB de pico, "
+              f"por bloques {tiempo_bloques:.2f} s y {pico_bloques / 2**20:.1f} MB de pico, "
+              f"coincidencia {resultado['tamanos'][-1]['coincidencia']:.4f}")
+
+    for cantidad in hilos:
+        inicio = time.perf_counter()
+        predecir_por_bloques(modelo, X, memoria_maxima, hilos = cantidad)
+        tiempo = time.perf_counter() - inicio
+        resultado['hilos'].append({'hilos': cantidad, 'tiempo': tiempo, 'filas_por_segundo': len(X) / tiempo})
+        print(f"{cantidad} hilo(s): {tiempo:.2f} s, {len(X) / tiempo:,.0f} filas por segundo")
+    return resultado
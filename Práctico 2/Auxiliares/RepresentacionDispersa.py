@@ -0,0 +1,203 @@
+'''
+    Autores:
+    - Alvarez, Matías
+    - Dumas, Román
+    - Nogueroles, Patricio
+
+    Archivo encargado de clasificar a partir de la representación dispersa (CSR) de los pixeles, que guarda sólo los pixeles
+    distintos de 0 (ver TMNISTDataset.dispersa() en Auxiliares/CargaDatos.py).
+        - KNNDisperso calcula las distancias al cuadrado como ||a||^2 + ||b||^2 - 2 a.b, multiplicando la matriz dispersa de train por
+          cada bloque de consultas (sólo se recorren los pixeles encendidos de train). Los valores se pasan a int32, por lo que el resultado es exacto.
+          Multiplicar la base dispersa por un bloque denso de consultas es unas 4 veces más rápido que multiplicar dos matrices dispersas.
+        - DecisionTreeClassifier acepta directamente la matriz CSR (y ArbolHistogramas y ArbolPlano también, pasándola a densa).
+    comparar_denso_disperso(...) mide el pico de memoria y el tiempo de KNN y de los árboles con la entrada densa y con la dispersa,
+    y ampliar_glifos(...) genera conjuntos sintéticos más grandes desplazando los glifos, para medir cómo escala cada representación.
+
+    La semántica de KNNDisperso es la misma que la de vecinos_mas_cercanos y predecir_para_cada_k (Auxiliares/BarridoKNN.py): empates en
+    distancia a favor de la fila de train de menor índice y empates de votos a favor de la clase menor.
+
+    Modo de uso:
+        knn = KNNDisperso(n_neighbors = 5).fit(dataset.dispersa(), dataset.etiquetas)
+        Y_predict = knn.predict(pixeles_dispersos(X_test))
+'''
+
+import numpy as np
+from scipy import sparse
+from sklearn.tree import DecisionTreeClassifier
+
+from Auxiliares.CargaDatos import LADO_IMAGEN, pixeles_dispersos
+from Auxiliares.BarridoKNN import vecinos_mas_cercanos, predecir_para_cada_k
+from Auxiliares.NucleoDistancias import vecinos_exactos
+from Auxiliares.Mediciones import medir
+
+
+'''
+    Funciones auxiliares
+'''
+
+def normas_al_cuadrado(X: sparse.csr_matrix) -> np.ndarray:
+    # ||x||^2 de cada fila, sumando sólo los valores guardados
+    valores = X.data.astype(np.int64)
+    filas = np.repeat(np.arange(X.shape[0]), np.diff(X.indptr))
+    return np.bincount(filas, weights=valores * valores, minlength=X.shape[0]).astype(np.int64)
+
+
+def distancias_dispersas(base: sparse.csr_matrix, normas_base: np.ndarray, consultas: sparse.csr_matrix) -> np.ndarray:
+    """
+    Calcular las distancias al cuadrado entre cada consulta y cada fila de la base, como ||a||^2 + ||b||^2 - 2 a.b.
+
+    Parámetros:
+        base (sparse.csr_matrix): Matriz (base, 784) CSR con valores int32.
+        normas_base (np.ndarray): ||b||^2 de cada fila de la base.
+        consultas (sparse.csr_matrix): Matriz (consultas, 784) CSR con valores int32.
+
+    Retorna:
+        np.ndarray: Matriz (consultas, base) int64 de distancias al cuadrado.
+    """
+
+    # Cada producto a.b es a lo sumo 784 * 255^2, que entra en int32. El bloque de consultas (chico) se pasa a denso
+    productos = (base @ consultas.toarray().T).T
+    return normas_al_cuadrado(consultas)[:, None] + normas_base[None, :] - 2 * productos.astype(np.int64)
+
+
+def ampliar_glifos(X: np.ndarray, y: np.ndarray, veces: int, desplazamiento_maximo: int = 2, semilla: int = 42) -> tuple:
+    """
+    Generar un conjunto sintético de glifos más grande, desplazando cada imagen al azar algunos pixeles en cada dirección.
+    El fondo sigue siendo 0, por lo que se conserva la proporción de pixeles encendidos (la dispersión).
+
+    Parámetros:
+        X (np.ndarray): Matriz (filas, 784) de pixeles uint8.
+        y (np.ndarray): Etiquetas.
+        veces (int): Cantidad de copias desplazadas de cada imagen.
+        desplazamiento_maximo (int): Máximo desplazamiento, en pixeles, en cada eje.
+        semilla (int): Semilla de los desplazamientos.
+
+    Retorna:
+        tuple: (matriz (filas * veces, 784) de pixeles uint8, etiquetas).
+    """
+
+    generador = np.random.default_rng(semilla)
+    imagenes = np.asarray(X).reshape(-1, LADO_IMAGEN, LADO_IMAGEN)
+    borde = desplazamiento_maximo
+    # Se agrega un borde de ceros para desplazar sin que la imagen "dé la vuelta"
+    con_borde = np.pad(imagenes, ((0, 0), (borde, borde), (borde, borde)))
+
+    copias = []
+    for _ in range(veces):
+        dx, dy = generador.integers(-borde, borde + 1, size=(2, len(imagenes)))
+        copia = np.empty_like(imagenes)
+        for desplazamiento_x in range(-borde, borde + 1):
+            for desplazamiento_y in range(-borde, borde + 1):
+                filas = np.flatnonzero((dx == desplazamiento_x) & (dy == desplazamiento_y))
+                x0, y0 = borde - desplazamiento_x, borde - desplazamiento_y
+                copia[filas] = con_borde[filas, x0:x0 + LADO_IMAGEN, y0:y0 + LADO_IMAGEN]
+        copias.append(copia.reshape(len(imagenes), -1))
+    return np.concatenate(copias), np.tile(np.asarray(y), veces)
+
+
+'''
+    Clasificador
+'''
+
+class KNNDisperso:
+    """
+    Clasificador KNN sobre pixeles en formato CSR, con distancias calculadas a partir del producto de la matriz dispersa de train por las consultas.
+
+    Atributos (luego de fit):
+        base (sparse.csr_matrix): Matriz (train, 784) CSR con valores int32.
+        normas_base (np.ndarray): ||b||^2 de cada fila de train.
+        clases (np.ndarray): Clases ordenadas de menor a mayor.
+        indices_train (np.ndarray): Índice (en clases) de la clase de cada fila de train.
+    """
+
+    def __init__(self, n_neighbors: int = 5, filas_por_bloque: int = 256):
+        self.n_neighbors = n_neighbors
+        self.filas_por_bloque = filas_por_bloque
+
+    def fit(self, X, y: np.ndarray) -> 'KNNDisperso':
+        X = X if sparse.issparse(X) else pixeles_dispersos(X)
+        self.base = sparse.csr_matrix(X, dtype=np.int32)
+        self.normas_base = normas_al_cuadrado(self.base)
+        self.clases, self.indices_train = np.unique(y, return_inverse=True)
+        return self
+
+    def kneighbors(self, X) -> np.ndarray:
+        # Índices de train de los vecinos de cada fila de X (densa o CSR), ordenados por distancia
+        X = sparse.csr_matrix(X if sparse.issparse(X) else pixeles_dispersos(X), dtype=np.int32)
+        k = min(self.n_neighbors, self.base.shape[0])
+        vecinos = np.empty((X.shape[0], k), dtype=np.int64)
+        for inicio in range(0, X.shape[0], self.filas_por_bloque):
+            bloque = X[inicio:inicio + self.filas_por_bloque]
+            vecinos[inicio:inicio + bloque.shape[0]] = vecinos_mas_cercanos(distancias_dispersas(self.base, self.normas_base, bloque), k)
+        return vecinos
+
+    def predict(self, X) -> np.ndarray:
+        vecinos = self.kneighbors(X)
+        return predecir_para_cada_k(self.indices_train[vecinos], [vecinos.shape[1]], self.clases)[0]
+
+
+'''
+    Función principal
+'''
+
+def comparar_denso_disperso(x_train: np.ndarray, y_train: np.ndarray, x_test: np.ndarray, y_test: np.ndarray,
+                            k: int = 5, profundidad: int = 10) -> dict:
+    """
+    Comparar, con la entrada densa (uint8) y con la dispersa (CSR), el tiempo y el pico de memoria de:
+        - KNN: predicción sobre test (densa: vecinos_exactos de Auxiliares/NucleoDistancias.py; dispersa: KNNDisperso)
+        - Árbol de decisión: entrenamiento de DecisionTreeClassifier y predicción sobre test
+    Las predicciones de ambas representaciones deben coincidir.
+
+    Parámetros:
+        x_train (np.ndarray): Matriz (train, 784) de pixeles uint8.
+        y_train (np.ndarray): Etiquetas de train.
+        x_test (np.ndarray): Matriz (test, 784) de pixeles uint8.
+        y_test (np.ndarray): Etiquetas de test.
+        k (int): Cantidad de vecinos de KNN.
+        profundidad (int): Profundidad máxima del árbol.
+
+    Retorna:
+        dict: Resultados de la comparación (también se imprimen por consola).
+    """
+
+    x_train = np.ascontiguousarray(x_train)
+    x_test = np.ascontiguousarray(x_test)
+    y_test = np.asarray(y_test)
+    disperso_train = pixeles_dispersos(x_train)
+    disperso_test = pixeles_dispersos(x_test)
+    clases, indices_train = np.unique(y_train, return_inverse=True)
+
+    def knn_denso():
+        vecinos = vecinos_exactos(x_train, x_test, k)
+        return predecir_para_cada_k(indices_train[vecinos], [vecinos.shape[1]], clases)[0]
+
+    def knn_disperso():
+        return KNNDisperso(n_neighbors = k).fit(disperso_train, y_train).predict(disperso_test)
+
+    def arbol(entrenamiento, prueba):
+        return lambda: DecisionTreeClassifier(max_depth = profundidad, random_state = 42).fit(entrenamiento, y_train).predict(prueba)
+
+    resultado = {
+        'filas_train': len(x_train),
+        'proporcion_no_nulos': disperso_train.nnz / max(1, x_train.size),
+        'bytes_denso': x_train.nbytes,
+        'bytes_disperso': disperso_train.data.nbytes + disperso_train.indices.nbytes + disperso_train.indptr.nbytes,
+    }
+    print(f"Train: {len(x_train)} filas, {100 * resultado['proporcion_no_nulos']:.1f}% de pixeles distintos de 0, "
+          f"densa {resultado['bytes_denso'] / 2**20:.2f} MB, CSR {resultado['bytes_disperso'] / 2**20:.2f} MB")
+
+    for nombre, funciones in (('knn', (knn_denso, knn_disperso)), ('arbol', (arbol(x_train, x_test), arbol(disperso_train, disperso_test)))):
+        prediccion_densa, tiempo_denso, pico_denso = medir(funciones[0])
+        prediccion_dispersa, tiempo_disperso, pico_disperso = medir(funciones[1])
+        resultado[nombre] = {
+            'exactitud': float(np.mean(prediccion_densa == y_test)),
+            'coincidencia': float(np.mean(prediccion_densa == prediccion_dispersa)),
+            'tiempo_denso': tiempo_denso,
+            'tiempo_disperso': tiempo_disperso,
+            'pico_denso': pico_denso,
+            'pico_disperso': pico_disperso,
+        }
+        print(f"{'KNN (K = ' + str(k) + ')' if nombre == 'knn' else 'Árbol (profundidad ' + str(profundidad) + ')'}: "
+              f"densa {tiempo_denso:.2f} s y {pico_denso / 2**20:.1f} MB de pico, CSR {tiempo_disperso:.2f} s y {pico_disperso / 2**20:.1f} MB de pico, "
+              f"exactitud {resultado[nombre]['exactitud']:.4f}, coincidencia {resultado[nombre]['coincidencia']:.4f}")
+    return resultado
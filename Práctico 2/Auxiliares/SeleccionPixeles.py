@@ -0,0 +1,130 @@
+'''
+    Autores:
+    - Alvarez, Matías
+    - Dumas, Román
+    - Nogueroles, Patricio
+
+    Archivo encargado de elegir los pixeles para KNN por selección hacia adelante (greedy), como alternativa a las listas fijas
+    de coordenadas de ClasificacionBinaria.py. El método principal es seleccion_hacia_adelante(...)
+
+    En cada paso se agrega el pixel que más mejora la exactitud sobre validación. No se reentrena ningún modelo: se mantiene
+    la matriz de distancias al cuadrado (validación x train) de los pixeles ya elegidos, y cada candidato se evalúa sumándole
+    sólo su contribución (como en Auxiliares/BarridoKNN.py).
+
+    Los candidatos se reparten en bloques entre varios procesos. Cada proceso guarda su propia copia de la matriz de distancias
+    y la actualiza con los pixeles elegidos desde su tarea anterior, por lo que la matriz nunca se envía entre procesos.
+'''
+
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+from Auxiliares.BarridoKNN import sumar_pixel, vecinos_mas_cercanos, predecir_para_cada_k
+from Auxiliares.BusquedaTernas import pixeles_variables
+
+# Estado de cada proceso del pool: datos, matriz de distancias y pixeles ya sumados a ella (se asigna en _inicializar_proceso)
+_estado = None
+
+
+'''
+    Funciones auxiliares
+'''
+
+def _inicializar_proceso(x_train: np.ndarray, y_train: np.ndarray, x_validacion: np.ndarray, y_validacion: np.ndarray, k: int):
+    global _estado
+    clases, indices_train = np.unique(y_train, return_inverse=True)
+    _estado = {
+        'x_train': x_train,
+        'x_validacion': x_validacion,
+        'indices_train': indices_train,
+        'indices_validacion': np.searchsorted(clases, y_validacion),
+        'cantidad_clases': len(clases),
+        'k': min(k, len(y_train)),
+        # La distancia máxima (784 * 255^2) entra en int32, que ocupa la mitad que int64
+        'distancias': np.zeros((len(x_validacion), len(x_train)), dtype=np.int32),
+        'sumados': [],
+    }
+
+
+def _sincronizar(seleccionados: list) -> None:
+    # Suma a la matriz de distancias del proceso los pixeles elegidos que todavía no sumó (la selección sólo crece)
+    sumados = _estado['sumados']
+    for pixel in seleccionados[len(sumados):]:
+        sumar_pixel(_estado['distancias'], _estado['x_validacion'][:, pixel], _estado['x_train'][:, pixel])
+        sumados.append(pixel)
+
+
+def _aciertos(distancias: np.ndarray) -> int:
+    # Cantidad de filas de validación que KNN clasifica bien con la matriz de distancias dada
+    vecinos = vecinos_mas_cercanos(distancias, _estado['k'])
+    predicciones = predecir_para_cada_k(_estado['indices_train'][vecinos], [_estado['k']], np.arange(_estado['cantidad_clases']))[0]
+    return int((predicciones == _estado['indices_validacion']).sum())
+
+
+def _evaluar_candidatos(candidatos: np.ndarray, seleccionados: list) -> list:
+    # Tarea de cada proceso: aciertos en validación al agregar cada candidato a los pixeles seleccionados
+    _sincronizar(seleccionados)
+    distancias = _estado['distancias']
+    resultado = []
+    for pixel in candidatos:
+        diferencias = _estado['x_validacion'][:, pixel].astype(np.int32)[:, None] - _estado['x_train'][:, pixel].astype(np.int32)[None, :]
+        resultado.append(_aciertos(distancias + diferencias * diferencias))
+    return resultado
+
+
+'''
+    Función principal
+'''
+
+def seleccion_hacia_adelante(x_train: np.ndarray, y_train: np.ndarray, x_validacion: np.ndarray, y_validacion: np.ndarray,
+                             cantidad: int = 10, k: int = 5, procesos: int = None, candidatos_por_tarea: int = 32) -> tuple:
+    """
+    Elegir 'cantidad' pixeles de a uno, agregando en cada paso el que da la mayor exactitud de KNN sobre validación.
+    Ante igual exactitud se elige el pixel de menor índice. Los pixeles constantes no se consideran.
+
+    Parámetros:
+        x_train (np.ndarray): Matriz (train, 784) de pixeles.
+        y_train (np.ndarray): Etiquetas de train.
+        x_validacion (np.ndarray): Matriz (validación, 784) de pixeles.
+        y_validacion (np.ndarray): Etiquetas de validación.
+        cantidad (int): Cantidad de pixeles a elegir.
+        k (int): Cantidad de vecinos de KNN.
+        procesos (int, opcional): Cantidad de procesos. Si es None, se usa la cantidad de CPUs.
+        candidatos_por_tarea (int): Cantidad de candidatos que evalúa cada tarea.
+
+    Retorna:
+        tuple: (lista de índices de pixel en el orden en que se eligieron, lista de exactitudes en validación luego de cada paso).
+    """
+
+    procesos = procesos or os.cpu_count() or 1
+    x_train = np.asarray(x_train)
+    x_validacion = np.asarray(x_validacion)
+    datos = (x_train, np.asarray(y_train), x_validacion, np.asarray(y_validacion), k)
+    candidatos = pixeles_variables(x_train, x_validacion)
+
+    seleccionados = []
+    exactitudes = []
+    pool = ProcessPoolExecutor(max_workers=procesos, initializer=_inicializar_proceso, initargs=datos) if procesos > 1 else None
+    if pool is None:
+        _inicializar_proceso(*datos)
+
+    try:
+        while len(seleccionados) < cantidad and len(candidatos) > 0:
+            bloques = [candidatos[inicio:inicio + candidatos_por_tarea] for inicio in range(0, len(candidatos), candidatos_por_tarea)]
+            if pool is None:
+                aciertos = [_evaluar_candidatos(bloque, seleccionados) for bloque in bloques]
+            else:
+                aciertos = list(pool.map(_evaluar_candidatos, bloques, [seleccionados] * len(bloques)))
+
+            # np.argmax devuelve el primer máximo, es decir el candidato de menor índice
+            aciertos = np.concatenate(aciertos)
+            mejor = int(np.argmax(aciertos))
+            seleccionados.append(int(candidatos[mejor]))
+            exactitudes.append(int(aciertos[mejor]) / len(y_validacion))
+            candidatos = np.delete(candidatos, mejor)
+    finally:
+        if pool is not None:
+            pool.shutdown()
+
+    return seleccionados, exactitudes
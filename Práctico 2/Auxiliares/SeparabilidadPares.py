@@ -0,0 +1,116 @@
+'''
+    Autores:
+    - Alvarez, Matías
+    - Dumas, Román
+    - Nogueroles, Patricio
+
+    Archivo encargado de medir qué tan separables son los 45 pares de dígitos con KNN binario, a partir de una única búsqueda
+    de vecinos sobre el dataset completo (las 10 clases), en lugar de particionar y entrenar un modelo por par.
+
+    La exactitud de cada par se mide dejando uno afuera (ver Auxiliares/DejarUnoAfuera.py): cada imagen de los dígitos a y b
+    se clasifica con las demás imágenes de a y b.
+        1. Se buscan una única vez los vecinos_globales vecinos más cercanos de cada imagen entre todas las demás, de cualquier dígito.
+        2. Para el par (a, b), los K vecinos de una imagen dentro del par son los primeros K de su lista que son de a o de b
+           (quitar las demás clases no cambia el orden por distancia de las restantes).
+        3. Si en la lista hay menos de K vecinos de a o de b (la imagen está rodeada de otros dígitos), sus K vecinos dentro del par
+           se buscan directamente entre las imágenes de a y b. Así, el resultado es exactamente el de KNN dejando uno afuera sobre cada par.
+    El costo es el de una única búsqueda de vecinos sobre las 10 clases, más las pocas imágenes del paso 3.
+
+    La semántica es la misma que la de vecinos_mas_cercanos y predecir_para_cada_k (Auxiliares/BarridoKNN.py): empates en distancia a
+    favor de la fila de menor índice y empates de votos a favor de la clase menor.
+
+    Modo de uso:
+        clases, separabilidad, busquedas_directas = separabilidad_por_pares(dataset.pixeles, dataset.etiquetas, k = 5)
+'''
+
+import numpy as np
+
+from Auxiliares.NucleoDistancias import vecinos_exactos
+from Auxiliares.DejarUnoAfuera import vecinos_sin_si_mismo
+
+
+'''
+    Funciones auxiliares
+'''
+
+def vecinos_dentro_del_par(X: np.ndarray, filas_par: np.ndarray, filas: np.ndarray, k: int) -> np.ndarray:
+    """
+    Buscar, para algunas filas de un par, sus k vecinos entre las demás filas del par.
+
+    Parámetros:
+        X (np.ndarray): Matriz (filas, 784) de pixeles uint8 del dataset completo.
+        filas_par (np.ndarray): Filas de X de los dos dígitos del par, ordenadas de menor a mayor.
+        filas (np.ndarray): Filas de X (todas dentro de filas_par) cuyos vecinos se buscan.
+        k (int): Cantidad de vecinos.
+
+    Retorna:
+        np.ndarray: Matriz (len(filas), k) de filas de X, ordenadas por distancia (y por índice ante empates), sin la propia fila.
+    """
+
+    # Como filas_par está ordenada, el orden de los índices dentro del par es el mismo que en X (y también el desempate)
+    candidatos = vecinos_exactos(X[filas_par], X[filas], k + 1)
+    propia = candidatos == np.searchsorted(filas_par, filas)[:, None]
+    propia[~propia.any(axis=1), -1] = True
+    return filas_par[candidatos[~propia].reshape(len(filas), k)]
+
+
+def exactitud_del_par(etiquetas_vecinos: np.ndarray, etiquetas: np.ndarray, a: int, b: int) -> float:
+    # Exactitud de KNN sobre las filas del par (a < b), dadas las etiquetas de sus K vecinos dentro del par (empates a favor de a, la menor)
+    votos_a = (etiquetas_vecinos == a).sum(axis=1)
+    votos_b = (etiquetas_vecinos == b).sum(axis=1)
+    predicciones = np.where(votos_a >= votos_b, a, b)
+    return float(np.mean(predicciones == etiquetas))
+
+
+'''
+    Función principal
+'''
+
+def separabilidad_por_pares(X: np.ndarray, y: np.ndarray, k: int = 5, vecinos_globales: int = 64) -> tuple:
+    """
+    Calcular la exactitud de KNN binario (dejando uno afuera) para cada par de dígitos, a partir de una única tabla de vecinos.
+
+    Parámetros:
+        X (np.ndarray): Matriz (filas, 784) de pixeles uint8 del dataset completo.
+        y (np.ndarray): Etiquetas.
+        k (int): Cantidad de vecinos de KNN.
+        vecinos_globales (int): Cantidad de vecinos (de cualquier clase) que se guardan por imagen. Con más vecinos, menos imágenes
+            necesitan la búsqueda directa dentro del par, pero la tabla ocupa más memoria.
+
+    Retorna:
+        tuple: (clases, matriz (clases, clases) simétrica de exactitudes con NaN en la diagonal,
+                cantidad de imágenes (sumando todos los pares) cuyos vecinos se buscaron directamente dentro del par).
+    """
+
+    X = np.asarray(X)
+    y = np.asarray(y)
+    clases = np.unique(y)
+    vecinos = vecinos_sin_si_mismo(X, max(k, vecinos_globales))
+    etiquetas_vecinos = y[vecinos]
+
+    separabilidad = np.full((len(clases), len(clases)), np.nan)
+    busquedas_directas = 0
+    for i, a in enumerate(clases):
+        for j in range(i + 1, len(clases)):
+            b = clases[j]
+            filas_par = np.flatnonzero((y == a) | (y == b))
+            k_par = min(k, len(filas_par) - 1)
+
+            # Los vecinos dentro del par son los primeros k_par de la lista global que son de a o de b
+            etiquetas_filas = etiquetas_vecinos[filas_par]
+            del_par = (etiquetas_filas == a) | (etiquetas_filas == b)
+            posiciones = np.cumsum(del_par, axis=1)
+            elegidos = del_par & (posiciones <= k_par)
+            completas = posiciones[:, -1] >= k_par
+
+            # Cada fila completa tiene exactamente k_par elegidos, que la máscara devuelve en orden de distancia
+            etiquetas_par = np.empty((len(filas_par), k_par), dtype=y.dtype)
+            etiquetas_par[completas] = etiquetas_filas[completas][elegidos[completas]].reshape(-1, k_par)
+            if not completas.all():
+                faltantes = filas_par[~completas]
+                etiquetas_par[~completas] = y[vecinos_dentro_del_par(X, filas_par, faltantes, k_par)]
+                busquedas_directas += len(faltantes)
+
+            separabilidad[i, j] = separabilidad[j, i] = exactitud_del_par(etiquetas_par, y[filas_par], a, b)
+
+    return clases, separabilidad, busquedas_directas
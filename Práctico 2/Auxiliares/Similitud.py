@@ -0,0 +1,118 @@
+'''
+    Autores:
+    - Alvarez, Matías
+    - Dumas, Román
+    - Nogueroles, Patricio
+
+    Archivo encargado de calcular la similitud coseno promedio entre las imágenes de cada par de dígitos (ejercicio 1.C).
+    El método principal es similitud_media_entre_clases(...), que devuelve la matriz completa de 10x10.
+
+    En lugar de comparar imagen contra imagen (aplanando y normalizando cada una en cada comparación), se normalizan
+    todas las filas una única vez y se calculan los productos internos de a bloques (tiles) con multiplicaciones de
+    matrices en float32. El tamaño del bloque acota la memoria: cada multiplicación genera a lo sumo una matriz de
+    tamano_bloque x tamano_bloque. Opcionalmente, los bloques se reparten entre varios procesos.
+'''
+
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+from Auxiliares.CargaDatos import TMNISTDataset
+
+# Matriz normalizada compartida por los procesos del pool (se asigna una vez por proceso en _inicializar_proceso)
+_filas_normalizadas = None
+
+
+def normalizar_filas(pixeles: np.ndarray) -> np.ndarray:
+    """
+    Convertir la matriz de pixeles a float32 y dividir cada fila por su norma L2.
+    Las filas nulas (imágenes vacías) quedan en cero, por lo que su similitud con cualquier otra es 0.
+
+    Parámetros:
+        pixeles (np.ndarray): Matriz (N, 784) de pixeles.
+
+    Retorna:
+        np.ndarray: Matriz (N, 784) float32 con filas de norma 1 (o 0).
+    """
+
+    filas = np.asarray(pixeles, dtype=np.float32)
+    normas = np.linalg.norm(filas, axis=1, keepdims=True)
+    normas[normas == 0] = 1
+    return filas / normas
+
+
+def _inicializar_proceso(filas_normalizadas: np.ndarray):
+    global _filas_normalizadas
+    _filas_normalizadas = filas_normalizadas
+
+
+def _sumar_bloque(filas_a: slice, filas_b: slice) -> float:
+    # Suma de las similitudes coseno entre todas las filas de filas_a y todas las de filas_b
+    bloque = _filas_normalizadas[filas_a] @ _filas_normalizadas[filas_b].T
+    return float(bloque.sum(dtype=np.float64))
+
+
+def _sumar_traza_bloque(filas: slice) -> float:
+    # Suma de la similitud de cada fila consigo misma (1 para filas no nulas), para descontarla de la diagonal
+    return float(np.einsum('ij,ij->', _filas_normalizadas[filas], _filas_normalizadas[filas], dtype=np.float64))
+
+
+def _generar_bloques(filas: slice, tamano_bloque: int) -> list:
+    return [slice(inicio, min(inicio + tamano_bloque, filas.stop)) for inicio in range(filas.start, filas.stop, tamano_bloque)]
+
+
+def similitud_media_entre_clases(dataset: TMNISTDataset, tamano_bloque: int = 2048, procesos: int = None) -> np.ndarray:
+    """
+    Calcular la similitud coseno promedio entre las imágenes de cada par de dígitos.
+        - Para dígitos distintos a y b, se promedia sobre todos los pares (imagen de a, imagen de b).
+        - Para un mismo dígito a, se promedia sobre los pares de imágenes distintas (sin comparar una imagen consigo misma).
+
+    Parámetros:
+        dataset (TMNISTDataset): Dataset TMNIST.
+        tamano_bloque (int): Cantidad máxima de filas por bloque en cada multiplicación de matrices.
+        procesos (int, opcional): Cantidad de procesos entre los que se reparten los bloques. Si es None, se usa el proceso actual.
+
+    Retorna:
+        np.ndarray: Matriz simétrica (clases, clases) con la similitud promedio.
+    """
+
+    filas_normalizadas = normalizar_filas(dataset.pixeles)
+    clases = list(dataset.clases)
+
+    # Se generan las tareas de cada par de dígitos (a <= b), cada una con todos sus pares de bloques
+    tareas = []
+    for i, a in enumerate(clases):
+        bloques_a = _generar_bloques(dataset.filas(a), tamano_bloque)
+        for b in clases[i:]:
+            bloques_b = _generar_bloques(dataset.filas(b), tamano_bloque)
+            for bloque_a in bloques_a:
+                for bloque_b in bloques_b:
+                    tareas.append((a, b, bloque_a, bloque_b))
+
+    # Calcular la suma de cada par de bloques, en el proceso actual o repartiéndolos en un pool
+    if procesos is None:
+        _inicializar_proceso(filas_normalizadas)
+        sumas_bloques = [_sumar_bloque(bloque_a, bloque_b) for (_, _, bloque_a, bloque_b) in tareas]
+        trazas = [_sumar_traza_bloque(dataset.filas(a)) for a in clases]
+    else:
+        with ProcessPoolExecutor(max_workers=procesos, initializer=_inicializar_proceso, initargs=(filas_normalizadas,)) as pool:
+            sumas_bloques = list(pool.map(_sumar_bloque, [t[2] for t in tareas], [t[3] for t in tareas]))
+            trazas = list(pool.map(_sumar_traza_bloque, [dataset.filas(a) for a in clases]))
+
+    # Acumular las sumas de los bloques en la matriz de sumas por par de dígitos
+    cantidad_clases = len(dataset.limites) - 1
+    sumas = np.zeros((cantidad_clases, cantidad_clases))
+    for (a, b, _, _), suma in zip(tareas, sumas_bloques):
+        sumas[a, b] += suma
+
+    # Promediar (en la diagonal se descuenta la comparación de cada imagen consigo misma)
+    similitudes = np.zeros((cantidad_clases, cantidad_clases))
+    for i, a in enumerate(clases):
+        n_a = dataset.cantidad(a)
+        if n_a > 1:
+            similitudes[a, a] = (sumas[a, a] - trazas[i]) / (n_a * (n_a - 1))
+        for b in clases[i + 1:]:
+            similitudes[a, b] = sumas[a, b] / (n_a * dataset.cantidad(b))
+            similitudes[b, a] = similitudes[a, b]
+
+    return similitudes
@@ -20,27 +20,27 @@
 from Auxiliares.Graficos import graficar
 from Auxiliares.ClasificacionBinaria import clasificacion_binaria
 from Auxiliares.ClasificacionMulticlase import clasificacion_multiclase
+from Auxiliares.CargaDatos import cargar_dataset
 
-import pandas as pd
-
-# Carga del dataset TMNIST
-df_digitos = pd.read_csv('TMNIST_Data.csv')
-
-# Elegir una carpeta en donde se guardarán todas las visualizaciones o resultados
-ruta_graficos = 'Graficos/'
-
-# Generar todas las visualizaciones relativas al Ejercicio 1 (Análisis Exploratorio)
-graficar(df_digitos, ruta_graficos)
-
-# Análisis, entrenamiento y testeo relativos al Ejercicio 2 (Clasificación Binaria)
-clasificacion_binaria(df_digitos, ruta_graficos)
-
-# Análisis, entrenamiento y testeo relativos al Ejercicio 3 (Clasificación Multiclase)
-clasificacion_multiclase(df_digitos, ruta_graficos)
-
-
+# Las etapas se ejecutan sólo al correr este archivo como script: los procesos que se usan opcionalmente para repartir cálculos
+# (por ejemplo la validación cruzada con procesos > 1) importan este módulo, y no deben volver a ejecutarlas
+if __name__ == '__main__':
+    # Carga del dataset TMNIST (la primera ejecución convierte el CSV a una caché binaria en .cache_tmnist/, las siguientes la leen directamente)
+    dataset = cargar_dataset('TMNIST_Data.csv')
 
+    # Elegir una carpeta en donde se guardarán todas las visualizaciones o resultados
+    ruta_graficos = 'Graficos/'
 
+    # Con True se ejecutan además, en las clasificaciones binaria y multiclase, las comparaciones de rendimiento de otras variantes de KNN
+    # y de árbol (no forman parte del enunciado y demoran bastante más que los ejercicios)
+    comparaciones = False
 
+    # Generar todas las visualizaciones relativas al Ejercicio 1 (Análisis Exploratorio)
+    # Los heatmaps de diferencias se generan para los tres pares analizados en el informe (con pares = None, para los 45 pares de dígitos)
+    graficar(dataset, ruta_graficos, pares = [(1, 3), (3, 8), (0, 1)])
 
+    # Análisis, entrenamiento y testeo relativos al Ejercicio 2 (Clasificación Binaria)
+    clasificacion_binaria(dataset, ruta_graficos, comparaciones = comparaciones)
 
+    # Análisis, entrenamiento y testeo relativos al Ejercicio 3 (Clasificación Multiclase)
+    clasificacion_multiclase(dataset, ruta_graficos, comparaciones = comparaciones)